@@ -5,17 +5,35 @@ from fastapi import FastAPI
 from redis.asyncio import Redis
 
 from .config import AppConfig
-from .db.session import lifespan_engine
+from .db.session import (
+    get_engine,
+    get_read_engine,
+    get_read_session_factory,
+    get_replica_engine,
+    get_replica_session_factory,
+    get_session_factory,
+    lifespan_engine,
+)
 from .routers import airgap, auth, dashboard, health, info, process, wheelhouse
+from .services.admission import AdmissionController, AdmissionMiddleware
+from .services.analytics import GateAnalyticsService
+from .services.auth import AuthService
 from .services.bootstrap import bootstrap_application
+from .services.ingest import TelemetryIngestQueue
 from .services.instrumentation import configure_observability
+from .services.jobs import JobDispatcher
+from .services.replica import ReadReplicaMonitor
+from .services.retention import TelemetryRetentionService
 from .services.streaming import TelemetryStreamBroker
+from .services.summary import DashboardSummaryResync, DashboardSummaryState
+from .services.wheelhouse import WheelhouseBuilder
 
 
 def create_app() -> FastAPI:
     """Construct the FastAPI application with configured routers and instrumentation."""
     config = AppConfig()
     logger = getLogger(__name__)
+    admission = AdmissionController(config)
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
@@ -34,17 +52,131 @@ def create_app() -> FastAPI:
                 logger.warning("Redis unavailable; using in-memory stream", exc_info=exc)
                 redis_client = None
 
-        app.state.telemetry_broker = TelemetryStreamBroker(redis_client)
+        summary_state = DashboardSummaryState()
+        app.state.dashboard_state = summary_state
+        broker = TelemetryStreamBroker(
+            redis_client,
+            keyframe_interval=config.stream_keyframe_interval,
+            redis_maxlen=config.stream_redis_maxlen,
+            overflow_policy=config.stream_overflow_policy,
+            subscriber_buffer=config.stream_subscriber_buffer,
+            heartbeat_seconds=config.stream_heartbeat_seconds,
+            summary_state=summary_state,
+        )
+        await broker.start()
+        app.state.telemetry_broker = broker
+        app.state.ingest_queue = None
+        app.state.analytics_service = GateAnalyticsService(
+            cache_size=config.analytics_cache_size,
+            cache_ttl_seconds=config.analytics_cache_ttl_seconds,
+        )
 
         async with lifespan_engine(config):
+            read_engine = get_read_engine()
+            # A separate read engine means the primary is SQLite's writer pool.
+            single_writer = read_engine is not None and config.sqlite_single_writer
+            admission.instrument(
+                get_engine(),
+                max_pool_wait_ms=config.admission_max_writer_wait_ms if single_writer else None,
+            )
+            if read_engine is not None:
+                admission.instrument(read_engine, "read")
+            if (replica_engine := get_replica_engine()) is not None:
+                admission.instrument(replica_engine, "replica")
+            await admission.start()
             await bootstrap_application(config)
-            yield
+            await summary_state.seed_from_database(get_read_session_factory(replica=False))
+            summary_resync: DashboardSummaryResync | None = None
+            if config.dashboard_summary_resync_seconds > 0:
+                summary_resync = DashboardSummaryResync(
+                    summary_state,
+                    get_read_session_factory(replica=False),
+                    broker,
+                    interval_seconds=config.dashboard_summary_resync_seconds,
+                )
+                await summary_resync.start()
+
+            replica_monitor: ReadReplicaMonitor | None = None
+            if (replica_factory := get_replica_session_factory()) is not None:
+                replica_monitor = ReadReplicaMonitor(
+                    config, get_read_session_factory(replica=False), replica_factory
+                )
+                await replica_monitor.start()
+            app.state.replica_monitor = replica_monitor
+
+            auth_service = AuthService(
+                config,
+                get_session_factory(),
+                read_session_factory=get_read_session_factory(replica=False),
+                redis_client=redis_client,
+            )
+            await auth_service.start()
+            app.state.auth_service = auth_service
+
+            ingest_queue: TelemetryIngestQueue | None = None
+            if config.ingest_write_behind:
+                ingest_queue = TelemetryIngestQueue(
+                    get_session_factory(),
+                    broker,
+                    summary_state=summary_state,
+                    max_size=config.ingest_queue_size,
+                    batch_size=config.ingest_batch_size,
+                    flush_interval_ms=config.ingest_flush_interval_ms,
+                    flush_retries=config.ingest_flush_retries,
+                    retry_backoff_ms=config.ingest_retry_backoff_ms,
+                    ticket_history=config.ingest_ticket_history,
+                    pack_trends=config.pack_trends,
+                )
+                await ingest_queue.start()
+                app.state.ingest_queue = ingest_queue
+
+            retention: TelemetryRetentionService | None = None
+            if config.retention_enabled:
+                retention = TelemetryRetentionService(get_session_factory(), config)
+                await retention.start()
+            app.state.retention_service = retention
 
+            job_dispatcher: JobDispatcher | None = None
+            if config.jobs_enabled:
+                job_dispatcher = JobDispatcher(
+                    get_session_factory(),
+                    config,
+                    broker,
+                    read_session_factory=get_read_session_factory(replica=False),
+                )
+                await job_dispatcher.start()
+            app.state.job_dispatcher = job_dispatcher
+
+            wheelhouse_builder = WheelhouseBuilder(config)
+            await wheelhouse_builder.start()
+            app.state.wheelhouse_builder = wheelhouse_builder
+
+            try:
+                yield
+            finally:
+                await wheelhouse_builder.stop()
+                if job_dispatcher is not None:
+                    await job_dispatcher.stop()
+                if retention is not None:
+                    await retention.stop()
+                if ingest_queue is not None:
+                    await ingest_queue.stop()
+                await auth_service.stop()
+                if replica_monitor is not None:
+                    await replica_monitor.stop()
+                if summary_resync is not None:
+                    await summary_resync.stop()
+                await admission.stop()
+
+        await broker.stop()
         if redis_client is not None:
             await redis_client.aclose()
 
     app = FastAPI(title="Chiron Core API", version="0.1.0", lifespan=lifespan)
 
+    app.state.admission = admission
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+
     configure_observability(app, config)
 
     app.include_router(health.router, prefix="/health", tags=["health"])
@@ -1,8 +1,52 @@
 from functools import lru_cache
+from typing import Literal
 
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class AdmissionGroup(BaseModel):
+    """Admission limits for requests whose path starts with one of ``prefixes``."""
+
+    prefixes: list[str]
+    # HTTP methods the group applies to; every method (and WebSockets) when unset.
+    methods: list[str] | None = None
+    # ``low`` is shed as soon as the service is under pressure, ``normal`` only under heavy
+    # pressure, and ``critical`` never.
+    priority: Literal["critical", "normal", "low"] = "normal"
+    max_in_flight: int | None = None
+    max_queue: int = 0
+    queue_timeout_seconds: float = 0.0
+    retry_after_seconds: int = 1
+
+
+def _default_admission_groups() -> dict[str, AdmissionGroup]:
+    return {
+        "health": AdmissionGroup(prefixes=["/health"], priority="critical"),
+        "ingest": AdmissionGroup(
+            prefixes=["/api/v1/dashboard/samples"],
+            methods=["POST"],
+            priority="low",
+            max_in_flight=32,
+            max_queue=64,
+            queue_timeout_seconds=2.0,
+        ),
+        # Sample pages and NDJSON exports, which may stream for a long time.
+        "sample-reads": AdmissionGroup(
+            prefixes=["/api/v1/dashboard/samples"],
+            methods=["GET"],
+            priority="low",
+            max_in_flight=8,
+            max_queue=16,
+            queue_timeout_seconds=2.0,
+        ),
+        "streams": AdmissionGroup(
+            prefixes=["/api/v1/dashboard/stream", "/api/v1/dashboard/ws"], priority="low"
+        ),
+        "default": AdmissionGroup(prefixes=["/"]),
+    }
+
+
 class AppConfig(BaseSettings):
     """Runtime configuration for the Chiron API."""
 
@@ -12,10 +56,104 @@ class AppConfig(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./var/chiron.db"
     redis_url: str = "redis://localhost:6379/0"
     sql_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: float = 30.0
+    database_pool_recycle_seconds: int | None = None
+    database_pool_pre_ping: bool = True
+    # Compiled SQL cache entries per engine; 0 disables statement caching.
+    database_statement_cache_size: int = 500
+    # Server-side prepared statements asyncpg keeps per connection; 0 disables them (needed
+    # behind PgBouncer in transaction pooling mode).
+    database_prepared_statement_cache_size: int = 500
+    # Optional replica serving dashboard reads; the primary takes over while it is unhealthy.
+    database_replica_url: str | None = None
+    database_replica_max_lag_seconds: float = 10.0
+    database_replica_check_interval_seconds: float = 5.0
+    sqlite_journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] | None = "wal"
+    sqlite_synchronous: Literal["off", "normal", "full", "extra"] | None = "normal"
+    sqlite_busy_timeout_ms: int | None = 5000
+    sqlite_mmap_size: int | None = 256 * 1024 * 1024
+    # Pages when positive, KiB when negative (SQLite semantics).
+    sqlite_cache_size: int | None = -64 * 1024
+    # Funnel writes through one pooled connection so they queue in the pool, not in SQLite.
+    sqlite_single_writer: bool = True
+    # PostgreSQL sample storage; partitioning applies when telemetry_samples is first created.
+    postgres_copy_ingest: bool = True
+    postgres_partition_samples: bool = True
+    postgres_partition_interval_days: int = 1
+    postgres_partitions_ahead: int = 3
+    postgres_brin_indexes: bool = True
     seed_demo_data: bool = True
     auth_admin_secret: str = "chiron-dev-admin"
     default_api_token: str | None = "local-dev-token"
     api_token_ttl_seconds: int = 7 * 24 * 60 * 60
+    auth_cache_size: int = 1024
+    auth_cache_ttl_seconds: float = 60.0
+    auth_touch_interval_seconds: float = 30.0
+    pack_trends: bool = False
+    ingest_write_behind: bool = False
+    ingest_queue_size: int = 1000
+    ingest_batch_size: int = 50
+    ingest_flush_interval_ms: int = 100
+    # A batch failing on a connection error is retried this often, backing off from
+    # ingest_retry_backoff_ms; snapshots that still fail are retried one by one.
+    ingest_flush_retries: int = 3
+    ingest_retry_backoff_ms: int = 100
+    # Finished tickets whose status stays readable on the worker that issued them.
+    ingest_ticket_history: int = 10_000
+    # Each worker re-reads the dashboard from the database at most this often when it has
+    # changed, bounding how stale its summary gets when stream relays are missed; 0 disables.
+    dashboard_summary_resync_seconds: float = 1.0
+    retention_enabled: bool = True
+    retention_interval_seconds: int = 300
+    retention_batch_size: int = 500
+    # Samples are kept forever unless an age or row-count limit is set.
+    sample_retention_days: int | None = None
+    sample_max_rows: int | None = None
+    timeline_retention_days: int | None = None
+    timeline_max_rows: int | None = 50
+    rollup_minute_retention_days: int | None = 7
+    rollup_hour_retention_days: int | None = 180
+    job_retention_days: int | None = 30
+    sqlite_incremental_vacuum: bool = False
+    sqlite_incremental_vacuum_pages: int = 1000
+    stream_keyframe_interval: int = 50
+    stream_redis_maxlen: int = 1000
+    stream_overflow_policy: Literal["conflate", "drop-oldest", "disconnect"] = "conflate"
+    stream_subscriber_buffer: int = 100
+    stream_heartbeat_seconds: float = 15.0
+    analytics_cache_size: int = 64
+    analytics_cache_ttl_seconds: float = 30.0
+    jobs_enabled: bool = True
+    # Jobs run concurrently per process; CPU-bound handlers also take a pool slot.
+    jobs_workers: int = 4
+    jobs_thread_workers: int = 4
+    jobs_process_workers: int = 2
+    # Queued jobs held in memory; further submissions wait in the jobs table.
+    jobs_queue_size: int = 1000
+    # Running jobs refresh their heartbeat every third of this; staler jobs are requeued.
+    jobs_lease_seconds: float = 60.0
+    wheelhouse_store_path: str = "./var/wheelhouse"
+    wheelhouse_build_workers: int = 2
+    # Distinct builds running or waiting for a worker; further new builds get a 503.
+    wheelhouse_max_pending_builds: int = 16
+    wheelhouse_build_timeout_seconds: float = 900.0
+    # Builds of requirements not pinned with ``==`` are reused for this long, then rebuilt
+    # so that newer releases are picked up.
+    wheelhouse_unpinned_ttl_seconds: float = 3600.0
+    # Extra ``pip wheel`` arguments, e.g. ``["--no-index", "--find-links", "/mirror"]``.
+    wheelhouse_pip_args: list[str] = Field(default_factory=list)
+    # Signed builds are also signed with ``cosign sign-blob --key`` when this is set.
+    wheelhouse_cosign_key: str | None = None
+    admission_enabled: bool = True
+    admission_max_loop_lag_ms: float = 250.0
+    admission_max_pool_wait_ms: float = 200.0
+    # Limit for SQLite's single-writer pool instead, where writes queue for the one
+    # connection by design and only a long queue means the writer is falling behind.
+    admission_max_writer_wait_ms: float = 2000.0
+    admission_sample_interval_seconds: float = 0.5
+    admission_groups: dict[str, AdmissionGroup] = Field(default_factory=_default_admission_groups)
 
     model_config = SettingsConfigDict(env_prefix="CHIRON_", env_file=".env", extra="ignore")
 
@@ -1,14 +1,55 @@
 """Database utilities for the Chiron API."""
 
-from .models import ApiClient, HeroGate, TelemetrySample, TimelineEvent
-from .session import get_async_session, get_session_factory, init_engine_and_session
+from .dialects import dialect_greatest, dialect_insert, dialect_least
+from .models import (
+    ApiClient,
+    GateLatest,
+    GateRollup,
+    HeroGate,
+    ProcessJob,
+    TelemetrySample,
+    TimelineEvent,
+)
+from .packing import TrendFormatError, pack_trend, unpack_trend
+from .session import (
+    get_async_session,
+    get_engine,
+    get_read_engine,
+    get_read_session,
+    get_read_session_factory,
+    get_replica_engine,
+    get_replica_session_factory,
+    get_session_factory,
+    init_engine_and_session,
+    read_session,
+    replica_available,
+    set_replica_available,
+)
 
 __all__ = [
     "ApiClient",
+    "GateLatest",
+    "GateRollup",
     "HeroGate",
+    "ProcessJob",
     "TelemetrySample",
     "TimelineEvent",
+    "TrendFormatError",
+    "dialect_greatest",
+    "dialect_insert",
+    "dialect_least",
     "get_async_session",
+    "get_engine",
+    "get_read_engine",
+    "get_read_session",
+    "get_read_session_factory",
+    "get_replica_engine",
+    "get_replica_session_factory",
     "get_session_factory",
     "init_engine_and_session",
+    "pack_trend",
+    "read_session",
+    "replica_available",
+    "set_replica_available",
+    "unpack_trend",
 ]
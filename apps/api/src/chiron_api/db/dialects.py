@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(session: AsyncSession, table: Any) -> sqlite.Insert | postgresql.Insert:
+    """Return an ``INSERT`` construct supporting ``ON CONFLICT`` for the session's dialect."""
+    dialect_name = session.get_bind().dialect.name
+
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+
+    raise NotImplementedError(f"Upserts are not supported for the {dialect_name!r} dialect")
+
+
+def dialect_least(session: AsyncSession, *values: Any) -> ColumnElement[Any]:
+    """Scalar minimum of ``values`` (``min()`` on SQLite, ``LEAST()`` elsewhere)."""
+    if session.get_bind().dialect.name == "sqlite":
+        return func.min(*values)
+    return func.least(*values)
+
+
+def dialect_greatest(session: AsyncSession, *values: Any) -> ColumnElement[Any]:
+    """Scalar maximum of ``values`` (``max()`` on SQLite, ``GREATEST()`` elsewhere)."""
+    if session.get_bind().dialect.name == "sqlite":
+        return func.max(*values)
+    return func.greatest(*values)
+
+
+__all__ = ["dialect_greatest", "dialect_insert", "dialect_least"]
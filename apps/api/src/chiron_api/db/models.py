@@ -4,7 +4,19 @@ from datetime import datetime, timezone
 from typing import Any
 from uuid import uuid4
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -32,6 +44,14 @@ class HeroGate(Base):
     )
 
 
+# Enforces case-insensitive gate names; created for existing databases during bootstrap.
+hero_gate_name_lower_index = Index(
+    "uq_hero_gates_name_lower",
+    func.lower(HeroGate.name),
+    unique=True,
+)
+
+
 class TelemetrySample(Base):
     __tablename__ = "telemetry_samples"
     __table_args__ = (
@@ -46,6 +66,8 @@ class TelemetrySample(Base):
     score: Mapped[int] = mapped_column(Integer, nullable=False)
     status: Mapped[str] = mapped_column(String(16), nullable=False)
     metrics: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
+    # Packed trend series (see db.packing); when set, ``metrics`` carries no "trend" key.
+    trend_packed: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     recorded_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=utcnow,
@@ -55,6 +77,46 @@ class TelemetrySample(Base):
     gate: Mapped[HeroGate] = relationship("HeroGate", back_populates="samples")
 
 
+class GateLatest(Base):
+    """Most recent sample per gate, maintained by the ingest transaction."""
+
+    __tablename__ = "gate_latest"
+
+    gate_id: Mapped[int] = mapped_column(
+        ForeignKey("hero_gates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    metrics: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
+    trend_packed: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class GateRollup(Base):
+    """Per-gate telemetry aggregates for one time bucket at a given resolution."""
+
+    __tablename__ = "gate_rollups"
+
+    gate_id: Mapped[int] = mapped_column(
+        ForeignKey("hero_gates.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    resolution: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_min: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_max: Mapped[int] = mapped_column(Integer, nullable=False)
+    score_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    pass_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    warn_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fail_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    throughput_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    throughput_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    load_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    load_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class TimelineEvent(Base):
     __tablename__ = "timeline_events"
 
@@ -82,10 +144,38 @@ class ApiClient(Base):
     is_active: Mapped[bool] = mapped_column(default=True)
 
 
+class ProcessJob(Base):
+    """A process run submitted through ``/api/v1/process``, executed by the job dispatcher."""
+
+    __tablename__ = "process_jobs"
+    __table_args__ = (Index("ix_process_jobs_status_queued_at", "status", "queued_at"),)
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid4().hex)
+    process_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    priority: Mapped[str] = mapped_column(String(16), nullable=False, default="normal")
+    dry_run: Mapped[bool] = mapped_column(default=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    message: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    queued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Refreshed while the job runs; a stale heartbeat marks a job whose worker died.
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 __all__ = [
     "ApiClient",
     "Base",
+    "GateLatest",
+    "GateRollup",
     "HeroGate",
+    "ProcessJob",
     "TelemetrySample",
     "TimelineEvent",
+    "hero_gate_name_lower_index",
 ]
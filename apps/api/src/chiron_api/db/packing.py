@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Sequence
+
+# Layout: one version byte followed by little-endian int16 values, so the payload can also
+# be read zero-copy with ``numpy.frombuffer(data, "<i2", offset=1)``.
+TREND_FORMAT_VERSION = 1
+
+_TREND_TYPECODE = "h"
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+class TrendFormatError(ValueError):
+    """Raised when a packed trend uses an unknown version or is truncated."""
+
+
+def pack_trend(values: Sequence[int]) -> bytes | None:
+    """Pack ``values`` into the binary trend format, or ``None`` if they do not fit int16."""
+    try:
+        packed = array(_TREND_TYPECODE, values)
+    except (OverflowError, TypeError):
+        return None
+    if _SWAP_BYTES:
+        packed.byteswap()
+    return bytes((TREND_FORMAT_VERSION,)) + packed.tobytes()
+
+
+def unpack_trend(data: bytes) -> list[int]:
+    if not data or data[0] != TREND_FORMAT_VERSION:
+        raise TrendFormatError(f"Unsupported packed trend version {data[:1]!r}")
+    if len(data) % 2 != 1:
+        raise TrendFormatError("Packed trend payload is truncated")
+
+    values = array(_TREND_TYPECODE)
+    values.frombytes(memoryview(data)[1:])
+    if _SWAP_BYTES:
+        values.byteswap()
+    return values.tolist()
+
+
+__all__ = ["TREND_FORMAT_VERSION", "TrendFormatError", "pack_trend", "unpack_trend"]
@@ -0,0 +1,288 @@
+"""PostgreSQL fast path for ``telemetry_samples``: COPY ingest and time partitions."""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Connection, Index, MetaData, PrimaryKeyConstraint, Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from .models import GateRollup, TelemetrySample
+
+if TYPE_CHECKING:
+    from ..config import AppConfig
+
+logger = getLogger(__name__)
+
+SAMPLES_TABLE = TelemetrySample.__tablename__
+
+_COPY_COLUMNS = ("gate_id", "score", "status", "metrics", "trend_packed", "recorded_at")
+_PARTITION_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+# Serialises partition DDL across every process sharing the database.
+_PARTITION_LOCK = "chiron.telemetry_samples.partitions"
+
+# Append-mostly time columns indexed with BRIN: tiny next to a B-tree and nearly free to
+# maintain on ingest, while range scans still skip blocks outside the requested window.
+# Partitioned sample tables get one on ``recorded_at`` in place of the B-tree.
+_BRIN_COLUMNS = ((GateRollup.__tablename__, "bucket_start"),)
+
+
+@dataclass(frozen=True, slots=True)
+class SamplePartition:
+    name: str
+    start: datetime
+    end: datetime
+
+
+class PostgresSampleStore:
+    """Process-wide PostgreSQL storage settings and partition bookkeeping for samples.
+
+    With ``postgres_partition_samples`` a new ``telemetry_samples`` table is created
+    range-partitioned on ``recorded_at``, one partition per
+    ``postgres_partition_interval_days``. Partitions are created ahead of ingest (up to
+    ``postgres_partitions_ahead`` intervals past the newest sample) and retention drops whole
+    partitions instead of deleting their rows. Existing unpartitioned tables are left as
+    they are. ``postgres_copy_ingest`` streams samples with ``COPY`` instead of ``INSERT``.
+    """
+
+    def __init__(self) -> None:
+        self.copy_ingest = True
+        self.partition_samples = True
+        self.brin_indexes = True
+        self.interval = timedelta(days=1)
+        self.ahead = 3
+        self._partitioned: bool | None = None
+        self._covered: tuple[datetime, datetime] | None = None
+
+    def configure(self, config: AppConfig) -> None:
+        self.copy_ingest = config.postgres_copy_ingest
+        self.partition_samples = config.postgres_partition_samples
+        self.brin_indexes = config.postgres_brin_indexes
+        self.interval = timedelta(days=max(1, config.postgres_partition_interval_days))
+        self.ahead = max(1, config.postgres_partitions_ahead)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget cached partition state, e.g. after another process changed partitions."""
+        self._partitioned = None
+        self._covered = None
+
+    def covers(self, since: datetime, until: datetime) -> bool:
+        """Whether partitions for ``since`` to ``until`` are known to exist already."""
+        covered = self._covered
+        return covered is not None and covered[0] <= since and until < covered[1]
+
+    async def is_partitioned(self, session: AsyncConnection | AsyncSession) -> bool:
+        if self._partitioned is None:
+            self._partitioned = bool(
+                await session.scalar(
+                    text(
+                        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                        "WHERE partrelid = to_regclass(:table))"
+                    ),
+                    {"table": SAMPLES_TABLE},
+                )
+            )
+        return self._partitioned
+
+    async def ensure_partitions(
+        self, engine: AsyncEngine, since: datetime, until: datetime
+    ) -> list[str]:
+        """Make sure samples recorded between ``since`` and ``until`` have a partition.
+
+        Runs in its own short transaction on a connection of its own, so call it before
+        the ingest transaction checks one out: holding one while waiting for another can
+        exhaust the pool. The partitions survive even if the ingest rolls back, and the
+        look-ahead partitions are created at the same time so this only reaches the database
+        once every few intervals.
+        """
+        if self.covers(since, until):
+            return []
+
+        created: list[str] = []
+        async with engine.begin() as connection:
+            if not await self.is_partitioned(connection):
+                return []
+            await connection.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _PARTITION_LOCK}
+            )
+            partitions = await list_sample_partitions(connection)
+            horizon = until + self.interval * self.ahead
+            if partitions:
+                ranges = _spans(_floor_day(since), partitions[0].start, self.interval, clip=True)
+                ranges += _spans(partitions[-1].end, horizon, self.interval)
+            else:
+                ranges = _spans(_floor_day(since), horizon, self.interval)
+
+            for start, end in ranges:
+                name = f"{SAMPLES_TABLE}_p{start:%Y%m%d}"
+                await connection.exec_driver_sql(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {SAMPLES_TABLE} '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+                created.append(name)
+
+        bounds = [(partition.start, partition.end) for partition in partitions] + ranges
+        self._covered = (min(start for start, _ in bounds), max(end for _, end in bounds))
+        if created:
+            logger.info("Created telemetry sample partitions", extra={"partitions": created})
+        return created
+
+    async def drop_partitions_before(self, session: AsyncSession, cutoff: datetime) -> list[str]:
+        """Drop partitions holding only samples older than ``cutoff``; the caller commits."""
+        if not await self.is_partitioned(session):
+            return []
+
+        await session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _PARTITION_LOCK}
+        )
+        connection = await session.connection()
+        dropped = [
+            partition.name
+            for partition in await list_sample_partitions(connection)
+            if partition.end <= cutoff
+        ]
+        for name in dropped:
+            await session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+        if dropped:
+            self._covered = None
+        return dropped
+
+    async def copy_samples(self, session: AsyncSession, rows: Sequence[dict[str, Any]]) -> None:
+        """Stream ``rows`` into the sample table with ``COPY``, in the session's transaction."""
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        if not driver.is_in_transaction():
+            # The asyncpg adapter begins its transaction lazily, on the first statement.
+            await connection.exec_driver_sql("SELECT 1")
+
+        await driver.copy_records_to_table(
+            SAMPLES_TABLE,
+            columns=_COPY_COLUMNS,
+            records=[
+                (
+                    row["gate_id"],
+                    row["score"],
+                    row["status"],
+                    json.dumps(row["metrics"]),
+                    row["trend_packed"],
+                    row["recorded_at"],
+                )
+                for row in rows
+            ],
+        )
+
+
+async def list_sample_partitions(
+    connection: AsyncConnection | AsyncSession,
+) -> list[SamplePartition]:
+    result = await connection.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": SAMPLES_TABLE},
+    )
+    partitions = []
+    for name, bounds in result:
+        match = _PARTITION_BOUNDS.search(bounds or "")
+        if match is None:
+            # DEFAULT or MINVALUE/MAXVALUE partitions are not managed here.
+            continue
+        start, end = (datetime.fromisoformat(value) for value in match.groups())
+        partitions.append(SamplePartition(name=name, start=start, end=end))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def create_postgres_schema(
+    sync_connection: Connection, metadata: MetaData, store: PostgresSampleStore
+) -> None:
+    """``metadata.create_all`` with the PostgreSQL-specific sample table and BRIN indexes."""
+    samples = metadata.tables.get(SAMPLES_TABLE)
+    if (
+        samples is None
+        or not store.partition_samples
+        or inspect(sync_connection).has_table(SAMPLES_TABLE)
+    ):
+        metadata.create_all(sync_connection)
+    else:
+        metadata.create_all(
+            sync_connection,
+            tables=[table for table in metadata.sorted_tables if table is not samples],
+        )
+        _partitioned_samples_table(metadata, brin=store.brin_indexes).create(sync_connection)
+        logger.info("Created range-partitioned telemetry_samples table")
+
+    if store.brin_indexes:
+        for table_name, column in _BRIN_COLUMNS:
+            sync_connection.exec_driver_sql(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name}_{column}_brin "
+                f"ON {table_name} USING brin ({column})"
+            )
+
+
+def _partitioned_samples_table(metadata: MetaData, *, brin: bool) -> Table:
+    # Work on a copy: the shared models keep their single-column primary key for SQLite.
+    copy = MetaData()
+    for table in metadata.sorted_tables:
+        table.to_metadata(copy)
+    samples = copy.tables[SAMPLES_TABLE]
+
+    # Unique constraints on a partitioned table must include the partition key.
+    samples.c.recorded_at.primary_key = True
+    samples.c.id.autoincrement = True
+    samples.append_constraint(PrimaryKeyConstraint(samples.c.id, samples.c.recorded_at))
+    samples.dialect_kwargs["postgresql_partition_by"] = "RANGE (recorded_at)"
+    if brin:
+        for index in list(samples.indexes):
+            if [column.name for column in index.columns] == ["recorded_at"]:
+                samples.indexes.discard(index)
+        Index(
+            f"ix_{SAMPLES_TABLE}_recorded_at_brin", samples.c.recorded_at, postgresql_using="brin"
+        )
+    return samples
+
+
+def _floor_day(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return datetime.combine(moment.date(), time(), tzinfo=timezone.utc)
+
+
+def _spans(
+    start: datetime, end: datetime, interval: timedelta, *, clip: bool = False
+) -> list[tuple[datetime, datetime]]:
+    """Consecutive ``interval``-wide ranges from ``start`` covering up to ``end``.
+
+    With ``clip`` the last range stops at ``end`` rather than overlapping what follows.
+    """
+    spans = []
+    while start < end:
+        stop = start + interval
+        spans.append((start, min(stop, end) if clip else stop))
+        start = stop
+    return spans
+
+
+_store = PostgresSampleStore()
+
+
+def get_sample_store() -> PostgresSampleStore:
+    return _store
+
+
+__all__ = [
+    "SAMPLES_TABLE",
+    "PostgresSampleStore",
+    "SamplePartition",
+    "create_postgres_schema",
+    "get_sample_store",
+    "list_sample_partitions",
+]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
+from logging import getLogger
 from pathlib import Path
+from typing import Any
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -12,32 +17,132 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from ..config import AppConfig
+from .postgres import create_postgres_schema, get_sample_store
+
+logger = getLogger(__name__)
 
 _engine: AsyncEngine | None = None
 _session_factory: async_sessionmaker[AsyncSession] | None = None
+_read_engine: AsyncEngine | None = None
+_read_session_factory: async_sessionmaker[AsyncSession] | None = None
+_replica_engine: AsyncEngine | None = None
+_replica_session_factory: async_sessionmaker[AsyncSession] | None = None
+# Flipped by the replica monitor; reads only go to the replica while it is set.
+_replica_available = False
 
 
 def init_engine_and_session(config: AppConfig) -> None:
-    """Initialise the async SQLAlchemy engine and session factory."""
-    global _engine, _session_factory
+    """Initialise the async SQLAlchemy engines and session factories.
+
+    On a SQLite file the primary engine starts every transaction with ``BEGIN IMMEDIATE``
+    so concurrent writers wait on ``busy_timeout`` instead of failing when a read turns
+    into a write, and :func:`get_read_session` is served by a separate read-only pool that
+    WAL lets run alongside the writer. With ``sqlite_single_writer`` (the default) the
+    primary engine holds one connection, so request-scoped write sessions queue in the pool
+    rather than holding SQLite's write lock while they wait on the event loop.
+
+    ``database_replica_url`` adds a read-only replica engine. Reads are routed to it only
+    once :func:`set_replica_available` reports it healthy.
+    """
+    global _engine, _session_factory, _read_engine, _read_session_factory
+    global _replica_engine, _replica_session_factory
 
     if _engine is not None and _session_factory is not None:
         return
 
+    get_sample_store().configure(config)
+
     database_url = config.database_url
+    split_reads = database_url.startswith("sqlite") and not _is_memory(database_url)
 
-    if database_url.startswith("sqlite"):
+    if split_reads:
         # Ensure local directory exists for SQLite storage
         db_path = database_url.split("///")[-1]
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-    _engine = create_async_engine(
-        database_url,
-        echo=config.sql_echo,
-        future=True,
-        pool_pre_ping=True,
-    )
+    _engine = _create_engine(config, database_url, writer=split_reads)
     _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+    if split_reads:
+        _read_engine = _create_engine(config, database_url, read_only=True)
+        _read_session_factory = async_sessionmaker(_read_engine, expire_on_commit=False)
+    else:
+        _read_session_factory = _session_factory
+
+    if config.database_replica_url:
+        _replica_engine = _create_engine(config, config.database_replica_url, read_only=True)
+        _replica_session_factory = async_sessionmaker(_replica_engine, expire_on_commit=False)
+
+
+def _create_engine(
+    config: AppConfig, url: str, *, writer: bool = False, read_only: bool = False
+) -> AsyncEngine:
+    options: dict[str, Any] = {
+        "echo": config.sql_echo,
+        "future": True,
+        "pool_pre_ping": config.database_pool_pre_ping,
+        "query_cache_size": config.database_statement_cache_size,
+    }
+    if not _is_memory(url):
+        # In-memory SQLite uses a static single-connection pool that takes no sizing.
+        single = writer and config.sqlite_single_writer
+        options.update(
+            pool_size=1 if single else config.database_pool_size,
+            max_overflow=0 if single else config.database_max_overflow,
+            pool_timeout=config.database_pool_timeout_seconds,
+        )
+        if config.database_pool_recycle_seconds is not None:
+            options["pool_recycle"] = config.database_pool_recycle_seconds
+
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.database_prepared_statement_cache_size
+        }
+
+    engine = create_async_engine(url, **options)
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    pragmas = _sqlite_pragmas(config, read_only=read_only)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, _: Any) -> None:
+        if writer:
+            # Let the "begin" hook below issue BEGIN instead of the driver.
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if writer:
+
+        @event.listens_for(engine.sync_engine, "begin")
+        def _on_begin(connection: Any) -> None:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+def _sqlite_pragmas(config: AppConfig, *, read_only: bool) -> list[str]:
+    pragmas = []
+    if config.sqlite_journal_mode is not None:
+        pragmas.append(f"PRAGMA journal_mode = {config.sqlite_journal_mode.upper()}")
+    if config.sqlite_synchronous is not None:
+        pragmas.append(f"PRAGMA synchronous = {config.sqlite_synchronous.upper()}")
+    if config.sqlite_busy_timeout_ms is not None:
+        pragmas.append(f"PRAGMA busy_timeout = {int(config.sqlite_busy_timeout_ms)}")
+    if config.sqlite_mmap_size is not None:
+        pragmas.append(f"PRAGMA mmap_size = {int(config.sqlite_mmap_size)}")
+    if config.sqlite_cache_size is not None:
+        pragmas.append(f"PRAGMA cache_size = {int(config.sqlite_cache_size)}")
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def _is_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
 
 
 @asynccontextmanager
@@ -46,8 +151,9 @@ async def lifespan_engine(config: AppConfig):
     try:
         yield
     finally:
-        if _engine is not None:
-            await _engine.dispose()
+        for engine in (_replica_engine, _read_engine, _engine):
+            if engine is not None:
+                await engine.dispose()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -58,15 +164,95 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only work; may be served by a different pool than writes."""
+    async with read_session() as session:
+        yield session
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Open a read-only session, on the replica while it is healthy.
+
+    A replica session connects eagerly so that a replica which has gone away since the
+    last health check is marked unavailable and the read is served by the primary instead.
+    """
+    session = get_read_session_factory()()
+    if session.bind is _replica_engine:
+        try:
+            await session.connection()
+        except (SQLAlchemyError, OSError) as exc:
+            await session.close()
+            set_replica_available(False)
+            logger.warning("Read replica unreachable; reading from the primary", exc_info=exc)
+            session = get_read_session_factory(replica=False)()
+    async with session:
+        yield session
+
+
+def get_engine() -> AsyncEngine:
+    if _engine is None:
+        raise RuntimeError("Database engine not initialised")
+    return _engine
+
+
+def get_read_engine() -> AsyncEngine | None:
+    """The dedicated read engine, or ``None`` when reads share the primary engine."""
+    return _read_engine
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     if _session_factory is None:
         raise RuntimeError("Database session factory not initialised")
     return _session_factory
 
 
+def get_read_session_factory(*, replica: bool = True) -> async_sessionmaker[AsyncSession]:
+    """Factory for read-only sessions; ``replica=False`` always reads from the primary."""
+    if replica and _replica_available and _replica_session_factory is not None:
+        return _replica_session_factory
+    if _read_session_factory is None:
+        raise RuntimeError("Database session factory not initialised")
+    return _read_session_factory
+
+
+def get_replica_engine() -> AsyncEngine | None:
+    return _replica_engine
+
+
+def get_replica_session_factory() -> async_sessionmaker[AsyncSession] | None:
+    return _replica_session_factory
+
+
+def replica_available() -> bool:
+    return _replica_available
+
+
+def set_replica_available(available: bool) -> None:
+    global _replica_available
+
+    if available and _replica_session_factory is None:
+        raise RuntimeError("No read replica configured")
+    _replica_available = available
+
+
+async def enable_sqlite_incremental_vacuum() -> None:
+    """Request incremental auto-vacuum; SQLite only honours this before tables exist."""
+    if _engine is None:
+        raise RuntimeError("Database engine not initialised")
+    if _engine.dialect.name != "sqlite":
+        return
+
+    async with _engine.connect() as connection:
+        await connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+
+
 async def run_schema_migrations(metadata) -> None:
     if _engine is None:
         raise RuntimeError("Database engine not initialised")
 
     async with _engine.begin() as connection:
-        await connection.run_sync(metadata.create_all)
+        if connection.dialect.name == "postgresql":
+            await connection.run_sync(create_postgres_schema, metadata, get_sample_store())
+        else:
+            await connection.run_sync(metadata.create_all)
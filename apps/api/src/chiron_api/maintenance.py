@@ -0,0 +1,235 @@
+"""Operational maintenance commands for the Chiron API database."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from statistics import median
+from time import perf_counter
+
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from .config import AppConfig
+from .db.models import Base, hero_gate_name_lower_index
+from .db.session import get_session_factory, lifespan_engine, run_schema_migrations
+from .schemas.dashboard import DashboardSummary, HeroGateSummary
+from .services.auth import AuthService
+from .services.gate_registry import GateRegistry
+from .services.retention import TelemetryRetentionService
+from .services.rollups import RollupRepository
+from .services.streaming import TelemetryStreamBroker
+from .services.telemetry import TelemetryRepository
+
+_BENCH_SUBSCRIBERS = (1_000, 10_000)
+_BENCH_PUBLISHES = 5
+_BENCH_ROUNDS = 3
+
+
+async def rebuild_gate_latest(config: AppConfig) -> None:
+    async with lifespan_engine(config):
+        await run_schema_migrations(Base.metadata)
+        async with get_session_factory()() as session:
+            gate_count = await TelemetryRepository(session).rebuild_gate_latest()
+    print(f"gate_latest rebuilt for {gate_count} gates")
+
+
+async def rebuild_rollups(config: AppConfig) -> None:
+    async with lifespan_engine(config):
+        await run_schema_migrations(Base.metadata)
+        async with get_session_factory()() as session:
+            sample_count = await RollupRepository(session).rebuild()
+    print(f"gate_rollups rebuilt from {sample_count} samples")
+
+
+async def prune(config: AppConfig) -> None:
+    async with lifespan_engine(config):
+        await run_schema_migrations(Base.metadata)
+        report = await TelemetryRetentionService(get_session_factory(), config).run_once()
+    removed = ", ".join(f"{table}={count}" for table, count in report.rows_removed.items())
+    print(
+        f"Removed {report.total_removed} rows ({removed or 'nothing to prune'}) "
+        f"in {report.batches} batches, {report.duration_ms} ms"
+    )
+    if report.partitions_dropped:
+        print(f"Dropped partitions: {', '.join(report.partitions_dropped)}")
+
+
+async def bench_queries(config: AppConfig) -> None:
+    """Time the hot queries with the lower(name) gate index and without it.
+
+    The index is dropped in a transaction that is rolled back afterwards, so the database is
+    left as it was; until then the transaction locks ``hero_gates`` against writers.
+    """
+    async with lifespan_engine(config):
+        await run_schema_migrations(Base.metadata)
+        async with get_session_factory()() as session:
+            repo = TelemetryRepository(session)
+            auth = AuthService(config)
+            token = config.default_api_token or ""
+            gate_names = [
+                GateRegistry.normalize(gate.name) for gate, _ in await repo.get_latest_gates()
+            ]
+            calls: dict[str, Callable[[], Awaitable[object]]] = {
+                "gate summaries": repo.get_latest_gates,
+                "timeline": repo.get_timeline,
+                "gates by name": lambda: repo.get_gates_by_name(gate_names),
+                "client by token": lambda: auth.find_client_by_token(session, token),
+            }
+            indexed = dict.fromkeys(calls, float("inf"))
+            unindexed = dict.fromkeys(calls, float("inf"))
+            try:
+                # Alternate the two so that drift over the run does not favour either.
+                for _ in range(_BENCH_ROUNDS):
+                    await session.execute(
+                        CreateIndex(hero_gate_name_lower_index, if_not_exists=True)
+                    )
+                    for name, call in calls.items():
+                        indexed[name] = min(indexed[name], await _time_per_call(call, rounds=1))
+                    await session.execute(DropIndex(hero_gate_name_lower_index))
+                    for name, call in calls.items():
+                        unindexed[name] = min(unindexed[name], await _time_per_call(call, rounds=1))
+            finally:
+                await session.rollback()
+
+    print(
+        f"us/call with and without {hero_gate_name_lower_index.name} "
+        f"({len(gate_names)} gate names per lookup)"
+    )
+    print(f"{'query':<16} {'indexed':>9} {'no index':>9} {'speedup':>8}")
+    for name in calls:
+        print(
+            f"{name:<16} {indexed[name]:9.1f} {unindexed[name]:9.1f} "
+            f"{unindexed[name] / indexed[name]:7.2f}x"
+        )
+
+
+async def _time_per_call(
+    call: Callable[[], Awaitable[object]], iterations: int = 1000, rounds: int = 3
+) -> float:
+    for _ in range(iterations // 10):
+        await call()
+    best = float("inf")
+    for _ in range(rounds):
+        started = perf_counter()
+        for _ in range(iterations):
+            await call()
+        best = min(best, (perf_counter() - started) / iterations)
+    return best * 1_000_000
+
+
+async def bench_stream(config: AppConfig) -> None:
+    for subscribers in _BENCH_SUBSCRIBERS:
+        latencies = await _publish_latencies(config, subscribers)
+        print(
+            f"{subscribers:>6} subscribers  publish to last subscriber: "
+            f"median {median(latencies):7.1f} ms, max {max(latencies):7.1f} ms"
+        )
+
+
+async def _publish_latencies(config: AppConfig, subscribers: int) -> list[float]:
+    """Milliseconds from each publish until the last in-process subscriber has its frame."""
+    broker = TelemetryStreamBroker(
+        overflow_policy=config.stream_overflow_policy,
+        subscriber_buffer=config.stream_subscriber_buffer,
+        heartbeat_seconds=0,
+    )
+    connected = 0
+    pending = 0
+    all_connected = asyncio.Event()
+    delivered = asyncio.Event()
+    finished = 0.0
+
+    async def subscribe() -> None:
+        nonlocal connected, pending, finished
+        stream = broker.stream(_bench_summary(0))
+        try:
+            await stream.__anext__()
+            connected += 1
+            if connected == subscribers:
+                all_connected.set()
+            async for _ in stream:
+                pending -= 1
+                if pending == 0:
+                    finished = perf_counter()
+                    delivered.set()
+        finally:
+            await stream.aclose()
+
+    tasks = [asyncio.create_task(subscribe()) for _ in range(subscribers)]
+    latencies: list[float] = []
+    try:
+        await all_connected.wait()
+        for publish in range(1, _BENCH_PUBLISHES + 1):
+            pending = subscribers
+            delivered.clear()
+            started = perf_counter()
+            await broker.publish(_bench_summary(publish))
+            await delivered.wait()
+            latencies.append((finished - started) * 1000)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return latencies
+
+
+def _bench_summary(score: int) -> DashboardSummary:
+    return DashboardSummary(
+        generated_at=datetime.now(timezone.utc),
+        hero_gates=[
+            HeroGateSummary(
+                name=f"Gate {index}",
+                score=score,
+                status="pass",
+                baseline=80,
+                delta=float(score - 80),
+                trend=[score] * 8,
+            )
+            for index in range(8)
+        ],
+        timeline=[],
+    )
+
+
+_COMMANDS: dict[str, tuple[str, Callable[[AppConfig], Awaitable[None]]]] = {
+    "rebuild-gate-latest": (
+        "Recompute the latest sample per gate from telemetry_samples",
+        rebuild_gate_latest,
+    ),
+    "rebuild-rollups": (
+        "Recompute the 1m/1h/1d gate rollups from telemetry_samples",
+        rebuild_rollups,
+    ),
+    "prune": (
+        "Apply the configured retention policies once",
+        prune,
+    ),
+    "bench-queries": (
+        "Time the hot queries with and without the gate name index (rolled back after)",
+        bench_queries,
+    ),
+    "bench-stream": (
+        "Time publish-to-last-subscriber latency at 1k and 10k in-process SSE subscribers",
+        bench_stream,
+    ),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="chiron-maintenance",
+        description="Backfill and repair Chiron telemetry storage.",
+    )
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    for name, (help_text, _) in _COMMANDS.items():
+        subcommands.add_parser(name, help=help_text)
+
+    args = parser.parse_args(argv)
+    _, command = _COMMANDS[args.command]
+    asyncio.run(command(AppConfig()))
+
+
+if __name__ == "__main__":
+    main()
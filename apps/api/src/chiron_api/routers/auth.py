@@ -18,6 +18,10 @@ class TokenRequest(BaseModel):
     admin_secret: str = Field(..., min_length=8)
 
 
+class AdminRequest(BaseModel):
+    admin_secret: str = Field(..., min_length=8)
+
+
 class TokenResponse(BaseModel):
     client_id: str
     token: str
@@ -40,3 +44,17 @@ async def issue_token(
     )
 
     return TokenResponse(client_id=client.id, token=token, scopes=client.scopes)
+
+
+@router.post("/clients/{client_id}/deactivate", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_client(
+    client_id: str,
+    payload: AdminRequest,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> None:
+    if not auth_service.verify_admin_secret(payload.admin_secret):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin secret")
+
+    if not await auth_service.deactivate_client(session, client_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown client")
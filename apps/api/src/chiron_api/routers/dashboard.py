@@ -1,39 +1,107 @@
 import asyncio
-import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
 from logging import getLogger
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.requests import HTTPConnection
 from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.models import ApiClient
-from ..db.session import get_async_session
-from ..schemas.dashboard import DashboardSummary, TelemetrySnapshotIn
-from ..services.auth import get_current_client
-from ..services.streaming import TelemetryStreamBroker
+from ..config import AppConfig, get_config
+from ..db.models import utcnow
+from ..db.session import get_async_session, get_read_session, read_session
+from ..schemas.dashboard import (
+    DashboardAnalytics,
+    DashboardSocketCommand,
+    DashboardSummary,
+    GateHistory,
+    IngestTicket,
+    IngestTicketStatus,
+    TelemetrySampleOut,
+    TelemetrySamplePage,
+    TelemetrySnapshotIn,
+)
+from ..services.analytics import AnalyticsUnavailable, GateAnalyticsService
+from ..services.auth import AuthenticatedClient, AuthService, get_current_client
+from ..services.ingest import IngestQueueClosed, IngestQueueFull, TelemetryIngestQueue
+from ..services.mailbox import OverflowPolicy
+from ..services.rollups import (
+    GateNotFound,
+    InvalidResolution,
+    RollupRepository,
+    rollup_retention,
+)
+from ..services.samples import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    SampleRepository,
+)
+from ..services.streaming import StreamMode, TelemetryStreamBroker
+from ..services.summary import DashboardSummaryState
 from ..services.telemetry import TelemetryRepository
+from ..services.topics import (
+    Encoding,
+    EncodingUnavailable,
+    InvalidCommand,
+    InvalidTopic,
+    decode_command,
+    is_job_topic,
+    negotiate_encoding,
+    normalize_topics,
+)
 
 router = APIRouter()
 logger = getLogger(__name__)
 
+_DEFAULT_HISTORY_WINDOW = timedelta(hours=24)
+_NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def get_summary_state(connection: HTTPConnection) -> DashboardSummaryState | None:
+    state: DashboardSummaryState | None = getattr(connection.app.state, "dashboard_state", None)
+    if state is None or not state.is_seeded:
+        return None
+    return state
+
 
 def get_repository(
     session: Annotated[AsyncSession, Depends(get_async_session)],
+    summary_state: Annotated[DashboardSummaryState | None, Depends(get_summary_state)],
+    config: Annotated[AppConfig, Depends(get_config)],
 ) -> TelemetryRepository:
-    return TelemetryRepository(session)
+    return TelemetryRepository(session, summary_state=summary_state, pack_trends=config.pack_trends)
 
 
 @router.get("/summary", response_model=DashboardSummary, name="dashboard:summary")
 async def get_dashboard_summary(
-    repo: Annotated[TelemetryRepository, Depends(get_repository)],
+    summary_state: Annotated[DashboardSummaryState | None, Depends(get_summary_state)],
 ) -> DashboardSummary:
-    return await repo.get_dashboard_summary()
+    # Every worker's state folds in the others' ingests and is reconciled with the database
+    # every dashboard_summary_resync_seconds, so workers serve the same summary.
+    if summary_state is not None:
+        return summary_state.snapshot()
+    # Only now open a session: a replica session checks out a connection as it opens.
+    async with read_session() as session:
+        return await TelemetryRepository(session).get_dashboard_summary()
 
 
 @router.post(
     "/samples",
-    response_model=DashboardSummary,
+    response_model=DashboardSummary | IngestTicket,
     status_code=status.HTTP_202_ACCEPTED,
     name="dashboard:ingest",
 )
@@ -41,19 +109,184 @@ async def ingest_dashboard_snapshot(
     snapshot: TelemetrySnapshotIn,
     repo: Annotated[TelemetryRepository, Depends(get_repository)],
     request: Request,
-    _: Annotated[ApiClient, Depends(get_current_client)],
-) -> DashboardSummary:
-    summary = await repo.ingest_snapshot(snapshot)
+    _: Annotated[AuthenticatedClient, Depends(get_current_client)],
+) -> DashboardSummary | IngestTicket:
+    ingest_queue: TelemetryIngestQueue | None = getattr(request.app.state, "ingest_queue", None)
+    if ingest_queue is not None:
+        try:
+            return ingest_queue.submit(snapshot)
+        except (IngestQueueFull, IngestQueueClosed) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(exc),
+                headers={"Retry-After": "1"},
+            ) from exc
+
+    recorded_at = utcnow()
+    summary = await repo.ingest_snapshot(snapshot, recorded_at=recorded_at)
     broker: TelemetryStreamBroker | None = getattr(request.app.state, "telemetry_broker", None)
     if broker is not None:
-        await broker.publish(summary)
+        await broker.publish(summary, snapshots=[snapshot], recorded_at=[recorded_at])
     return summary
 
 
+@router.get(
+    "/tickets/{ticket_id}",
+    response_model=IngestTicketStatus,
+    name="dashboard:ingest-ticket",
+)
+async def get_ingest_ticket(
+    ticket_id: str,
+    request: Request,
+    _: Annotated[AuthenticatedClient, Depends(get_current_client)],
+) -> IngestTicketStatus:
+    """Outcome of a write-behind ingest; only the worker that issued the ticket knows it."""
+    ingest_queue: TelemetryIngestQueue | None = getattr(request.app.state, "ingest_queue", None)
+    ticket = ingest_queue.ticket_status(ticket_id) if ingest_queue is not None else None
+    if ticket is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown ticket")
+    return ticket
+
+
+@router.get(
+    "/samples",
+    response_model=TelemetrySamplePage,
+    name="dashboard:samples",
+    responses={200: {"content": {_NDJSON_MEDIA_TYPE: {}}}},
+)
+async def list_samples(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    gate: Annotated[list[str] | None, Query(description="Restrict to these gates")] = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: Annotated[str | None, Query(description="next_cursor from the previous page")] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    format: Annotated[Literal["json", "ndjson"] | None, Query()] = None,
+) -> TelemetrySamplePage | StreamingResponse:
+    """Page through raw samples, or stream all of them as NDJSON.
+
+    NDJSON is selected with ``format=ndjson`` or an ``Accept: application/x-ndjson`` header;
+    it ignores ``cursor`` and ``limit`` and streams every matching row in order.
+    """
+    start = _as_utc(start) if start is not None else None
+    end = _as_utc(end) if end is not None else None
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be earlier than end",
+        )
+
+    repo = SampleRepository(session)
+    gates = gate or []
+    if format is None and _NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        format = "ndjson"
+
+    try:
+        if format != "ndjson":
+            return await repo.get_page(
+                gates=gates, start=start, end=end, cursor=cursor, limit=limit
+            )
+
+        batches = repo.stream(gates=gates, start=start, end=end)
+        # Run the query before the response starts so lookup errors still map to 4xx.
+        first_batch = await _next_batch(batches)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except GateNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown gate") from exc
+
+    async def ndjson_lines():
+        batch = first_batch
+        while batch:
+            yield b"".join(sample.model_dump_json().encode() + b"\n" for sample in batch)
+            batch = await _next_batch(batches)
+
+    return StreamingResponse(ndjson_lines(), media_type=_NDJSON_MEDIA_TYPE)
+
+
+@router.get("/gates/{name}/history", response_model=GateHistory, name="dashboard:gate-history")
+async def get_gate_history(
+    name: str,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    config: Annotated[AppConfig, Depends(get_config)],
+    resolution: Annotated[
+        str | None,
+        Query(description="Bucket width such as 1m, 15m, 1h or 1d; chosen automatically if unset"),
+    ] = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> GateHistory:
+    end = _as_utc(end) if end is not None else datetime.now(timezone.utc)
+    start = _as_utc(start) if start is not None else end - _DEFAULT_HISTORY_WINDOW
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be earlier than end",
+        )
+
+    try:
+        return await RollupRepository(session, retention=rollup_retention(config)).get_gate_history(
+            name,
+            start=start,
+            end=end,
+            resolution=resolution,
+        )
+    except InvalidResolution as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except GateNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown gate") from exc
+
+
+@router.get("/analytics", response_model=DashboardAnalytics, name="dashboard:analytics")
+async def get_dashboard_analytics(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    summary_state: Annotated[DashboardSummaryState | None, Depends(get_summary_state)],
+    window: Annotated[str, Query(description="Trailing window such as 15m, 6h or 7d")] = "24h",
+    gate: Annotated[list[str] | None, Query(description="Restrict to these gates")] = None,
+    alpha: Annotated[float, Query(gt=0, le=1, description="EWMA smoothing factor")] = 0.3,
+    z_threshold: Annotated[float, Query(gt=0)] = 3.0,
+) -> DashboardAnalytics:
+    service: GateAnalyticsService | None = getattr(request.app.state, "analytics_service", None)
+    if service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics unavailable",
+        )
+
+    try:
+        return await service.get_analytics(
+            session,
+            window=window,
+            gates=gate or [],
+            alpha=alpha,
+            z_threshold=z_threshold,
+            generation=summary_state.generation if summary_state is not None else None,
+        )
+    except AnalyticsUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        ) from exc
+    except InvalidResolution as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except GateNotFound as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown gate") from exc
+
+
 @router.get("/stream", name="dashboard:stream")
 async def stream_dashboard_summary(
     request: Request,
-    repo: Annotated[TelemetryRepository, Depends(get_repository)],
+    summary_state: Annotated[DashboardSummaryState | None, Depends(get_summary_state)],
+    mode: Annotated[
+        StreamMode,
+        Query(description="'delta' sends a keyframe and then JSON Patch events"),
+    ] = "full",
+    last_event_id: Annotated[str | None, Header()] = None,
+    overflow: Annotated[
+        OverflowPolicy | None,
+        Query(description="How to treat this client when it falls behind"),
+    ] = None,
 ) -> StreamingResponse:
     broker: TelemetryStreamBroker | None = getattr(request.app.state, "telemetry_broker", None)
 
@@ -63,13 +296,14 @@ async def stream_dashboard_summary(
             detail="Telemetry streaming unavailable",
         )
 
+    initial_summary = await _initial_summary(summary_state)
+
     async def event_generator():
         try:
-            initial_summary = await repo.get_dashboard_summary()
-            yield f"data: {initial_summary.model_dump_json()}\n\n"
-
-            async for payload in broker.stream():
-                yield f"data: {json.dumps(payload)}\n\n"
+            async for frame in broker.stream(
+                initial_summary, mode=mode, last_event_id=last_event_id, overflow_policy=overflow
+            ):
+                yield frame
         except asyncio.CancelledError:  # pragma: no cover - client disconnected
             logger.debug("Dashboard SSE client disconnected")
             raise
@@ -83,3 +317,141 @@ async def stream_dashboard_summary(
             "X-Accel-Buffering": "no",
         },
     )
+
+
+@router.websocket("/ws", name="dashboard:ws")
+async def dashboard_websocket(
+    websocket: WebSocket,
+    summary_state: Annotated[DashboardSummaryState | None, Depends(get_summary_state)],
+    encoding: Annotated[Encoding | None, Query()] = None,
+    overflow: Annotated[OverflowPolicy | None, Query()] = None,
+    token: Annotated[str | None, Query()] = None,
+) -> None:
+    """Push updates for the hero gates, timeline and process job topics a client subscribes to.
+
+    Clients send ``{"action": "subscribe" | "unsubscribe", "topics": [...]}`` with topics
+    ``timeline``, ``gate:<name>``, ``gate:*``, ``job:<job_id>`` or ``job:*``. Each subscribe
+    is answered with a ``snapshot`` of those topics, followed by ``gate``, ``timeline`` and
+    ``job`` messages as they change. Messages are JSON text frames, or MessagePack binary
+    frames when negotiated via the ``chiron.dashboard.msgpack`` subprotocol or
+    ``encoding=msgpack``.
+
+    Job topics require an API key, sent in the handshake as ``Authorization: Bearer``,
+    ``X-API-Key`` or, for browsers that cannot set headers, the ``token`` query parameter.
+    """
+    broker: TelemetryStreamBroker | None = getattr(websocket.app.state, "telemetry_broker", None)
+    if broker is None:
+        await websocket.close(
+            code=status.WS_1013_TRY_AGAIN_LATER, reason="Telemetry streaming unavailable"
+        )
+        return
+    try:
+        encoding, subprotocol = negotiate_encoding(
+            websocket.scope.get("subprotocols", []), encoding
+        )
+    except EncodingUnavailable as exc:
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason=str(exc))
+        return
+    client: AuthenticatedClient | None = None
+    if credentials := _socket_credentials(websocket, token):
+        client = await _authenticate_socket(websocket, credentials)
+        if client is None:
+            await websocket.close(
+                code=status.WS_1008_POLICY_VIOLATION, reason="Invalid credentials"
+            )
+            return
+
+    initial_summary = await _initial_summary(summary_state)
+    await websocket.accept(subprotocol=subprotocol)
+    subscription = broker.subscribe_topics(initial_summary, overflow_policy=overflow)
+
+    async def send_messages() -> None:
+        while (message := await subscription.get()) is not None:
+            data = message.encode(encoding)
+            if isinstance(data, bytes):
+                await websocket.send_bytes(data)
+            else:
+                await websocket.send_text(data)
+        # The overflow policy dropped this client; it should reconnect and resubscribe.
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Subscriber fell behind")
+
+    async def receive_commands() -> None:
+        while True:
+            incoming = await websocket.receive()
+            if incoming["type"] == "websocket.disconnect":
+                return
+            try:
+                data = incoming.get("text")
+                command = DashboardSocketCommand.model_validate(
+                    decode_command(data if data is not None else incoming.get("bytes") or b"")
+                )
+                if command.action == "subscribe":
+                    if client is None and any(
+                        is_job_topic(topic) for topic in normalize_topics(command.topics)
+                    ):
+                        subscription.reply(
+                            {"type": "error", "detail": "Job topics require credentials"}
+                        )
+                        continue
+                    subscription.subscribe(command.topics)
+                else:
+                    subscription.unsubscribe(command.topics)
+            except (InvalidCommand, InvalidTopic) as exc:
+                subscription.reply({"type": "error", "detail": str(exc)})
+            except ValidationError as exc:
+                subscription.reply(
+                    {
+                        "type": "error",
+                        "detail": exc.errors(
+                            include_url=False, include_input=False, include_context=False
+                        ),
+                    }
+                )
+
+    tasks = [asyncio.create_task(send_messages()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    except WebSocketDisconnect:
+        logger.debug("Dashboard WebSocket client disconnected")
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+def _socket_credentials(websocket: WebSocket, token: str | None) -> str | None:
+    scheme, _, credentials = websocket.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        return credentials
+    return websocket.headers.get("X-API-Key") or token
+
+
+async def _authenticate_socket(websocket: WebSocket, token: str) -> AuthenticatedClient | None:
+    auth_service = getattr(websocket.app.state, "auth_service", None)
+    if auth_service is None:
+        auth_service = AuthService(get_config())
+    # Checked once at the handshake; no session is held for the life of the socket.
+    return await auth_service.authenticate_token(token)
+
+
+async def _initial_summary(summary_state: DashboardSummaryState | None) -> DashboardSummary:
+    # Streams stay open for hours; never hold a pooled connection for their lifetime.
+    if summary_state is not None:
+        return summary_state.snapshot()
+    async with read_session() as session:
+        return await TelemetryRepository(session).get_dashboard_summary()
+
+
+async def _next_batch(batches: AsyncIterator[list[TelemetrySampleOut]]) -> list[TelemetrySampleOut]:
+    try:
+        return await batches.__anext__()
+    except StopAsyncIteration:
+        return []
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
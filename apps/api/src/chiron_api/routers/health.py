@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
+from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 router = APIRouter()
 
@@ -18,3 +19,35 @@ async def health_ready() -> dict[str, str]:
 @router.get("/live", name="health:heartbeat")
 async def health_heartbeat() -> dict[str, str]:
     return {"status": "live", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/admission", name="health:admission")
+async def health_admission(request: Request) -> dict[str, Any]:
+    admission = getattr(request.app.state, "admission", None)
+    if admission is None:
+        return {"enabled": False}
+    return admission.snapshot()
+
+
+@router.get("/replica", name="health:replica")
+async def health_replica(request: Request) -> dict[str, Any]:
+    monitor = getattr(request.app.state, "replica_monitor", None)
+    if monitor is None:
+        return {"configured": False}
+    return {"configured": True, **monitor.snapshot()}
+
+
+@router.get("/jobs", name="health:jobs")
+async def health_jobs(request: Request) -> dict[str, Any]:
+    dispatcher = getattr(request.app.state, "job_dispatcher", None)
+    if dispatcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **dispatcher.stats()}
+
+
+@router.get("/wheelhouse", name="health:wheelhouse")
+async def health_wheelhouse(request: Request) -> dict[str, Any]:
+    builder = getattr(request.app.state, "wheelhouse_builder", None)
+    if builder is None:
+        return {"enabled": False}
+    return {"enabled": True, **builder.stats()}
@@ -1,14 +1,25 @@
 from datetime import datetime, timezone
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.session import get_async_session
+from ..services.auth import AuthenticatedClient, get_current_client
+from ..services.jobs import (
+    JobDispatcher,
+    JobPriority,
+    JobQueueClosed,
+    UnknownProcessType,
+)
 
 router = APIRouter()
 
 
 class ProcessOptions(BaseModel):
     dry_run: bool = Field(default=False, description="Perform validation without executing actions")
-    priority: str = Field(default="normal", description="Execution priority")
+    priority: JobPriority = Field(default="normal", description="Execution priority")
 
 
 class ProcessRequest(BaseModel):
@@ -18,17 +29,111 @@ class ProcessRequest(BaseModel):
 
 
 class ProcessResponse(BaseModel):
+    job_id: str
+    process_type: str
     status: str = Field(default="queued")
+    priority: JobPriority = "normal"
+    dry_run: bool = False
     queued_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     evidence_link: str | None = None
 
 
-@router.post("/", response_model=ProcessResponse, name="process:run")
-async def enqueue_process(request: ProcessRequest) -> ProcessResponse:
+class ProcessJobStatus(BaseModel):
+    job_id: str
+    process_type: str
+    status: str
+    priority: JobPriority
+    dry_run: bool
+    progress: float = Field(description="Completion between 0 and 1, as reported by the job")
+    message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    attempts: int
+    queued_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+def get_job_dispatcher(request: Request) -> JobDispatcher:
+    dispatcher: JobDispatcher | None = getattr(request.app.state, "job_dispatcher", None)
+    if dispatcher is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Process jobs are disabled",
+        )
+    return dispatcher
+
+
+@router.post(
+    "/",
+    response_model=ProcessResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    name="process:run",
+)
+async def enqueue_process(
+    request: ProcessRequest,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    dispatcher: Annotated[JobDispatcher, Depends(get_job_dispatcher)],
+    _: Annotated[AuthenticatedClient, Depends(get_current_client)],
+) -> ProcessResponse:
     if request.process_type == "":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing process type")
 
+    try:
+        job = await dispatcher.submit(
+            session,
+            request.process_type,
+            request.payload,
+            priority=request.options.priority,
+            dry_run=request.options.dry_run,
+        )
+    except UnknownProcessType as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except JobQueueClosed as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "1"},
+        ) from exc
+
     return ProcessResponse(
-        status="queued",
+        job_id=job.id,
+        process_type=job.process_type,
+        status=job.status,
+        priority=request.options.priority,
+        dry_run=job.dry_run,
+        queued_at=job.queued_at,
         evidence_link=f"https://console.chiron.local/process/{request.process_type}",
     )
+
+
+@router.get("/{job_id}", response_model=ProcessJobStatus, name="process:status")
+async def get_process_status(
+    job_id: str,
+    dispatcher: Annotated[JobDispatcher, Depends(get_job_dispatcher)],
+    _: Annotated[AuthenticatedClient, Depends(get_current_client)],
+) -> ProcessJobStatus:
+    job = await dispatcher.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    return ProcessJobStatus(
+        job_id=job.id,
+        process_type=job.process_type,
+        status=job.status,
+        priority=job.priority,
+        dry_run=job.dry_run,
+        progress=job.progress,
+        message=job.message,
+        result=job.result,
+        error=job.error,
+        attempts=job.attempts,
+        queued_at=_as_utc(job.queued_at),
+        started_at=_as_utc(job.started_at) if job.started_at else None,
+        finished_at=_as_utc(job.finished_at) if job.finished_at else None,
+    )
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
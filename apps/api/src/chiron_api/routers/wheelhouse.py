@@ -1,9 +1,19 @@
-from collections.abc import Iterable
 from datetime import datetime, timezone
+from typing import Annotated
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel, Field
 
+from ..services.auth import AuthenticatedClient, get_current_client
+from ..services.wheelhouse import (
+    BuildOutcome,
+    InvalidBuildRequest,
+    WheelhouseBuild,
+    WheelhouseBuilder,
+    WheelhouseBusy,
+    parse_build_spec,
+)
+
 router = APIRouter()
 
 
@@ -12,6 +22,10 @@ class WheelhouseEntry(BaseModel):
     created_at: datetime
     status: str
     artifacts: list[str]
+    requirement: str | None = None
+    cache_key: str | None = None
+    signed: bool | None = None
+    error: str | None = None
 
 
 class WheelhouseListResponse(BaseModel):
@@ -25,24 +39,35 @@ class WheelhouseBuildRequest(BaseModel):
 
 
 class WheelhouseBuildResponse(BaseModel):
-    status: str
+    status: BuildOutcome = Field(
+        description="'cached' when stored artifacts were reused, 'coalesced' when joining an "
+        "identical build in progress, 'queued' when a new build started"
+    )
     run_id: str
+    cache_key: str
     submitted_at: datetime
 
 
-MOCK_ENTRIES: Iterable[WheelhouseEntry] = (
-    WheelhouseEntry(
-        id="wheelhouse-2024-10-01",
-        created_at=datetime(2024, 10, 1, 12, 0, tzinfo=timezone.utc),
-        status="verified",
-        artifacts=["openssl-3.1.7.whl", "libssl-attestation.json"],
-    ),
-)
+def get_wheelhouse_builder(request: Request) -> WheelhouseBuilder:
+    return request.app.state.wheelhouse_builder
 
 
 @router.get("/", response_model=WheelhouseListResponse, name="wheelhouse:list")
-async def list_wheelhouse() -> WheelhouseListResponse:
-    return WheelhouseListResponse(items=list(MOCK_ENTRIES))
+async def list_wheelhouse(
+    builder: Annotated[WheelhouseBuilder, Depends(get_wheelhouse_builder)],
+) -> WheelhouseListResponse:
+    return WheelhouseListResponse(items=[_entry(build) for build in builder.list_builds()])
+
+
+@router.get("/{run_id}", response_model=WheelhouseEntry, name="wheelhouse:get")
+async def get_wheelhouse(
+    run_id: str,
+    builder: Annotated[WheelhouseBuilder, Depends(get_wheelhouse_builder)],
+) -> WheelhouseEntry:
+    build = builder.get(run_id)
+    if build is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown wheelhouse")
+    return _entry(build)
 
 
 @router.post(
@@ -51,10 +76,39 @@ async def list_wheelhouse() -> WheelhouseListResponse:
     response_model=WheelhouseBuildResponse,
     name="wheelhouse:build",
 )
-async def build_wheelhouse(request: WheelhouseBuildRequest) -> WheelhouseBuildResponse:
-    run_id = f"wheelhouse-{request.target}-{int(datetime.now(timezone.utc).timestamp())}"
+async def build_wheelhouse(
+    request: WheelhouseBuildRequest,
+    builder: Annotated[WheelhouseBuilder, Depends(get_wheelhouse_builder)],
+    _: Annotated[AuthenticatedClient, Depends(get_current_client)],
+) -> WheelhouseBuildResponse:
+    try:
+        spec = parse_build_spec(request.target, request.extras, request.signed)
+        outcome, build = builder.submit(spec)
+    except InvalidBuildRequest as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except WheelhouseBusy as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": "5"},
+        ) from exc
+
     return WheelhouseBuildResponse(
-        status="queued",
-        run_id=run_id,
+        status=outcome,
+        run_id=build.id,
+        cache_key=build.cache_key,
         submitted_at=datetime.now(timezone.utc),
     )
+
+
+def _entry(build: WheelhouseBuild) -> WheelhouseEntry:
+    return WheelhouseEntry(
+        id=build.id,
+        created_at=build.created_at,
+        status=build.status,
+        artifacts=[artifact["name"] for artifact in build.artifacts],
+        requirement=build.requirement,
+        cache_key=build.cache_key,
+        signed=build.signed,
+        error=build.error,
+    )
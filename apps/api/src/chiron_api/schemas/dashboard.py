@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -37,6 +37,27 @@ class TelemetrySnapshotIn(BaseModel):
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
+class DashboardSocketCommand(BaseModel):
+    action: Literal["subscribe", "unsubscribe"]
+    topics: list[str] = Field(min_length=1)
+
+
+class IngestTicket(BaseModel):
+    ticket_id: str
+    status: str = "queued"
+    queued_at: datetime
+    queue_depth: int
+
+
+class IngestTicketStatus(BaseModel):
+    ticket_id: str
+    status: Literal["queued", "ingested", "failed"]
+    queued_at: datetime
+    finished_at: datetime | None = None
+    attempts: int = 0
+    error: str | None = None
+
+
 class HeroGateSummary(BaseModel):
     name: str
     score: int
@@ -64,5 +85,77 @@ class DashboardSummary(BaseModel):
     hero_gates: list[HeroGateSummary]
     timeline: list[TimelineEventSummary]
     metadata: dict[str, Any] = Field(default_factory=dict)
+    generation: int | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class GateHistoryPoint(BaseModel):
+    bucket_start: datetime
+    sample_count: int
+    score_min: int
+    score_max: int
+    score_avg: float
+    status_counts: dict[str, int] = Field(default_factory=dict)
+    throughput_avg: float | None = None
+    load_avg: float | None = None
+
+
+class GateHistory(BaseModel):
+    gate: str
+    # The resolution served, coarser than the requested one when that tier's retention
+    # does not reach back to ``start``.
+    resolution: str
+    requested_resolution: str | None = None
+    tier: str
+    start: datetime
+    end: datetime
+    points: list[GateHistoryPoint]
+
+
+class TelemetrySampleOut(BaseModel):
+    id: int
+    gate: str
+    score: int
+    status: str
+    metrics: dict[str, Any] = Field(default_factory=dict)
+    recorded_at: datetime
+
+
+class TelemetrySamplePage(BaseModel):
+    samples: list[TelemetrySampleOut]
+    next_cursor: str | None = None
+
+
+class AnomalyPoint(BaseModel):
+    recorded_at: datetime
+    score: int
+    z_score: float
+
+
+class GateAnalytics(BaseModel):
+    gate: str
+    baseline: int
+    sample_count: int
+    mean: float
+    std: float
+    p50: float
+    p95: float
+    p99: float
+    ewma: float
+    anomaly_count: int
+    anomalies: list[AnomalyPoint] = Field(default_factory=list)
+    breach_count: int
+    breach_seconds: float
+    longest_breach_seconds: float
+
+
+class DashboardAnalytics(BaseModel):
+    window: str
+    start: datetime
+    end: datetime
+    generated_at: datetime
+    generation: int | None = None
+    alpha: float
+    z_threshold: float
+    gates: list[GateAnalytics]
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from logging import getLogger
+from time import perf_counter
+from typing import Any
+
+from opentelemetry import metrics
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState, Session
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config import AdmissionGroup, AppConfig
+
+logger = getLogger(__name__)
+
+_meter = metrics.get_meter(__name__)
+_rejections = _meter.create_counter(
+    "chiron.admission.rejected",
+    description="Requests shed by admission control",
+)
+_loop_lag = _meter.create_histogram(
+    "chiron.admission.loop_lag",
+    unit="ms",
+    description="Event loop scheduling delay observed by the admission monitor",
+)
+_pool_wait = _meter.create_histogram(
+    "chiron.admission.pool_wait",
+    unit="ms",
+    description="Time a session's first statement waited for a pooled connection",
+)
+
+# Pressure level at which each priority starts being shed; critical traffic never is.
+_SHED_LEVELS = {"low": 1, "normal": 2}
+
+# Set by a session's first statement, which is about to check a connection out of the pool.
+_checkout_started: ContextVar[float | None] = ContextVar("chiron_checkout_started", default=None)
+
+_WS_TRY_AGAIN_LATER = 1013
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, group: str, reason: str, retry_after: int) -> None:
+        super().__init__(f"Service busy ({reason}); retry later")
+        self.group = group
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(slots=True)
+class _PoolState:
+    engine: AsyncEngine
+    max_wait: float
+    listener: Any
+    wait: float = 0.0
+    window_wait: float = 0.0
+
+
+@dataclass(slots=True)
+class _GroupState:
+    name: str
+    config: AdmissionGroup
+    slots: asyncio.Semaphore | None
+    methods: frozenset[str] | None
+    in_flight: int = 0
+    queued: int = 0
+    admitted: int = 0
+    rejected: int = 0
+
+
+class AdmissionController:
+    """Decides whether requests are admitted, queued or shed.
+
+    Requests are matched to a route group by longest path prefix, among the groups that
+    apply to the request's method (WebSocket handshakes count as ``GET``). A group with
+    ``max_in_flight`` queues up to ``max_queue`` requests for at most
+    ``queue_timeout_seconds`` once it is full and rejects the rest. Independently, the
+    controller derives a pressure level from event loop lag and connection pool checkout
+    wait: at level 1 (a signal over its limit) ``low`` groups are shed, at level 2 (a signal
+    over twice its limit) ``normal`` groups too. Both signals are sampled every
+    ``admission_sample_interval_seconds``, so pressure clears once the backlog drains.
+
+    Checkout wait is measured per instrumented pool against that pool's own limit, so a
+    pool where waiting is the design (SQLite's single writer) can be given a higher one
+    than the pools whose waits mean the database is falling behind.
+    """
+
+    def __init__(self, config: AppConfig) -> None:
+        self.enabled = config.admission_enabled
+        self._max_loop_lag = config.admission_max_loop_lag_ms / 1000
+        self._max_pool_wait = config.admission_max_pool_wait_ms / 1000
+        self._interval = config.admission_sample_interval_seconds
+        self._groups = {
+            name: _GroupState(
+                name=name,
+                config=group,
+                slots=(
+                    asyncio.Semaphore(group.max_in_flight)
+                    if group.max_in_flight is not None
+                    else None
+                ),
+                methods=(
+                    frozenset(method.upper() for method in group.methods)
+                    if group.methods is not None
+                    else None
+                ),
+            )
+            for name, group in config.admission_groups.items()
+        }
+        self._routes = sorted(
+            (
+                (prefix, state)
+                for state in self._groups.values()
+                for prefix in state.config.prefixes
+            ),
+            key=lambda route: len(route[0]),
+            reverse=True,
+        )
+        self.loop_lag = 0.0
+        self._pools: dict[str, _PoolState] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pool_wait(self) -> float:
+        """Worst checkout wait over the last sample interval, across all pools."""
+        return max((pool.wait for pool in self._pools.values()), default=0.0)
+
+    def instrument(
+        self,
+        engine: AsyncEngine,
+        name: str = "primary",
+        *,
+        max_pool_wait_ms: float | None = None,
+    ) -> None:
+        """Start measuring checkout wait on ``engine``'s pool.
+
+        ``max_pool_wait_ms`` overrides ``admission_max_pool_wait_ms`` for this pool.
+        """
+        max_wait = self._max_pool_wait if max_pool_wait_ms is None else max_pool_wait_ms / 1000
+        listener = partial(self._on_checkout, name)
+        self._pools[name] = _PoolState(engine=engine, max_wait=max_wait, listener=listener)
+        event.listen(engine.sync_engine, "checkout", listener)
+        if not event.contains(Session, "do_orm_execute", _mark_checkout):
+            event.listen(Session, "do_orm_execute", _mark_checkout)
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="admission-monitor")
+
+    async def stop(self) -> None:
+        for pool in self._pools.values():
+            event.remove(pool.engine.sync_engine, "checkout", pool.listener)
+        self._pools.clear()
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def match(self, path: str, method: str = "GET") -> _GroupState | None:
+        for prefix, state in self._routes:
+            if path.startswith(prefix) and (state.methods is None or method in state.methods):
+                return state
+        return None
+
+    def pressure(self) -> int:
+        ratio = max(
+            (pool.wait / pool.max_wait for pool in self._pools.values() if pool.max_wait > 0),
+            default=0.0,
+        )
+        if self._max_loop_lag > 0:
+            ratio = max(ratio, self.loop_lag / self._max_loop_lag)
+        return 2 if ratio >= 2 else 1 if ratio >= 1 else 0
+
+    async def acquire(self, group: _GroupState) -> None:
+        """Admit a request to ``group`` (release it with :meth:`release`) or raise."""
+        shed_level = _SHED_LEVELS.get(group.config.priority)
+        if shed_level is not None and self.pressure() >= shed_level:
+            self._reject(group, "overloaded")
+
+        slots = group.slots
+        if slots is not None:
+            if slots.locked():
+                timeout = group.config.queue_timeout_seconds
+                if group.queued >= group.config.max_queue or timeout <= 0:
+                    self._reject(group, "busy")
+                group.queued += 1
+                try:
+                    await asyncio.wait_for(slots.acquire(), timeout)
+                except TimeoutError:
+                    self._reject(group, "busy")
+                finally:
+                    group.queued -= 1
+            else:
+                await slots.acquire()
+        group.in_flight += 1
+        group.admitted += 1
+
+    def release(self, group: _GroupState) -> None:
+        group.in_flight -= 1
+        if group.slots is not None:
+            group.slots.release()
+
+    def observe_pool_wait(self, seconds: float, name: str = "primary") -> None:
+        pool = self._pools.get(name)
+        if pool is None:
+            return
+        pool.wait = max(pool.wait, seconds)
+        pool.window_wait = max(pool.window_wait, seconds)
+        _pool_wait.record(seconds * 1000, {"pool": name})
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pressure": self.pressure(),
+            "loop_lag_ms": round(self.loop_lag * 1000, 3),
+            "pool_wait_ms": round(self.pool_wait * 1000, 3),
+            "limits": {
+                "loop_lag_ms": self._max_loop_lag * 1000,
+                "pool_wait_ms": self._max_pool_wait * 1000,
+            },
+            "pools": {name: _pool_status(pool) for name, pool in self._pools.items()},
+            "groups": {
+                name: {
+                    "priority": state.config.priority,
+                    "in_flight": state.in_flight,
+                    "queued": state.queued,
+                    "max_in_flight": state.config.max_in_flight,
+                    "max_queue": state.config.max_queue,
+                    "admitted": state.admitted,
+                    "rejected": state.rejected,
+                }
+                for name, state in self._groups.items()
+            },
+        }
+
+    def _reject(self, group: _GroupState, reason: str) -> None:
+        group.rejected += 1
+        _rejections.add(1, {"group": group.name, "reason": reason})
+        raise AdmissionRejected(group.name, reason, group.config.retry_after_seconds)
+
+    def _on_checkout(self, name: str, *_: Any) -> None:
+        started = _checkout_started.get()
+        if started is not None:
+            _checkout_started.set(None)
+            self.observe_pool_wait(perf_counter() - started, name)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self._interval)
+            self.loop_lag = max(0.0, loop.time() - started - self._interval)
+            _loop_lag.record(self.loop_lag * 1000)
+            # Report the worst wait of the last interval only, so pressure decays when idle.
+            for pool in self._pools.values():
+                pool.wait, pool.window_wait = pool.window_wait, 0.0
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an :class:`AdmissionController` to HTTP and WebSocket traffic.
+
+    Shed HTTP requests get ``503`` with ``Retry-After``; shed WebSocket handshakes are
+    closed with code 1013 (try again later). Slots are held until the response, including
+    any streamed body, has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self._controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = self._controller
+        group = None
+        if controller.enabled and scope["type"] in ("http", "websocket"):
+            group = controller.match(scope["path"], scope.get("method", "GET"))
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await controller.acquire(group)
+        except AdmissionRejected as exc:
+            logger.debug(
+                "Request shed by admission control",
+                extra={"group": exc.group, "reason": exc.reason, "path": scope["path"]},
+            )
+            if scope["type"] == "websocket":
+                await send({"type": "websocket.close", "code": _WS_TRY_AGAIN_LATER})
+                return
+            response = JSONResponse(
+                {"detail": str(exc)},
+                status_code=503,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(group)
+
+
+def _pool_status(state: _PoolState) -> dict[str, float]:
+    pool = state.engine.sync_engine.pool
+    status: dict[str, float] = {}
+    for name in ("size", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            status[name] = method()
+    status["wait_ms"] = round(state.wait * 1000, 3)
+    status["max_wait_ms"] = state.max_wait * 1000
+    return status
+
+
+def _mark_checkout(state: ORMExecuteState) -> None:
+    if not state.session.in_transaction():
+        _checkout_started.set(perf_counter())
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionMiddleware",
+    "AdmissionRejected",
+]
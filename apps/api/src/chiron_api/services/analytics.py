@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from logging import getLogger
+from time import monotonic
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import HeroGate, TelemetrySample
+from ..schemas.dashboard import AnomalyPoint, DashboardAnalytics, GateAnalytics
+from .rollups import GateNotFound, parse_resolution
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = getLogger(__name__)
+
+# Most recent anomalies listed per gate; anomaly_count still covers the whole window.
+MAX_ANOMALIES_PER_GATE = 20
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """Raised when the optional NumPy dependency is not installed."""
+
+
+class GateAnalyticsService:
+    """Computes per-gate score statistics over a trailing window of samples.
+
+    Results are memoised by ``(window, gates, alpha, z_threshold, generation)``. The summary
+    generation changes with every ingest, so cached results are reused only while no new
+    samples have arrived; ``cache_ttl_seconds`` bounds how far the window may slide and how
+    long writes from other processes can go unnoticed.
+    """
+
+    def __init__(self, *, cache_size: int = 64, cache_ttl_seconds: float = 30.0) -> None:
+        self._cache: OrderedDict[tuple[Any, ...], tuple[float, DashboardAnalytics]] = OrderedDict()
+        self._cache_size = max(0, cache_size)
+        self._cache_ttl = cache_ttl_seconds
+
+    async def get_analytics(
+        self,
+        session: AsyncSession,
+        *,
+        window: str,
+        gates: Sequence[str] = (),
+        alpha: float = 0.3,
+        z_threshold: float = 3.0,
+        generation: int | None = None,
+    ) -> DashboardAnalytics:
+        if np is None:
+            raise AnalyticsUnavailable("Install the 'analytics' extra (numpy) to enable analytics")
+
+        width = parse_resolution(window)
+        key = (window, tuple(sorted({name.lower() for name in gates})), alpha, z_threshold)
+        if generation is not None:
+            cached = self._cache_get((*key, generation))
+            if cached is not None:
+                return cached
+
+        end = datetime.now(timezone.utc)
+        start = end - width
+        gate_rows = await self._load_gates(session, key[1])
+        samples = await self._load_samples(session, list(gate_rows), start, end)
+        gate_analytics = await asyncio.to_thread(
+            _compute, gate_rows, samples, end.timestamp(), alpha, z_threshold
+        )
+
+        result = DashboardAnalytics(
+            window=window,
+            start=start,
+            end=end,
+            generated_at=datetime.now(timezone.utc),
+            generation=generation,
+            alpha=alpha,
+            z_threshold=z_threshold,
+            gates=gate_analytics,
+        )
+        if generation is not None:
+            self._cache_put((*key, generation), result)
+        return result
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _cache_get(self, key: tuple[Any, ...]) -> DashboardAnalytics | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if monotonic() - stored_at > self._cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: tuple[Any, ...], result: DashboardAnalytics) -> None:
+        if not self._cache_size:
+            return
+        self._cache[key] = (monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    async def _load_gates(
+        session: AsyncSession, gates: tuple[str, ...]
+    ) -> dict[int, tuple[str, int]]:
+        stmt = select(HeroGate.id, HeroGate.name, HeroGate.baseline_score).order_by(
+            HeroGate.name.asc()
+        )
+        if gates:
+            stmt = stmt.where(func.lower(HeroGate.name).in_(gates))
+        rows = {
+            gate_id: (name, baseline) for gate_id, name, baseline in await session.execute(stmt)
+        }
+
+        missing = set(gates) - {name.lower() for name, _ in rows.values()}
+        if missing:
+            raise GateNotFound(", ".join(sorted(missing)))
+        return rows
+
+    @staticmethod
+    async def _load_samples(
+        session: AsyncSession, gate_ids: list[int], start: datetime, end: datetime
+    ) -> Any:
+        result = await session.execute(
+            select(TelemetrySample.gate_id, TelemetrySample.score, TelemetrySample.recorded_at)
+            .where(
+                TelemetrySample.gate_id.in_(gate_ids),
+                TelemetrySample.recorded_at >= start,
+                TelemetrySample.recorded_at < end,
+            )
+            .order_by(TelemetrySample.gate_id.asc(), TelemetrySample.recorded_at.asc())
+        )
+        rows = result.all()
+        return (
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)),
+            np.fromiter((_epoch(row[2]) for row in rows), dtype=np.float64, count=len(rows)),
+        )
+
+
+def _compute(
+    gate_rows: dict[int, tuple[str, int]],
+    samples: Any,
+    end_ts: float,
+    alpha: float,
+    z_threshold: float,
+) -> list[GateAnalytics]:
+    gate_ids, scores, times = samples
+    # Rows are sorted by gate, so each gate is one contiguous slice.
+    boundaries = np.flatnonzero(np.diff(gate_ids)) + 1
+    slices = {
+        int(gate_ids[offset]): slice(offset, stop)
+        for offset, stop in zip(np.r_[0, boundaries], np.r_[boundaries, len(gate_ids)], strict=True)
+        if offset < stop
+    }
+
+    analytics: list[GateAnalytics] = []
+    for gate_id, (name, baseline) in gate_rows.items():
+        window = slices.get(gate_id)
+        if window is None:
+            continue
+        analytics.append(
+            _gate_analytics(
+                name, baseline, scores[window], times[window], end_ts, alpha, z_threshold
+            )
+        )
+    return analytics
+
+
+def _gate_analytics(
+    name: str,
+    baseline: int,
+    scores: Any,
+    times: Any,
+    end_ts: float,
+    alpha: float,
+    z_threshold: float,
+) -> GateAnalytics:
+    count = len(scores)
+    mean = float(scores.mean())
+    std = float(scores.std())
+    p50, p95, p99 = np.percentile(scores, [50, 95, 99])
+
+    # Closed form of the recursive EWMA seeded with the first sample.
+    weights = alpha * (1 - alpha) ** np.arange(count - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (count - 1)
+    ewma = float(weights @ scores)
+
+    anomalies: list[AnomalyPoint] = []
+    anomaly_count = 0
+    if std > 0:
+        z_scores = (scores - mean) / std
+        flagged = np.flatnonzero(np.abs(z_scores) >= z_threshold)
+        anomaly_count = len(flagged)
+        anomalies = [
+            AnomalyPoint(
+                recorded_at=datetime.fromtimestamp(times[index], timezone.utc),
+                score=int(scores[index]),
+                z_score=round(float(z_scores[index]), 3),
+            )
+            for index in flagged[-MAX_ANOMALIES_PER_GATE:]
+        ]
+
+    # Each sample holds until the next one (or the end of the window).
+    durations = np.diff(times, append=end_ts)
+    breached = scores < baseline
+    breach_starts = breached & ~np.r_[False, breached[:-1]]
+    breach_count = int(breach_starts.sum())
+    breach_seconds = float(durations[breached].sum())
+    longest_breach = 0.0
+    if breach_count:
+        run_ids = np.cumsum(breach_starts)[breached]
+        longest_breach = float(np.bincount(run_ids, weights=durations[breached]).max())
+
+    return GateAnalytics(
+        gate=name,
+        baseline=baseline,
+        sample_count=count,
+        mean=round(mean, 3),
+        std=round(std, 3),
+        p50=round(float(p50), 3),
+        p95=round(float(p95), 3),
+        p99=round(float(p99), 3),
+        ewma=round(ewma, 3),
+        anomaly_count=anomaly_count,
+        anomalies=anomalies,
+        breach_count=breach_count,
+        breach_seconds=round(breach_seconds, 3),
+        longest_breach_seconds=round(longest_breach, 3),
+    )
+
+
+def _epoch(moment: datetime) -> float:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+__all__ = [
+    "MAX_ANOMALIES_PER_GATE",
+    "AnalyticsUnavailable",
+    "GateAnalyticsService",
+]
@@ -1,29 +1,114 @@
 from __future__ import annotations
 
+import asyncio
 import hmac
 import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from hashlib import sha256
 from logging import getLogger
+from time import monotonic
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from opentelemetry import metrics
+from redis.asyncio import Redis
+from sqlalchemy import bindparam, case, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ..config import AppConfig, get_config
 from ..db.models import ApiClient
-from ..db.session import get_async_session
+from ..db.session import get_session_factory
 
 logger = getLogger(__name__)
 
 _security = HTTPBearer(auto_error=False)
 
+# Pub/sub channel carrying the ids of deactivated clients to every worker's cache.
+INVALIDATION_CHANNEL = "chiron:auth:invalidate"
+_RECONNECT_DELAY_SECONDS = 1.0
+
+# Built once so lookups reuse the memoised cache key and compiled statement.
+_ACTIVE_CLIENT_QUERY = select(ApiClient).where(
+    ApiClient.token_hash == bindparam("token_hash"),
+    ApiClient.is_active.is_(True),
+)
+
+_meter = metrics.get_meter(__name__)
+_cache_lookups = _meter.create_counter(
+    "chiron.auth.cache_lookups",
+    description="API token lookups served from (hit) or missing in (miss) the auth cache",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class AuthenticatedClient:
+    id: str
+    name: str
+    scopes: tuple[str, ...]
+    is_active: bool
+
 
 class AuthService:
-    def __init__(self, config: AppConfig) -> None:
+    """Hashes and verifies API tokens.
+
+    When built with a session factory, verified clients are cached by token hash (LRU,
+    bounded by ``auth_cache_size`` and ``auth_cache_ttl_seconds``) and ``last_used_at``
+    is written behind: uses are collected in memory and flushed as one ``UPDATE`` every
+    ``auth_touch_interval_seconds`` by the task started with :meth:`start`. Deactivating a
+    client through :meth:`deactivate_client` evicts it at once. With Redis, the client id is
+    also published on ``chiron:auth:invalidate`` and every process evicts it on receipt; a
+    process whose subscription drops clears its whole cache when it resubscribes, since it
+    may have missed invalidations. Without Redis, other processes notice within the TTL.
+
+    While uses are written behind, :meth:`authenticate_token` looks clients up through
+    ``read_session_factory``, so a cache miss never waits for (or takes) the write lock.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        *,
+        read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+        redis_client: Redis | None = None,
+    ) -> None:
         self._config = config
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory or session_factory
+        self._redis = redis_client
+        self._cache: OrderedDict[str, tuple[float, AuthenticatedClient]] = OrderedDict()
+        self._cache_size = max(0, config.auth_cache_size)
+        self._cache_ttl = config.auth_cache_ttl_seconds
+        self._touch_interval = config.auth_touch_interval_seconds
+        self._pending_touches: dict[str, datetime] = {}
+        # Bumped by every eviction, so a lookup that raced one does not re-cache its row.
+        self._invalidations = 0
+        self._task: asyncio.Task[None] | None = None
+        self._listener: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._session_factory is not None and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="auth-touch-flush")
+        if self._redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name="auth-invalidations")
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        if self._task is None:
+            return
+        self._task = None
+        await self.flush_touches()
 
     def hash_token(self, token: str) -> str:
         secret = self._config.auth_admin_secret.encode()
@@ -60,22 +145,155 @@ class AuthService:
 
     async def find_client_by_token(self, session: AsyncSession, token: str) -> ApiClient | None:
         token_hash = self.hash_token(token)
-        stmt = select(ApiClient).where(
-            ApiClient.token_hash == token_hash,
-            ApiClient.is_active.is_(True),
+        return await session.scalar(_ACTIVE_CLIENT_QUERY, {"token_hash": token_hash})
+
+    async def authenticate(self, session: AsyncSession, token: str) -> AuthenticatedClient | None:
+        """Resolve an active client for ``token`` and record the use."""
+        token_hash = self.hash_token(token)
+        client = self._cache_get(token_hash)
+        _cache_lookups.add(1, {"result": "hit" if client is not None else "miss"})
+        if client is None:
+            invalidations = self._invalidations
+            row = await session.scalar(_ACTIVE_CLIENT_QUERY, {"token_hash": token_hash})
+            if row is None:
+                return None
+            client = AuthenticatedClient(
+                id=row.id, name=row.name, scopes=tuple(row.scopes or ()), is_active=row.is_active
+            )
+            if invalidations == self._invalidations:
+                self._cache_put(token_hash, client)
+
+        used_at = datetime.now(timezone.utc)
+        if self._task is not None:
+            self._pending_touches[client.id] = used_at
+        else:
+            await session.execute(
+                update(ApiClient).where(ApiClient.id == client.id).values(last_used_at=used_at)
+            )
+            await session.commit()
+        return client
+
+    async def authenticate_token(self, token: str) -> AuthenticatedClient | None:
+        """Like :meth:`authenticate`, in a session of the service's own."""
+        if self._task is not None:
+            # Uses are recorded in memory, so the lookup is the only statement.
+            session_factory = self._read_session_factory
+        else:
+            session_factory = self._session_factory or get_session_factory()
+        async with session_factory() as session:
+            return await self.authenticate(session, token)
+
+    async def deactivate_client(self, session: AsyncSession, client_id: str) -> bool:
+        result = await session.execute(
+            update(ApiClient).where(ApiClient.id == client_id).values(is_active=False)
+        )
+        await session.commit()
+        self.invalidate_client(client_id)
+        if self._redis is not None:
+            try:
+                await self._redis.publish(INVALIDATION_CHANNEL, client_id)
+            except Exception as exc:  # pragma: no cover - Redis optional in dev
+                logger.warning(
+                    "Failed to broadcast API client invalidation",
+                    exc_info=exc,
+                    extra={"client_id": client_id},
+                )
+        if result.rowcount:
+            logger.info("API client deactivated", extra={"client_id": client_id})
+        return bool(result.rowcount)
+
+    def invalidate_client(self, client_id: str) -> None:
+        self._invalidations += 1
+        for token_hash, (_, client) in list(self._cache.items()):
+            if client.id == client_id:
+                del self._cache[token_hash]
+
+    def clear_cache(self) -> None:
+        self._invalidations += 1
+        self._cache.clear()
+
+    async def flush_touches(self) -> None:
+        """Write pending ``last_used_at`` values in a single ``UPDATE``."""
+        if not self._pending_touches or self._session_factory is None:
+            return
+
+        touches, self._pending_touches = self._pending_touches, {}
+        last_used_at = case(
+            {
+                client_id: literal(used_at, ApiClient.last_used_at.type)
+                for client_id, used_at in touches.items()
+            },
+            value=ApiClient.id,
         )
-        return await session.scalar(stmt)
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(ApiClient)
+                    .where(ApiClient.id.in_(touches))
+                    .values(last_used_at=last_used_at)
+                    .execution_options(synchronize_session=False)
+                )
+                await session.commit()
+        except Exception as exc:
+            logger.warning("Failed to record API client usage", exc_info=exc)
+            # Keep them for the next flush unless a newer use has been recorded since.
+            for client_id, used_at in touches.items():
+                self._pending_touches.setdefault(client_id, used_at)
 
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._touch_interval)
+            await self.flush_touches()
 
-def get_auth_service(config: Annotated[AppConfig, Depends(get_config)]) -> AuthService:
-    return AuthService(config)
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while unsubscribed was missed; start from an empty cache.
+                self.clear_cache()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate_client(str(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - Redis optional in dev
+                logger.warning("API client invalidation listener failed; retrying", exc_info=exc)
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _cache_get(self, token_hash: str) -> AuthenticatedClient | None:
+        entry = self._cache.get(token_hash)
+        if entry is None:
+            return None
+        stored_at, client = entry
+        if monotonic() - stored_at > self._cache_ttl:
+            del self._cache[token_hash]
+            return None
+        self._cache.move_to_end(token_hash)
+        return client
+
+    def _cache_put(self, token_hash: str, client: AuthenticatedClient) -> None:
+        if not self._cache_size:
+            return
+        self._cache[token_hash] = (monotonic(), client)
+        self._cache.move_to_end(token_hash)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+
+def get_auth_service(
+    request: Request, config: Annotated[AppConfig, Depends(get_config)]
+) -> AuthService:
+    service: AuthService | None = getattr(request.app.state, "auth_service", None)
+    return service if service is not None else AuthService(config)
 
 
 async def get_current_client(
     request: Request,
-    session: Annotated[AsyncSession, Depends(get_async_session)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
-) -> ApiClient:
+) -> AuthenticatedClient:
     credentials: HTTPAuthorizationCredentials | None = await _security(request)
     token: str | None = None
 
@@ -87,10 +305,15 @@ async def get_current_client(
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing credentials")
 
-    client = await auth_service.find_client_by_token(session, token)
+    client = await auth_service.authenticate_token(token)
     if client is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-
-    client.last_used_at = datetime.now(timezone.utc)
-    await session.commit()
     return client
+
+
+__all__ = [
+    "AuthService",
+    "AuthenticatedClient",
+    "get_auth_service",
+    "get_current_client",
+]
@@ -2,12 +2,23 @@ from __future__ import annotations
 
 from logging import getLogger
 
-from sqlalchemy import select
+from sqlalchemy import Column, bindparam, inspect, select, text
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex
 
 from ..config import AppConfig
-from ..db.models import ApiClient, Base, HeroGate
+from ..db.models import (
+    ApiClient,
+    Base,
+    GateLatest,
+    TelemetrySample,
+    hero_gate_name_lower_index,
+    utcnow,
+)
+from ..db.postgres import get_sample_store
 from ..db.session import (
+    enable_sqlite_incremental_vacuum,
     get_session_factory,
     init_engine_and_session,
     run_schema_migrations,
@@ -19,33 +30,47 @@ from ..schemas.dashboard import (
     TimelineEventPayload,
 )
 from .auth import AuthService
+from .gate_registry import get_gate_registry
 from .telemetry import TelemetryRepository
 
 logger = getLogger(__name__)
 
+_CLIENT_BY_TOKEN_QUERY = select(ApiClient).where(ApiClient.token_hash == bindparam("token_hash"))
+_ANY_GATE_LATEST_QUERY = select(GateLatest.gate_id).limit(1)
+_ANY_SAMPLE_QUERY = select(TelemetrySample.id).limit(1)
+
 
 async def bootstrap_application(config: AppConfig) -> None:
     """Prepare database schema and ensure seed data is present."""
 
     init_engine_and_session(config)
+    if config.sqlite_incremental_vacuum:
+        await enable_sqlite_incremental_vacuum()
     await run_schema_migrations(Base.metadata)
 
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        await _ensure_gate_name_index(session)
+        await _add_missing_columns(
+            session, [TelemetrySample.__table__.c.trend_packed, GateLatest.__table__.c.trend_packed]
+        )
+        await _prepare_sample_partitions(session)
+        await _backfill_gate_latest(session)
+        await get_gate_registry().warm(session)
+
     if not config.seed_demo_data:
         return
 
-    session_factory = get_session_factory()
     async with session_factory() as session:
-        repo = TelemetryRepository(session)
+        repo = TelemetryRepository(session, pack_trends=config.pack_trends)
 
-        existing_gates = await session.scalar(select(HeroGate.id))
-        if existing_gates is None:
+        if not len(get_gate_registry()):
             await repo.ingest_snapshot(_demo_snapshot())
 
         if config.default_api_token:
             auth_service = AuthService(config)
             token_hash = auth_service.hash_token(config.default_api_token)
-            stmt = select(ApiClient).where(ApiClient.token_hash == token_hash)
-            client = await session.scalar(stmt)
+            client = await session.scalar(_CLIENT_BY_TOKEN_QUERY, {"token_hash": token_hash})
             if client is None:
                 client = ApiClient(
                     name="Local development",
@@ -60,6 +85,69 @@ async def bootstrap_application(config: AppConfig) -> None:
                     await session.rollback()
 
 
+async def _ensure_gate_name_index(session: AsyncSession) -> None:
+    """Add the case-insensitive gate name index to databases created without it."""
+    try:
+        await session.execute(CreateIndex(hero_gate_name_lower_index, if_not_exists=True))
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        logger.warning(
+            "Gate names differing only by case exist; skipping the lower(name) unique index"
+        )
+
+
+async def _add_missing_columns(session: AsyncSession, columns: list[Column]) -> None:
+    """Add nullable columns introduced after a table was first created."""
+    connection = await session.connection()
+    for column in columns:
+        table_name = column.table.name
+        existing = await connection.run_sync(
+            lambda sync_connection, table_name=table_name: {
+                info["name"] for info in inspect(sync_connection).get_columns(table_name)
+            }
+        )
+        if column.name in existing:
+            continue
+
+        column_type = column.type.compile(dialect=connection.dialect)
+        await connection.execute(
+            text(f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}")
+        )
+        logger.info("Added missing column", extra={"table": table_name, "column": column.name})
+    await session.commit()
+
+
+async def _prepare_sample_partitions(session: AsyncSession) -> None:
+    """Create the current and look-ahead partitions of a partitioned PostgreSQL sample table."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+
+    store = get_sample_store()
+    partitioned = await store.is_partitioned(session)
+    # Partitions are created on a connection of their own; release the session's first.
+    await session.commit()
+    if partitioned:
+        now = utcnow()
+        await store.ensure_partitions(session.bind, now, now)
+    elif store.partition_samples:
+        logger.warning(
+            "telemetry_samples was created before partitioning was enabled and stays "
+            "unpartitioned; migrate it manually to use partition retention"
+        )
+
+
+async def _backfill_gate_latest(session: AsyncSession) -> None:
+    """Populate ``gate_latest`` for databases created before the table existed."""
+    if await session.scalar(_ANY_GATE_LATEST_QUERY) is not None:
+        return
+    if await session.scalar(_ANY_SAMPLE_QUERY) is None:
+        return
+
+    gate_count = await TelemetryRepository(session).rebuild_gate_latest()
+    logger.info("Backfilled gate_latest from telemetry samples", extra={"gate_count": gate_count})
+
+
 def _demo_snapshot() -> TelemetrySnapshotIn:
     return TelemetrySnapshotIn(
         hero_gates=[
@@ -0,0 +1,82 @@
+"""JSON Patch (RFC 6902) diffs between consecutive dashboard summaries."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+Patch = list[dict[str, Any]]
+
+
+def summary_patch(previous: dict[str, Any], current: dict[str, Any]) -> Patch:
+    """Return operations turning ``previous`` into ``current`` (both ``model_dump(mode="json")``).
+
+    Gates that changed are replaced individually and new gates are inserted at their sorted
+    position; new timeline entries are added at the head and expired ones removed from the
+    tail. Anything else falls back to replacing the whole member.
+    """
+    ops: Patch = []
+    for key, value in current.items():
+        if key not in previous:
+            ops.append({"op": "add", "path": f"/{key}", "value": value})
+        elif key == "hero_gates":
+            ops.extend(_gate_ops(previous[key], value))
+        elif key == "timeline":
+            ops.extend(_timeline_ops(previous[key], value))
+        elif previous[key] != value:
+            ops.append({"op": "replace", "path": f"/{key}", "value": value})
+    for key in previous.keys() - current.keys():
+        ops.append({"op": "remove", "path": f"/{key}"})
+    return ops
+
+
+def _gate_ops(previous: list[dict[str, Any]], current: list[dict[str, Any]]) -> Patch:
+    previous_by_name = {gate["name"]: gate for gate in previous}
+    current_names = [gate["name"] for gate in current]
+    kept = [name for name in current_names if name in previous_by_name]
+    if len(kept) != len(previous) or kept != [gate["name"] for gate in previous]:
+        # Gates were removed or reordered; not worth expressing as individual moves.
+        return [{"op": "replace", "path": "/hero_gates", "value": current}]
+
+    ops: Patch = []
+    # Insert in ascending index order so each index is valid once earlier adds applied.
+    for index, gate in enumerate(current):
+        if gate["name"] not in previous_by_name:
+            ops.append({"op": "add", "path": f"/hero_gates/{index}", "value": gate})
+    for index, gate in enumerate(current):
+        old = previous_by_name.get(gate["name"])
+        if old is not None and old != gate:
+            ops.append({"op": "replace", "path": f"/hero_gates/{index}", "value": gate})
+    return ops
+
+
+def timeline_additions(previous: Sequence[Any], current: Sequence[Any]) -> int:
+    """Number of entries at the head of ``current`` that are not in ``previous``.
+
+    The timeline is newest first and capped, so new events push old ones off the tail and
+    the rest of ``current`` is a prefix of ``previous``.
+    """
+    for added in range(len(current)):
+        retained = current[added:]
+        if previous[: len(retained)] == retained:
+            return added
+    return len(current)
+
+
+def _timeline_ops(previous: list[dict[str, Any]], current: list[dict[str, Any]]) -> Patch:
+    if previous == current:
+        return []
+
+    added = timeline_additions(previous, current)
+    ops: Patch = [
+        {"op": "add", "path": f"/timeline/{index}", "value": current[index]}
+        for index in range(added)
+    ]
+    ops.extend(
+        {"op": "remove", "path": f"/timeline/{index}"}
+        for index in range(len(previous) + added - 1, len(current) - 1, -1)
+    )
+    return ops
+
+
+__all__ = ["Patch", "summary_patch", "timeline_additions"]
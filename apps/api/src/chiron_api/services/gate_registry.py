@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from logging import getLogger
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import HeroGate
+
+logger = getLogger(__name__)
+
+_GATE_ENTRIES_QUERY = select(HeroGate.id, HeroGate.name)
+
+
+@dataclass(frozen=True, slots=True)
+class GateEntry:
+    id: int
+    name: str
+
+
+class GateRegistry:
+    """Process-wide cache mapping normalised gate names to their database rows.
+
+    Gate names are case-insensitive. The registry is warmed at startup and updated as
+    ingest creates gates, so steady-state ingest resolves ids without querying
+    ``hero_gates``. Only the immutable id and stored name are cached; mutable columns such
+    as the baseline are always read from or written to the database. Call
+    :meth:`invalidate` if another process may have deleted or recreated a gate.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, GateEntry] = {}
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.lower()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str) -> GateEntry | None:
+        return self._entries.get(self.normalize(name))
+
+    def register(self, entries: Iterable[GateEntry]) -> None:
+        with self._lock:
+            for entry in entries:
+                self._entries[self.normalize(entry.name)] = entry
+
+    def invalidate(self, name: str | None = None) -> None:
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.normalize(name), None)
+
+    async def warm(self, session: AsyncSession) -> int:
+        result = await session.execute(_GATE_ENTRIES_QUERY)
+        entries = {
+            self.normalize(name): GateEntry(id=gate_id, name=name) for gate_id, name in result
+        }
+        with self._lock:
+            self._entries = entries
+        logger.info("Gate registry warmed", extra={"gate_count": len(entries)})
+        return len(entries)
+
+
+_registry = GateRegistry()
+
+
+def get_gate_registry() -> GateRegistry:
+    return _registry
+
+
+__all__ = ["GateEntry", "GateRegistry", "get_gate_registry"]
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
+from time import perf_counter
+from uuid import uuid4
+
+from opentelemetry import metrics
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.models import utcnow
+from ..schemas.dashboard import (
+    DashboardSummary,
+    IngestTicket,
+    IngestTicketStatus,
+    TelemetrySnapshotIn,
+)
+from .streaming import TelemetryStreamBroker
+from .summary import DashboardSummaryState
+from .telemetry import TelemetryRepository
+
+logger = getLogger(__name__)
+
+_meter = metrics.get_meter(__name__)
+_queue_depth = _meter.create_up_down_counter(
+    "chiron.ingest.queue_depth",
+    description="Snapshots waiting in the write-behind ingest queue",
+)
+_flush_latency = _meter.create_histogram(
+    "chiron.ingest.flush_latency",
+    unit="ms",
+    description="Time spent persisting and publishing one ingest batch",
+)
+_batch_size = _meter.create_histogram(
+    "chiron.ingest.batch_size",
+    description="Snapshots coalesced into one ingest transaction",
+)
+_failed_snapshots = _meter.create_counter(
+    "chiron.ingest.failed_snapshots",
+    description="Acknowledged snapshots that could not be ingested after retrying",
+)
+
+
+class IngestQueueFull(RuntimeError):
+    """Raised when the write-behind queue cannot accept more snapshots."""
+
+
+class IngestQueueClosed(RuntimeError):
+    """Raised when a snapshot is submitted after the queue started draining."""
+
+
+@dataclass(slots=True)
+class _PendingSnapshot:
+    ticket: IngestTicket
+    snapshot: TelemetrySnapshotIn
+    status: IngestTicketStatus
+
+
+_STOP = object()
+
+
+class TelemetryIngestQueue:
+    """Write-behind queue coalescing telemetry snapshots into batched transactions.
+
+    A batch failing on a connection or pool error is retried ``flush_retries`` times with
+    exponential backoff. A batch failing on anything else (say, one snapshot violating a
+    constraint) is retried one snapshot per transaction, so only the offending snapshots
+    are lost. Each ticket's outcome, including the error of a snapshot that could not be
+    ingested, is readable through :meth:`ticket_status` on the worker that issued it.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        broker: TelemetryStreamBroker | None,
+        *,
+        summary_state: DashboardSummaryState | None = None,
+        max_size: int = 1000,
+        batch_size: int = 50,
+        flush_interval_ms: int = 100,
+        flush_retries: int = 3,
+        retry_backoff_ms: int = 100,
+        ticket_history: int = 10_000,
+        pack_trends: bool = False,
+    ) -> None:
+        self._session_factory = session_factory
+        self._broker = broker
+        self._summary_state = summary_state
+        self._pack_trends = pack_trends
+        self._queue: asyncio.Queue[_PendingSnapshot | object] = asyncio.Queue(maxsize=max_size)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0, flush_interval_ms) / 1000
+        self._flush_retries = max(0, flush_retries)
+        self._retry_backoff = max(0, retry_backoff_ms) / 1000
+        # Queued tickets plus the most recently finished ones, oldest first.
+        self._tickets: OrderedDict[str, IngestTicketStatus] = OrderedDict()
+        self._ticket_limit = max_size + max(0, ticket_history)
+        self._task: asyncio.Task[None] | None = None
+        self._closed = False
+        self._last_queued_at: datetime | None = None
+        self._flushed_batches = 0
+        self._flushed_snapshots = 0
+        self._failed_snapshots = 0
+        self._retried_batches = 0
+        self._last_flush_ms: float | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="telemetry-ingest-flusher")
+
+    async def stop(self) -> None:
+        """Stop accepting snapshots and wait until everything queued has been flushed."""
+        if self._task is None:
+            return
+
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        logger.info("Telemetry ingest queue drained", extra=self.stats())
+
+    def submit(self, snapshot: TelemetrySnapshotIn) -> IngestTicket:
+        if self._closed:
+            raise IngestQueueClosed("Ingest queue is shutting down")
+
+        queued_at = self._next_timestamp()
+        ticket = IngestTicket(
+            ticket_id=uuid4().hex,
+            queued_at=queued_at,
+            queue_depth=self._queue.qsize() + 1,
+        )
+        status = IngestTicketStatus(
+            ticket_id=ticket.ticket_id, status="queued", queued_at=queued_at
+        )
+        try:
+            self._queue.put_nowait(
+                _PendingSnapshot(ticket=ticket, snapshot=snapshot, status=status)
+            )
+        except asyncio.QueueFull as exc:
+            raise IngestQueueFull("Ingest queue is full") from exc
+
+        self._tickets[ticket.ticket_id] = status
+        while len(self._tickets) > self._ticket_limit:
+            self._tickets.popitem(last=False)
+        self._last_queued_at = queued_at
+        _queue_depth.add(1)
+        return ticket
+
+    def ticket_status(self, ticket_id: str) -> IngestTicketStatus | None:
+        return self._tickets.get(ticket_id)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "flushed_batches": self._flushed_batches,
+            "flushed_snapshots": self._flushed_snapshots,
+            "failed_snapshots": self._failed_snapshots,
+            "retried_batches": self._retried_batches,
+            "last_flush_ms": self._last_flush_ms,
+        }
+
+    def _next_timestamp(self) -> datetime:
+        # Sample timestamps are unique per gate, so keep them strictly increasing.
+        queued_at = utcnow()
+        if self._last_queued_at is not None and queued_at <= self._last_queued_at:
+            queued_at = self._last_queued_at + timedelta(microseconds=1)
+        return queued_at
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (TimeoutError, asyncio.QueueEmpty):
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_PendingSnapshot]) -> None:
+        started = perf_counter()
+        _queue_depth.add(-len(batch))
+
+        summary, error = await self._persist(batch)
+        ingested: list[_PendingSnapshot] = []
+        failed: list[tuple[_PendingSnapshot, Exception]] = []
+        if error is None:
+            ingested = batch
+        elif len(batch) == 1 or _is_transient(error):
+            failed = [(pending, error) for pending in batch]
+        else:
+            # Most likely one bad snapshot; give each its own transaction to isolate it.
+            logger.warning(
+                "Telemetry ingest batch failed; ingesting its snapshots one by one",
+                exc_info=error,
+                extra={"batch_size": len(batch)},
+            )
+            for pending in batch:
+                single_summary, single_error = await self._persist([pending])
+                if single_error is None:
+                    ingested.append(pending)
+                    summary = single_summary
+                else:
+                    failed.append((pending, single_error))
+
+        finished_at = utcnow()
+        for pending in ingested:
+            pending.status.status = "ingested"
+            pending.status.finished_at = finished_at
+        for pending, exc in failed:
+            pending.status.status = "failed"
+            pending.status.finished_at = finished_at
+            pending.status.error = _describe(exc)
+        if failed:
+            self._failed_snapshots += len(failed)
+            _failed_snapshots.add(len(failed))
+            logger.error(
+                "Failed to ingest telemetry snapshots",
+                exc_info=failed[0][1],
+                extra={"tickets": [pending.ticket.ticket_id for pending, _ in failed]},
+            )
+
+        if summary is not None and self._broker is not None:
+            try:
+                await self._broker.publish(
+                    summary,
+                    snapshots=[pending.snapshot for pending in ingested],
+                    recorded_at=[pending.ticket.queued_at for pending in ingested],
+                )
+            except Exception as exc:
+                # The snapshots are committed; only this update's fan-out is lost.
+                logger.warning("Failed to publish ingested telemetry", exc_info=exc)
+
+        if not ingested:
+            return
+        elapsed_ms = (perf_counter() - started) * 1000
+        self._flushed_batches += 1
+        self._flushed_snapshots += len(ingested)
+        self._last_flush_ms = round(elapsed_ms, 3)
+        _flush_latency.record(elapsed_ms)
+        _batch_size.record(len(ingested))
+        logger.debug(
+            "Telemetry ingest batch flushed",
+            extra={"batch_size": len(ingested), "flush_ms": self._last_flush_ms},
+        )
+
+    async def _persist(
+        self, batch: list[_PendingSnapshot]
+    ) -> tuple[DashboardSummary | None, Exception | None]:
+        """Ingest ``batch`` in one transaction, retrying transient failures with backoff.
+
+        Only the transaction is retried. Once it has committed, the batch is ingested: a
+        failure to build the summary afterwards is logged and the summary left out.
+        """
+        snapshots = [pending.snapshot for pending in batch]
+        recorded_at = [pending.ticket.queued_at for pending in batch]
+        delay = self._retry_backoff
+        attempt = 0
+        while True:
+            attempt += 1
+            for pending in batch:
+                pending.status.attempts += 1
+            committed = False
+            try:
+                async with self._session_factory() as session:
+                    repo = TelemetryRepository(
+                        session, summary_state=self._summary_state, pack_trends=self._pack_trends
+                    )
+                    await repo.write_batch(snapshots, recorded_at)
+                    committed = True
+                    summary = await repo.batch_summary(snapshots, recorded_at)
+                return summary, None
+            except Exception as exc:
+                if committed:
+                    logger.warning("Failed to summarise ingested telemetry", exc_info=exc)
+                    return None, None
+                if attempt > self._flush_retries or not _is_transient(exc):
+                    return None, exc
+                self._retried_batches += 1
+                logger.warning(
+                    "Telemetry ingest batch failed; retrying",
+                    exc_info=exc,
+                    extra={"batch_size": len(batch), "attempt": attempt, "retry_in_s": delay},
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+
+
+def _describe(exc: Exception) -> str:
+    # The driver's message only: SQLAlchemy's own text repeats the statement and its
+    # parameters, which hold other snapshots' data.
+    cause = exc.orig if isinstance(exc, DBAPIError) and exc.orig is not None else exc
+    return str(cause) or type(cause).__name__
+
+
+def _is_transient(exc: Exception) -> bool:
+    # Connection loss, a busy SQLite file or an exhausted pool may pass; constraint and
+    # data errors will fail again on every retry.
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or isinstance(exc, (OperationalError, InterfaceError))
+    return isinstance(exc, (PoolTimeoutError, OSError, TimeoutError))
+
+
+__all__ = ["IngestQueueClosed", "IngestQueueFull", "TelemetryIngestQueue"]
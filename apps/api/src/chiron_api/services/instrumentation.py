@@ -1,8 +1,11 @@
 from logging import getLogger
 
 from fastapi import FastAPI
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import SERVICE_NAME, Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -24,6 +27,10 @@ def configure_observability(app: FastAPI, config: AppConfig) -> None:
         exporter = OTLPSpanExporter(endpoint=config.otlp_endpoint)
         provider.add_span_processor(BatchSpanProcessor(exporter))
         trace.set_tracer_provider(provider)
+        metric_reader = PeriodicExportingMetricReader(
+            OTLPMetricExporter(endpoint=config.otlp_endpoint)
+        )
+        metrics.set_meter_provider(MeterProvider(resource=resource, metric_readers=[metric_reader]))
         logger.info("Configured OTLP exporter", extra={"endpoint": config.otlp_endpoint})
     else:
         trace.set_tracer_provider(provider)
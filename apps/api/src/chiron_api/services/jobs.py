@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from time import monotonic, perf_counter
+from typing import Any, Literal, TypeVar
+from uuid import uuid4
+
+from opentelemetry import metrics
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import AppConfig
+from ..db.models import ProcessJob, utcnow
+from .retention import TelemetryRetentionService
+from .rollups import RollupRepository
+from .streaming import TelemetryStreamBroker
+from .telemetry import TelemetryRepository
+
+logger = getLogger(__name__)
+
+JobPriority = Literal["high", "normal", "low"]
+JOB_PRIORITIES: tuple[JobPriority, ...] = ("high", "normal", "low")
+JobExecutor = Literal["async", "thread", "process"]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(JOB_PRIORITIES)}
+# Progress is published on every report but written to the jobs table at most this often.
+_PROGRESS_PERSIST_SECONDS = 1.0
+_MAX_MESSAGE_LENGTH = 256
+
+_meter = metrics.get_meter(__name__)
+_queue_depth = _meter.create_up_down_counter(
+    "chiron.jobs.queue_depth",
+    description="Jobs waiting for a dispatcher worker",
+)
+_queue_wait = _meter.create_histogram(
+    "chiron.jobs.queue_wait",
+    unit="ms",
+    description="Time a job waited between submission and the start of its run",
+)
+_run_duration = _meter.create_histogram(
+    "chiron.jobs.duration",
+    unit="ms",
+    description="Run time of a job, from start to success or failure",
+)
+_completed = _meter.create_counter(
+    "chiron.jobs.completed",
+    description="Jobs finished by the dispatcher",
+)
+_running_jobs = _meter.create_up_down_counter(
+    "chiron.jobs.running",
+    description="Jobs currently running",
+)
+
+_Handler = TypeVar("_Handler", bound=Callable[..., Any])
+
+
+class UnknownProcessType(LookupError):
+    """Raised when a job names a process type without a registered handler."""
+
+
+class JobQueueClosed(RuntimeError):
+    """Raised when a job is submitted after the dispatcher started shutting down."""
+
+
+@dataclass(frozen=True, slots=True)
+class JobHandler:
+    process_type: str
+    run: Callable[..., Any]
+    executor: JobExecutor = "async"
+
+
+class JobHandlerRegistry:
+    """Process types the dispatcher can run, keyed by ``process_type``.
+
+    ``async`` handlers are coroutine functions taking a :class:`JobContext` and run on the
+    event loop; use them for I/O-bound work. ``thread`` and ``process`` handlers are plain
+    functions taking the job payload and run in the dispatcher's thread or process pool;
+    ``process`` handlers must be importable module-level functions with a picklable payload
+    and result. Every handler returns a JSON-compatible dict (or ``None``) as the result.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+
+    def register(
+        self, process_type: str, *, executor: JobExecutor = "async"
+    ) -> Callable[[_Handler], _Handler]:
+        def decorator(run: _Handler) -> _Handler:
+            self._handlers[process_type] = JobHandler(process_type, run, executor)
+            return run
+
+        return decorator
+
+    def get(self, process_type: str) -> JobHandler | None:
+        return self._handlers.get(process_type)
+
+    def names(self) -> list[str]:
+        return sorted(self._handlers)
+
+
+@dataclass(slots=True)
+class _JobState:
+    job_id: str
+    process_type: str
+    priority: str
+    status: str
+    progress: float
+    message: str | None
+    error: str | None
+    queued_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    @classmethod
+    def from_row(cls, job: ProcessJob) -> _JobState:
+        return cls(
+            job_id=job.id,
+            process_type=job.process_type,
+            priority=job.priority,
+            status=job.status,
+            progress=job.progress,
+            message=job.message,
+            error=job.error,
+            queued_at=_as_utc(job.queued_at),
+            started_at=_as_utc(job.started_at) if job.started_at else None,
+            finished_at=_as_utc(job.finished_at) if job.finished_at else None,
+        )
+
+    def as_event(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "process_type": self.process_type,
+            "priority": self.priority,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "error": self.error,
+            "queued_at": self.queued_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobContext:
+    """What an ``async`` handler gets to work with while its job runs."""
+
+    def __init__(
+        self,
+        dispatcher: JobDispatcher,
+        state: _JobState,
+        payload: dict[str, Any],
+    ) -> None:
+        self._dispatcher = dispatcher
+        self._state = state
+        self.job_id = state.job_id
+        self.payload = payload
+        self.config = dispatcher.config
+        self.session_factory = dispatcher.session_factory
+
+    async def progress(self, fraction: float, message: str | None = None) -> None:
+        """Report completion between 0 and 1.
+
+        ``job:<id>`` subscribers see it immediately; the job's status row catches up within
+        a second, from the job's heartbeat, so reporting never waits for a connection.
+        """
+        await self._dispatcher._report_progress(self._state, fraction, message)
+
+
+class JobDispatcher:
+    """Runs submitted process jobs on a pool of asyncio workers, highest priority first.
+
+    Jobs are persisted in ``process_jobs`` before they are queued, so their status survives
+    restarts: ``jobs_workers`` workers take them from an in-memory queue ordered by priority
+    and then submission, claim them in the table (so only one process ever runs a job) and
+    run their handler. CPU-bound handlers run in a thread or process pool of their own, so
+    a slot stays taken while they run but the event loop does not. Every state change and
+    progress report is published through the stream broker to ``job:<id>`` and ``job:*``
+    topic subscribers.
+
+    At most ``jobs_queue_size`` jobs are held in memory; jobs submitted beyond that are
+    still accepted and wait in the table. On startup, queued jobs and running jobs whose
+    heartbeat is older than ``jobs_lease_seconds`` (their process died) are queued again.
+    Whatever does not fit in memory is loaded, highest priority first, as the workers drain
+    the queue below half full. Jobs still running when
+    the dispatcher stops are put back to ``queued`` and run again on the next start.
+    Dry-run jobs are validated and recorded, but never executed.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        config: AppConfig,
+        broker: TelemetryStreamBroker | None = None,
+        *,
+        read_session_factory: async_sessionmaker[AsyncSession] | None = None,
+        handlers: JobHandlerRegistry | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.config = config
+        self._read_session_factory = read_session_factory or session_factory
+        self._broker = broker
+        self._handlers = handlers or get_job_handlers()
+        self._worker_count = max(1, config.jobs_workers)
+        self._max_queued = max(1, config.jobs_queue_size)
+        self._lease = max(1.0, config.jobs_lease_seconds)
+        self._queue: asyncio.PriorityQueue[tuple[int, int, str]] = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._workers: list[asyncio.Task[None]] = []
+        self._running: dict[str, _JobState] = {}
+        self._queued_ids: set[str] = set()
+        # Whether the table may hold queued jobs that did not fit in the in-memory queue.
+        self._backlog = False
+        self._loading = asyncio.Lock()
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._closed = False
+        self._finished: dict[str, int] = {"succeeded": 0, "failed": 0}
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._closed = False
+        await self._recover()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"job-worker-{index}")
+            for index in range(self._worker_count)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers and requeue the jobs they were running."""
+        self._closed = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._running:
+            interrupted = list(self._running)
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(ProcessJob)
+                    .where(ProcessJob.id.in_(interrupted), ProcessJob.status == "running")
+                    .values(status="queued", started_at=None, heartbeat_at=None)
+                )
+                await session.commit()
+            self._running.clear()
+            logger.info("Requeued interrupted jobs", extra={"jobs": interrupted})
+
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._threads = self._processes = None
+
+    async def submit(
+        self,
+        session: AsyncSession,
+        process_type: str,
+        payload: dict[str, Any] | None = None,
+        *,
+        priority: JobPriority = "normal",
+        dry_run: bool = False,
+    ) -> ProcessJob:
+        """Record a job in ``session`` (committing it) and queue it for the workers."""
+        if self._handlers.get(process_type) is None:
+            raise UnknownProcessType(f"Unknown process type {process_type!r}")
+        if self._closed:
+            raise JobQueueClosed("Job dispatcher is shutting down")
+
+        now = utcnow()
+        job = ProcessJob(
+            id=uuid4().hex,
+            process_type=process_type,
+            priority=priority,
+            dry_run=dry_run,
+            payload=payload or {},
+            status="queued",
+            progress=0.0,
+            attempts=0,
+            queued_at=now,
+        )
+        if dry_run:
+            job.status = "succeeded"
+            job.progress = 1.0
+            job.message = "Dry run; nothing was executed"
+            job.finished_at = now
+        session.add(job)
+        await session.commit()
+
+        if not dry_run:
+            if self._queue.qsize() < self._max_queued:
+                self._enqueue(job.id, priority)
+            else:
+                # Persisted as queued already; a worker loads it once the queue has drained.
+                self._backlog = True
+        await self._publish(_JobState.from_row(job))
+        return job
+
+    async def get(self, job_id: str) -> ProcessJob | None:
+        async with self._read_session_factory() as session:
+            return await session.get(ProcessJob, job_id)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize(),
+            "running": len(self._running),
+            "max_queued": self._max_queued,
+            "backlog": self._backlog,
+            "finished": dict(self._finished),
+            "process_types": self._handlers.names(),
+        }
+
+    def _enqueue(self, job_id: str, priority: str) -> None:
+        rank = _PRIORITY_RANK.get(priority, _PRIORITY_RANK["normal"])
+        self._queue.put_nowait((rank, next(self._sequence), job_id))
+        self._queued_ids.add(job_id)
+        _queue_depth.add(1, {"priority": JOB_PRIORITIES[rank]})
+
+    async def _recover(self) -> None:
+        stale_before = utcnow() - timedelta(seconds=self._lease)
+        async with self.session_factory() as session:
+            requeued = await session.execute(
+                update(ProcessJob)
+                .where(
+                    ProcessJob.status == "running",
+                    or_(ProcessJob.heartbeat_at.is_(None), ProcessJob.heartbeat_at < stale_before),
+                )
+                .values(status="queued", started_at=None, heartbeat_at=None)
+            )
+            await session.commit()
+
+        loaded = await self._load_queued()
+        if loaded or requeued.rowcount:
+            logger.info(
+                "Recovered queued jobs",
+                extra={
+                    "queued": loaded,
+                    "stale_running": requeued.rowcount,
+                    "backlog": self._backlog,
+                },
+            )
+
+    async def _load_queued(self) -> int:
+        """Queue jobs waiting in the table, up to the free space in the queue."""
+        room = self._max_queued - self._queue.qsize()
+        if room <= 0:
+            return 0
+        # Rows already queued here or running are skipped, so read past them.
+        known = self._queued_ids | self._running.keys()
+        limit = room + len(known)
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(ProcessJob.id, ProcessJob.priority)
+                .where(ProcessJob.status == "queued")
+                .order_by(
+                    case(_PRIORITY_RANK, value=ProcessJob.priority, else_=_PRIORITY_RANK["normal"]),
+                    ProcessJob.queued_at.asc(),
+                )
+                .limit(limit)
+            )
+            fetched = rows.all()
+
+        pending = [(job_id, priority) for job_id, priority in fetched if job_id not in known]
+        self._backlog = len(fetched) == limit or len(pending) > room
+        for job_id, priority in pending[:room]:
+            self._enqueue(job_id, priority)
+        return min(room, len(pending))
+
+    async def _work(self) -> None:
+        while True:
+            rank, _, job_id = await self._queue.get()
+            _queue_depth.add(-1, {"priority": JOB_PRIORITIES[rank]})
+            if (
+                self._backlog
+                and not self._loading.locked()
+                and self._queue.qsize() <= self._max_queued // 2
+            ):
+                await self._top_up()
+            try:
+                await self._execute(job_id)
+            except Exception as exc:
+                logger.error(
+                    "Job dispatcher failed to run job", exc_info=exc, extra={"job_id": job_id}
+                )
+            finally:
+                # Only now, so a top-up meanwhile does not queue the job a second time.
+                self._queued_ids.discard(job_id)
+
+    async def _top_up(self) -> None:
+        async with self._loading:
+            try:
+                loaded = await self._load_queued()
+            except Exception as exc:
+                logger.warning("Failed to load queued jobs from the table", exc_info=exc)
+                return
+        logger.debug("Loaded queued jobs", extra={"queued": loaded, "backlog": self._backlog})
+
+    async def _execute(self, job_id: str) -> None:
+        started_at = utcnow()
+        async with self.session_factory() as session:
+            claimed = await session.execute(
+                update(ProcessJob)
+                .where(ProcessJob.id == job_id, ProcessJob.status == "queued")
+                .values(
+                    status="running",
+                    started_at=started_at,
+                    heartbeat_at=started_at,
+                    attempts=ProcessJob.attempts + 1,
+                )
+            )
+            if claimed.rowcount == 0:
+                # Already finished, or claimed by another process after a restart.
+                return
+            job = await session.get(ProcessJob, job_id)
+            await session.commit()
+
+        state = _JobState.from_row(job)
+        attributes = {"process_type": job.process_type, "priority": job.priority}
+        _queue_wait.record((started_at - state.queued_at).total_seconds() * 1000, attributes)
+
+        self._running[job_id] = state
+        _running_jobs.add(1, {"process_type": job.process_type})
+        await self._publish(state)
+
+        heartbeat = asyncio.create_task(self._heartbeat(state), name=f"job-heartbeat-{job_id}")
+        started = perf_counter()
+        result: dict[str, Any] | None = None
+        try:
+            handler = self._handlers.get(job.process_type)
+            if handler is None:
+                raise UnknownProcessType(f"Unknown process type {job.process_type!r}")
+            result = await self._run_handler(handler, state, dict(job.payload or {}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            state.status = "failed"
+            state.error = str(exc) or type(exc).__name__
+            logger.warning(
+                "Job failed",
+                exc_info=exc,
+                extra={"job_id": job_id, "process_type": job.process_type},
+            )
+        else:
+            state.status = "succeeded"
+            state.progress = 1.0
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+            _running_jobs.add(-1, {"process_type": job.process_type})
+
+        _run_duration.record(
+            (perf_counter() - started) * 1000,
+            {"process_type": job.process_type, "status": state.status},
+        )
+        _completed.add(1, {"process_type": job.process_type, "status": state.status})
+        self._finished[state.status] += 1
+
+        state.finished_at = utcnow()
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(ProcessJob)
+                    .where(ProcessJob.id == job_id)
+                    .values(
+                        status=state.status,
+                        result=result,
+                        error=state.error,
+                        progress=state.progress,
+                        message=state.message,
+                        finished_at=state.finished_at,
+                        heartbeat_at=None,
+                    )
+                )
+                await session.commit()
+        except Exception as exc:
+            # The row stays 'running' until its lease expires and it is recovered.
+            logger.error(
+                "Failed to record job outcome",
+                exc_info=exc,
+                extra={"job_id": job_id, "status": state.status},
+            )
+        finally:
+            # Finished either way: stop() must not requeue it as interrupted.
+            del self._running[job_id]
+        await self._publish(state)
+
+    async def _run_handler(
+        self, handler: JobHandler, state: _JobState, payload: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        if handler.executor == "async":
+            result = await handler.run(JobContext(self, state, payload))
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor(handler.executor), handler.run, payload
+            )
+        if result is None or isinstance(result, dict):
+            return result
+        return {"value": result}
+
+    def _executor(self, kind: JobExecutor) -> Executor:
+        if kind == "process":
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=max(1, self.config.jobs_process_workers)
+                )
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=max(1, self.config.jobs_thread_workers),
+                thread_name_prefix="chiron-job",
+            )
+        return self._threads
+
+    async def _report_progress(
+        self, state: _JobState, fraction: float, message: str | None
+    ) -> None:
+        state.progress = min(1.0, max(0.0, fraction))
+        if message is not None:
+            state.message = message[:_MAX_MESSAGE_LENGTH]
+        await self._publish(state)
+
+    async def _heartbeat(self, state: _JobState) -> None:
+        # Also persists progress: handlers may report it while holding the only writer
+        # connection (SQLite), so the write must not happen inline.
+        interval = self._lease / 3
+        persisted = (state.progress, state.message)
+        persisted_at = monotonic()
+        while True:
+            await asyncio.sleep(min(interval, _PROGRESS_PERSIST_SECONDS))
+            current = (state.progress, state.message)
+            if current == persisted and monotonic() - persisted_at < interval:
+                continue
+            try:
+                await self._touch(state)
+            except Exception as exc:
+                logger.warning(
+                    "Failed to refresh job heartbeat", exc_info=exc, extra={"job_id": state.job_id}
+                )
+                continue
+            persisted, persisted_at = current, monotonic()
+
+    async def _touch(self, state: _JobState) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(ProcessJob)
+                .where(ProcessJob.id == state.job_id, ProcessJob.status == "running")
+                .values(progress=state.progress, message=state.message, heartbeat_at=utcnow())
+            )
+            await session.commit()
+
+    async def _publish(self, state: _JobState) -> None:
+        if self._broker is None:
+            return
+        try:
+            await self._broker.publish_job(state.as_event())
+        except Exception as exc:  # pragma: no cover - progress events are best effort
+            logger.warning("Failed to publish job event", exc_info=exc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+_handlers = JobHandlerRegistry()
+
+
+def get_job_handlers() -> JobHandlerRegistry:
+    return _handlers
+
+
+@_handlers.register("telemetry.prune")
+async def _prune(context: JobContext) -> dict[str, Any]:
+    report = await TelemetryRetentionService(context.session_factory, context.config).run_once()
+    return report.as_dict()
+
+
+@_handlers.register("telemetry.rebuild-rollups")
+async def _rebuild_rollups(context: JobContext) -> dict[str, Any]:
+    async with context.session_factory() as session:
+        return {"sample_count": await RollupRepository(session).rebuild()}
+
+
+@_handlers.register("telemetry.rebuild-gate-latest")
+async def _rebuild_gate_latest(context: JobContext) -> dict[str, Any]:
+    async with context.session_factory() as session:
+        return {"gate_count": await TelemetryRepository(session).rebuild_gate_latest()}
+
+
+__all__ = [
+    "JOB_PRIORITIES",
+    "JobContext",
+    "JobDispatcher",
+    "JobExecutor",
+    "JobHandler",
+    "JobHandlerRegistry",
+    "JobPriority",
+    "JobQueueClosed",
+    "JobStatus",
+    "UnknownProcessType",
+    "get_job_handlers",
+]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from collections import deque
+from collections.abc import Callable
+from logging import getLogger
+from typing import Any, Literal
+
+from opentelemetry import metrics
+
+logger = getLogger(__name__)
+
+OverflowPolicy = Literal["conflate", "drop-oldest", "disconnect"]
+OVERFLOW_POLICIES: tuple[OverflowPolicy, ...] = ("conflate", "drop-oldest", "disconnect")
+
+_meter = metrics.get_meter(__name__)
+_dropped_frames = _meter.create_counter(
+    "chiron.stream.dropped_frames",
+    description="Stream frames discarded or conflated for slow subscribers",
+)
+_subscriber_lag = _meter.create_histogram(
+    "chiron.stream.subscriber_lag",
+    description="Frames already waiting in a lagging subscriber's mailbox when a new one arrives",
+)
+_slow_disconnects = _meter.create_counter(
+    "chiron.stream.slow_disconnects",
+    description="Subscribers disconnected for falling behind",
+)
+
+# ``(ms, seq)`` of a stream event, extended with an index when one event yields several frames.
+EventKey = tuple[int, ...]
+Frame = tuple[EventKey, Any]
+
+# Sorts after every real event, so subscribers never filter heartbeats out as stale.
+HEARTBEAT_KEY: EventKey = (sys.maxsize, sys.maxsize)
+
+
+class SubscriberMailbox:
+    """Per-subscriber frame buffer with an explicit overflow policy.
+
+    ``conflate`` suits state snapshots: a full-summary subscriber only ever holds the newest
+    frame, and a delta subscriber that falls ``capacity`` frames behind has its backlog
+    replaced by one keyframe of the latest state. ``drop-oldest`` keeps the newest
+    ``capacity`` frames, and ``disconnect`` closes the mailbox so the client reconnects
+    (and resumes with ``Last-Event-ID``).
+
+    Frames are opaque to the mailbox: encoded SSE bytes, or messages that are encoded
+    per subscriber when they are written.
+    """
+
+    def __init__(
+        self,
+        *,
+        policy: OverflowPolicy = "conflate",
+        capacity: int = 100,
+        snapshots: bool = True,
+    ) -> None:
+        self.policy = policy
+        self.capacity = max(1, capacity)
+        # Whether every frame carries the complete state, superseding the ones before it.
+        self._snapshots = snapshots
+        self._pending: deque[Frame] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._last_key: EventKey | None = None
+        self._idle = True
+        self.delivered = 0
+        self.dropped = 0
+        self.max_lag = 0
+
+    @property
+    def lag(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, key: EventKey, frame: Any, resync: Callable[[], Any] | None = None) -> None:
+        """Queue ``frame``; ``resync`` builds a self-contained frame for the same event."""
+        if self._closed or (self._last_key is not None and key <= self._last_key):
+            # Concurrent broadcasts can interleave; never let an older event follow a newer one.
+            return
+        self._last_key = key
+        self._idle = False
+        if self._pending and self._pending[-1][0] == HEARTBEAT_KEY:
+            self._pending.pop()
+
+        lag = len(self._pending)
+        if lag:
+            _subscriber_lag.record(lag, {"policy": self.policy})
+            self.max_lag = max(self.max_lag, lag)
+
+        if self.policy == "conflate" and self._snapshots and lag:
+            self._discard(lag)
+        elif lag >= self.capacity:
+            if self.policy == "disconnect":
+                self.close()
+                _slow_disconnects.add(1)
+                logger.info(
+                    "Disconnecting slow dashboard stream subscriber",
+                    extra={"lag": lag, "dropped": self.dropped},
+                )
+                return
+            if self.policy == "conflate" and resync is not None:
+                self._discard(lag)
+                frame = resync()
+            else:
+                self._discard(1)
+
+        self._pending.append((key, frame))
+        self._ready.set()
+
+    def push(self, frame: Any) -> None:
+        """Queue ``frame`` behind everything already queued, outside of event ordering."""
+        if self._closed:
+            return
+        self._pending.append((self._last_key or (0, 0), frame))
+        self._ready.set()
+
+    def heartbeat(self, frame: bytes) -> None:
+        """Queue ``frame`` if nothing has been queued since the previous heartbeat."""
+        if not self._idle:
+            self._idle = True
+            return
+        if self._closed or self._pending:
+            return
+        self._pending.append((HEARTBEAT_KEY, frame))
+        self._ready.set()
+
+    async def get(self) -> Frame | None:
+        """Return the next frame, or ``None`` once the mailbox has been closed."""
+        while not self._pending:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        self.delivered += 1
+        return self._pending.popleft()
+
+    def close(self) -> None:
+        self._closed = True
+        self._pending.clear()
+        self._ready.set()
+
+    def _discard(self, count: int) -> None:
+        for _ in range(count):
+            self._pending.popleft()
+        self.dropped += count
+        _dropped_frames.add(count, {"policy": self.policy})
+
+
+class SubscriberRegistry:
+    """Copy-on-write set of mailboxes, sharded so connects stay cheap with many subscribers.
+
+    Broadcasts iterate immutable shard tuples without taking a lock or copying, and connects
+    or disconnects only rebuild one shard. Safe because all mutation happens on the event
+    loop thread.
+    """
+
+    def __init__(self, shards: int = 64) -> None:
+        self._shards: list[tuple[SubscriberMailbox, ...]] = [() for _ in range(max(1, shards))]
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, mailbox: SubscriberMailbox) -> None:
+        index = self._shard(mailbox)
+        self._shards[index] = (*self._shards[index], mailbox)
+        self._count += 1
+
+    def discard(self, mailbox: SubscriberMailbox) -> None:
+        index = self._shard(mailbox)
+        shard = self._shards[index]
+        if mailbox in shard:
+            self._shards[index] = tuple(entry for entry in shard if entry is not mailbox)
+            self._count -= 1
+
+    def snapshot(self) -> list[tuple[SubscriberMailbox, ...]]:
+        """Current shards; later connects and disconnects do not affect the returned tuples."""
+        return list(self._shards)
+
+    def _shard(self, mailbox: SubscriberMailbox) -> int:
+        return hash(mailbox) % len(self._shards)
+
+
+__all__ = [
+    "HEARTBEAT_KEY",
+    "OVERFLOW_POLICIES",
+    "EventKey",
+    "OverflowPolicy",
+    "SubscriberMailbox",
+    "SubscriberRegistry",
+]
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Any
+
+from opentelemetry import metrics
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import AppConfig
+from ..db.models import TelemetrySample, utcnow
+from ..db.session import replica_available, set_replica_available
+
+logger = getLogger(__name__)
+
+_meter = metrics.get_meter(__name__)
+_replica_lag = _meter.create_histogram(
+    "chiron.db.replica_lag",
+    unit="s",
+    description="Age of the oldest sample the read replica has not replicated yet",
+)
+_replica_fallbacks = _meter.create_counter(
+    "chiron.db.replica_fallbacks",
+    description="Times dashboard reads fell back from the read replica to the primary",
+)
+
+
+class ReadReplicaMonitor:
+    """Routes read sessions to the replica while it is reachable and fresh enough.
+
+    Every ``database_replica_check_interval_seconds`` the replica is queried for its newest
+    sample, and staleness is the age of the oldest primary sample newer than that (zero
+    once it has caught up). Reads fall back to the primary while the replica is unreachable
+    or more than ``database_replica_max_lag_seconds`` stale, and return when it recovers.
+    """
+
+    def __init__(
+        self,
+        config: AppConfig,
+        primary_factory: async_sessionmaker[AsyncSession],
+        replica_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        self._primary_factory = primary_factory
+        self._replica_factory = replica_factory
+        self._max_lag = config.database_replica_max_lag_seconds
+        self._interval = max(0.1, config.database_replica_check_interval_seconds)
+        self.lag_seconds: float | None = None
+        self.last_error: str | None = None
+        self.last_checked: datetime | None = None
+        self.fallbacks = 0
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            # Decide routing before serving traffic rather than one interval later.
+            await self.check_once()
+            self._task = asyncio.create_task(self._run(), name="replica-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        set_replica_available(False)
+
+    async def check_once(self) -> bool:
+        """Measure the replica and update routing; returns whether it now serves reads."""
+        try:
+            lag = await asyncio.wait_for(self._measure_lag(), self._interval)
+        except (SQLAlchemyError, OSError, TimeoutError) as exc:
+            self.lag_seconds = None
+            self.last_error = str(exc) or type(exc).__name__
+            healthy = False
+        else:
+            self.lag_seconds = lag
+            _replica_lag.record(lag)
+            healthy = lag <= self._max_lag
+            self.last_error = (
+                None if healthy else f"Replica is {lag:.1f}s behind (limit {self._max_lag}s)"
+            )
+
+        self.last_checked = utcnow()
+        # Sessions also fall back on their own when the replica refuses a connection.
+        if healthy != replica_available():
+            if healthy:
+                logger.info("Serving dashboard reads from the read replica")
+            else:
+                self.fallbacks += 1
+                _replica_fallbacks.add(1)
+                logger.warning(
+                    "Read replica unhealthy; serving dashboard reads from the primary",
+                    extra={"reason": self.last_error},
+                )
+        set_replica_available(healthy)
+        return healthy
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "healthy": replica_available(),
+            "lag_seconds": None if self.lag_seconds is None else round(self.lag_seconds, 3),
+            "max_lag_seconds": self._max_lag,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_error": self.last_error,
+            "fallbacks": self.fallbacks,
+        }
+
+    async def _measure_lag(self) -> float:
+        async with self._replica_factory() as session:
+            replicated = await session.scalar(select(func.max(TelemetrySample.recorded_at)))
+
+        query = select(func.min(TelemetrySample.recorded_at))
+        if replicated is not None:
+            query = query.where(TelemetrySample.recorded_at > replicated)
+        async with self._primary_factory() as session:
+            missing_since = await session.scalar(query)
+
+        if missing_since is None:
+            return 0.0
+        if missing_since.tzinfo is None:
+            missing_since = missing_since.replace(tzinfo=timezone.utc)
+        return max(0.0, (utcnow() - missing_since).total_seconds())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.check_once()
+            except Exception as exc:
+                logger.error("Read replica health check failed", exc_info=exc)
+
+
+__all__ = ["ReadReplicaMonitor"]
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from logging import getLogger
+from time import perf_counter
+from typing import Any
+
+from opentelemetry import metrics
+from sqlalchemy import ColumnElement, delete, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import AppConfig
+from ..db.models import GateRollup, ProcessJob, TelemetrySample, TimelineEvent, utcnow
+from ..db.postgres import get_sample_store
+from .rollups import rollup_retention
+
+logger = getLogger(__name__)
+
+_meter = metrics.get_meter(__name__)
+_rows_removed = _meter.create_counter(
+    "chiron.retention.rows_removed",
+    description="Rows deleted by telemetry retention policies",
+)
+_partitions_dropped = _meter.create_counter(
+    "chiron.retention.partitions_dropped",
+    description="Expired telemetry sample partitions dropped by retention",
+)
+_prune_duration = _meter.create_histogram(
+    "chiron.retention.duration",
+    unit="ms",
+    description="Wall time of one retention pass",
+)
+
+_SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass(slots=True)
+class RetentionReport:
+    rows_removed: dict[str, int] = field(default_factory=dict)
+    batches: int = 0
+    duration_ms: float = 0.0
+    vacuumed: bool = False
+    partitions_dropped: list[str] = field(default_factory=list)
+
+    @property
+    def total_removed(self) -> int:
+        return sum(self.rows_removed.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rows_removed": dict(self.rows_removed),
+            "total_removed": self.total_removed,
+            "batches": self.batches,
+            "duration_ms": self.duration_ms,
+            "vacuumed": self.vacuumed,
+            "partitions_dropped": list(self.partitions_dropped),
+        }
+
+
+class TelemetryRetentionService:
+    """Prunes telemetry tables in small batches on a background schedule.
+
+    Each batch runs in its own short transaction so pruning never holds write locks long
+    enough to stall ingest.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        config: AppConfig,
+    ) -> None:
+        self._session_factory = session_factory
+        self._config = config
+        self._batch_size = max(1, config.retention_batch_size)
+        self._task: asyncio.Task[None] | None = None
+        self._warned_auto_vacuum = False
+        self.last_report: RetentionReport | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="telemetry-retention")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> RetentionReport:
+        report = RetentionReport()
+        started = perf_counter()
+        config = self._config
+        now = utcnow()
+
+        if config.sample_retention_days is not None:
+            cutoff = now - timedelta(days=config.sample_retention_days)
+            await self._drop_sample_partitions(report, cutoff)
+            await self._delete_in_batches(
+                report,
+                "telemetry_samples",
+                TelemetrySample,
+                (TelemetrySample.recorded_at, TelemetrySample.id),
+                (TelemetrySample.id,),
+                TelemetrySample.recorded_at < cutoff,
+            )
+        if config.sample_max_rows is not None:
+            await self._trim_to_max_rows(
+                report,
+                "telemetry_samples",
+                TelemetrySample,
+                (TelemetrySample.recorded_at, TelemetrySample.id),
+                config.sample_max_rows,
+            )
+
+        if config.timeline_retention_days is not None:
+            cutoff = now - timedelta(days=config.timeline_retention_days)
+            await self._delete_in_batches(
+                report,
+                "timeline_events",
+                TimelineEvent,
+                (TimelineEvent.occurred_at, TimelineEvent.id),
+                (TimelineEvent.id,),
+                TimelineEvent.occurred_at < cutoff,
+            )
+        if config.timeline_max_rows is not None:
+            await self._trim_to_max_rows(
+                report,
+                "timeline_events",
+                TimelineEvent,
+                (TimelineEvent.occurred_at, TimelineEvent.id),
+                config.timeline_max_rows,
+            )
+
+        for resolution, retention in rollup_retention(config).items():
+            if retention is None:
+                continue
+            cutoff = now - retention
+            await self._delete_in_batches(
+                report,
+                "gate_rollups",
+                GateRollup,
+                (GateRollup.bucket_start, GateRollup.gate_id),
+                (GateRollup.gate_id, GateRollup.resolution, GateRollup.bucket_start),
+                GateRollup.resolution == resolution,
+                GateRollup.bucket_start < cutoff,
+            )
+
+        if config.job_retention_days is not None:
+            cutoff = now - timedelta(days=config.job_retention_days)
+            await self._delete_in_batches(
+                report,
+                "process_jobs",
+                ProcessJob,
+                (ProcessJob.finished_at, ProcessJob.id),
+                (ProcessJob.id,),
+                ProcessJob.finished_at < cutoff,
+            )
+
+        if config.sqlite_incremental_vacuum and report.total_removed:
+            report.vacuumed = await self._incremental_vacuum()
+
+        report.duration_ms = round((perf_counter() - started) * 1000, 3)
+        _prune_duration.record(report.duration_ms)
+        self.last_report = report
+        logger.info("Telemetry retention pass complete", extra=report.as_dict())
+        return report
+
+    async def _run(self) -> None:
+        interval = max(1, self._config.retention_interval_seconds)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run_once()
+            except Exception as exc:
+                logger.error("Telemetry retention pass failed", exc_info=exc)
+
+    async def _delete_in_batches(
+        self,
+        report: RetentionReport,
+        table_name: str,
+        model: Any,
+        order_columns: Sequence[Any],
+        key_columns: Sequence[Any],
+        *conditions: ColumnElement[bool],
+    ) -> None:
+        """Delete matching rows oldest first, ``retention_batch_size`` per transaction.
+
+        ``order_columns`` must order rows uniquely: each batch resumes after the last row
+        deleted by the previous one, so no batch re-reads the rows (or, on PostgreSQL, the
+        dead index entries) that came before it.
+        """
+        width = len(order_columns)
+        after: tuple[Any, ...] | None = None
+        while True:
+            query = (
+                select(*order_columns, *key_columns)
+                .where(*conditions)
+                .order_by(*(column.asc() for column in order_columns))
+                .limit(self._batch_size)
+            )
+            if after is not None:
+                query = query.where(tuple_(*order_columns) > tuple_(*after))
+
+            async with self._session_factory() as session:
+                rows = [tuple(row) for row in await session.execute(query)]
+                if not rows:
+                    return
+
+                keys = [row[width:] for row in rows]
+                if len(key_columns) == 1:
+                    condition = key_columns[0].in_([key for (key,) in keys])
+                else:
+                    condition = tuple_(*key_columns).in_(keys)
+                await session.execute(delete(model).where(condition))
+                await session.commit()
+
+            report.rows_removed[table_name] = report.rows_removed.get(table_name, 0) + len(rows)
+            report.batches += 1
+            _rows_removed.add(len(rows), {"table": table_name})
+
+            if len(rows) < self._batch_size:
+                return
+            after = rows[-1][:width]
+            # Let ingest and dashboard work interleave between batches.
+            await asyncio.sleep(0)
+
+    async def _trim_to_max_rows(
+        self,
+        report: RetentionReport,
+        table_name: str,
+        model: Any,
+        order_columns: Sequence[Any],
+        max_rows: int,
+    ) -> None:
+        # Locate the newest row past the limit once; the batches then page up to it.
+        async with self._session_factory() as session:
+            boundary = (
+                await session.execute(
+                    select(*order_columns)
+                    .order_by(*(column.desc() for column in order_columns))
+                    .offset(max_rows)
+                    .limit(1)
+                )
+            ).first()
+        if boundary is None:
+            return
+        await self._delete_in_batches(
+            report,
+            table_name,
+            model,
+            order_columns,
+            (order_columns[-1],),
+            tuple_(*order_columns) <= tuple_(*boundary),
+        )
+
+    async def _drop_sample_partitions(self, report: RetentionReport, cutoff: datetime) -> None:
+        # Whole expired partitions go in one statement each; the batched delete that follows
+        # only has the rows left in the partition straddling the cutoff.
+        async with self._session_factory() as session:
+            if session.get_bind().dialect.name != "postgresql":
+                return
+            dropped = await get_sample_store().drop_partitions_before(session, cutoff)
+            await session.commit()
+
+        if dropped:
+            report.partitions_dropped.extend(dropped)
+            _partitions_dropped.add(len(dropped))
+            logger.info(
+                "Dropped expired telemetry sample partitions", extra={"partitions": dropped}
+            )
+
+    async def _incremental_vacuum(self) -> bool:
+        async with self._session_factory() as session:
+            if session.get_bind().dialect.name != "sqlite":
+                return False
+
+            auto_vacuum = await session.scalar(text("PRAGMA auto_vacuum"))
+            if auto_vacuum != _SQLITE_AUTO_VACUUM_INCREMENTAL:
+                if not self._warned_auto_vacuum:
+                    logger.warning(
+                        "SQLite auto_vacuum is not INCREMENTAL; run a full VACUUM once to enable "
+                        "incremental vacuuming on this database"
+                    )
+                    self._warned_auto_vacuum = True
+                return False
+
+            pages = max(1, self._config.sqlite_incremental_vacuum_pages)
+            await session.execute(text(f"PRAGMA incremental_vacuum({pages})"))
+            await session.commit()
+        return True
+
+
+__all__ = ["RetentionReport", "TelemetryRetentionService"]
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import AppConfig
+from ..db.dialects import dialect_greatest, dialect_insert, dialect_least
+from ..db.models import GateRollup, HeroGate, TelemetrySample, utcnow
+from ..schemas.dashboard import GateHistory, GateHistoryPoint
+
+logger = getLogger(__name__)
+
+# Stored tiers, finest first.
+ROLLUP_RESOLUTIONS: dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Upper bound on points returned when the caller lets the API choose a resolution.
+MAX_HISTORY_POINTS = 720
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_RESOLUTION_PATTERN = re.compile(r"^(\d+)([mhd])$")
+_RESOLUTION_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+_UPSERT_BATCH_SIZE = 50
+_REBUILD_BATCH_SIZE = 5000
+
+
+class InvalidResolution(ValueError):
+    """Raised when a requested history resolution cannot be served."""
+
+
+class GateNotFound(LookupError):
+    """Raised when a history query names a gate that does not exist."""
+
+
+@dataclass(slots=True)
+class _Bucket:
+    sample_count: int = 0
+    score_min: int | None = None
+    score_max: int | None = None
+    score_sum: int = 0
+    status_counts: dict[str, int] = field(default_factory=lambda: {"pass": 0, "warn": 0, "fail": 0})
+    throughput_sum: float = 0.0
+    throughput_count: int = 0
+    load_sum: float = 0.0
+    load_count: int = 0
+
+    def add_sample(self, score: int, status: str, metrics: Mapping[str, Any] | None) -> None:
+        self.sample_count += 1
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+        self.score_sum += score
+        if status in self.status_counts:
+            self.status_counts[status] += 1
+
+        metrics = metrics if isinstance(metrics, Mapping) else {}
+        if (throughput := metrics.get("throughput")) is not None:
+            self.throughput_sum += float(throughput)
+            self.throughput_count += 1
+        if (load := metrics.get("load")) is not None:
+            self.load_sum += float(load)
+            self.load_count += 1
+
+    def merge(self, row: GateRollup) -> None:
+        self.sample_count += row.sample_count
+        self.score_sum += row.score_sum
+        if self.score_min is None or row.score_min < self.score_min:
+            self.score_min = row.score_min
+        if self.score_max is None or row.score_max > self.score_max:
+            self.score_max = row.score_max
+        self.status_counts["pass"] += row.pass_count
+        self.status_counts["warn"] += row.warn_count
+        self.status_counts["fail"] += row.fail_count
+        self.throughput_sum += row.throughput_sum
+        self.throughput_count += row.throughput_count
+        self.load_sum += row.load_sum
+        self.load_count += row.load_count
+
+    def as_point(self, bucket_start: datetime) -> GateHistoryPoint:
+        return GateHistoryPoint(
+            bucket_start=bucket_start,
+            sample_count=self.sample_count,
+            score_min=self.score_min or 0,
+            score_max=self.score_max or 0,
+            score_avg=round(self.score_sum / self.sample_count, 2) if self.sample_count else 0.0,
+            status_counts=dict(self.status_counts),
+            throughput_avg=(
+                round(self.throughput_sum / self.throughput_count, 3)
+                if self.throughput_count
+                else None
+            ),
+            load_avg=round(self.load_sum / self.load_count, 3) if self.load_count else None,
+        )
+
+
+def bucket_start(moment: datetime, width: timedelta) -> datetime:
+    """Floor ``moment`` to the start of its ``width``-sized bucket (aligned to the epoch)."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return _EPOCH + ((moment - _EPOCH) // width) * width
+
+
+def parse_resolution(value: str) -> timedelta:
+    match = _RESOLUTION_PATTERN.match(value)
+    if match is None or int(match.group(1)) == 0:
+        raise InvalidResolution(f"Unsupported resolution {value!r}; use e.g. 1m, 15m, 1h or 1d")
+    return timedelta(**{_RESOLUTION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def select_tier(width: timedelta) -> str:
+    """Return the coarsest stored tier whose buckets evenly subdivide ``width``."""
+    for name, tier_width in reversed(ROLLUP_RESOLUTIONS.items()):
+        if width >= tier_width and width % tier_width == timedelta(0):
+            return name
+    raise InvalidResolution("Resolution must be a whole multiple of one minute")
+
+
+def format_resolution(width: timedelta) -> str:
+    for unit, unit_width in (("d", timedelta(days=1)), ("h", timedelta(hours=1))):
+        if width % unit_width == timedelta(0):
+            return f"{width // unit_width}{unit}"
+    return f"{width // timedelta(minutes=1)}m"
+
+
+def rollup_retention(config: AppConfig) -> dict[str, timedelta | None]:
+    """How long each stored tier keeps its buckets; ``None`` keeps them forever."""
+    days = {
+        "1m": config.rollup_minute_retention_days,
+        "1h": config.rollup_hour_retention_days,
+        "1d": None,
+    }
+    return {name: None if value is None else timedelta(days=value) for name, value in days.items()}
+
+
+async def upsert_rollups(session: AsyncSession, samples: Iterable[Mapping[str, Any]]) -> None:
+    """Fold sample rows (``gate_id``, ``score``, ``status``, ``metrics``, ``recorded_at``)
+    into every rollup tier with additive upserts."""
+    buckets: dict[tuple[int, str, datetime], _Bucket] = {}
+    for sample in samples:
+        for name, width in ROLLUP_RESOLUTIONS.items():
+            key = (sample["gate_id"], name, bucket_start(sample["recorded_at"], width))
+            buckets.setdefault(key, _Bucket()).add_sample(
+                sample["score"], sample["status"], sample["metrics"]
+            )
+
+    rows = [
+        {
+            "gate_id": gate_id,
+            "resolution": resolution,
+            "bucket_start": start,
+            "sample_count": bucket.sample_count,
+            "score_min": bucket.score_min,
+            "score_max": bucket.score_max,
+            "score_sum": bucket.score_sum,
+            "pass_count": bucket.status_counts["pass"],
+            "warn_count": bucket.status_counts["warn"],
+            "fail_count": bucket.status_counts["fail"],
+            "throughput_sum": bucket.throughput_sum,
+            "throughput_count": bucket.throughput_count,
+            "load_sum": bucket.load_sum,
+            "load_count": bucket.load_count,
+        }
+        for (gate_id, resolution, start), bucket in buckets.items()
+    ]
+
+    table = GateRollup.__table__
+    for offset in range(0, len(rows), _UPSERT_BATCH_SIZE):
+        chunk = rows[offset : offset + _UPSERT_BATCH_SIZE]
+        stmt = dialect_insert(session, GateRollup).values(chunk)
+        additive = {
+            column: table.c[column] + stmt.excluded[column]
+            for column in (
+                "sample_count",
+                "score_sum",
+                "pass_count",
+                "warn_count",
+                "fail_count",
+                "throughput_sum",
+                "throughput_count",
+                "load_sum",
+                "load_count",
+            )
+        }
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[GateRollup.gate_id, GateRollup.resolution, GateRollup.bucket_start],
+                set_={
+                    **additive,
+                    "score_min": dialect_least(session, table.c.score_min, stmt.excluded.score_min),
+                    "score_max": dialect_greatest(
+                        session, table.c.score_max, stmt.excluded.score_max
+                    ),
+                },
+            )
+        )
+
+
+class RollupRepository:
+    """Reads gate history from the rollup tiers.
+
+    A history reaching further back than its tier's ``retention`` is served from the finest
+    tier still covering its start instead, coarsening the resolution to match; the response
+    reports the resolution actually used next to the requested one.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        retention: Mapping[str, timedelta | None] | None = None,
+    ):
+        self._session = session
+        self._retention = dict(retention or {})
+
+    async def get_gate_history(
+        self,
+        gate_name: str,
+        *,
+        start: datetime,
+        end: datetime,
+        resolution: str | None = None,
+    ) -> GateHistory:
+        gate = (
+            await self._session.execute(
+                select(HeroGate.id, HeroGate.name).where(
+                    func.lower(HeroGate.name) == gate_name.lower()
+                )
+            )
+        ).first()
+        if gate is None:
+            raise GateNotFound(gate_name)
+        gate_id, canonical_name = gate
+
+        requested = resolution
+        if resolution is None or resolution == "auto":
+            resolution = self._auto_resolution(end - start)
+        width = parse_resolution(resolution)
+        tier = select_tier(width)
+        covering = self._covering_tier(tier, start)
+        if covering != tier:
+            tier_width = ROLLUP_RESOLUTIONS[covering]
+            width = -(-width // tier_width) * tier_width
+            resolution, tier = format_resolution(width), covering
+
+        stmt = (
+            select(GateRollup)
+            .where(
+                GateRollup.gate_id == gate_id,
+                GateRollup.resolution == tier,
+                GateRollup.bucket_start >= bucket_start(start, width),
+                GateRollup.bucket_start < end,
+            )
+            .order_by(GateRollup.bucket_start.asc())
+        )
+
+        buckets: dict[datetime, _Bucket] = {}
+        for row in await self._session.scalars(stmt):
+            key = bucket_start(row.bucket_start, width)
+            buckets.setdefault(key, _Bucket()).merge(row)
+
+        return GateHistory(
+            gate=canonical_name,
+            resolution=resolution,
+            requested_resolution=requested,
+            tier=tier,
+            start=start,
+            end=end,
+            points=[bucket.as_point(key) for key, bucket in buckets.items()],
+        )
+
+    async def rebuild(self) -> int:
+        """Recompute every rollup tier from ``telemetry_samples``."""
+        await self._session.execute(delete(GateRollup))
+
+        sample_count = 0
+        result = await self._session.stream(
+            select(
+                TelemetrySample.gate_id,
+                TelemetrySample.score,
+                TelemetrySample.status,
+                TelemetrySample.metrics,
+                TelemetrySample.recorded_at,
+            ).execution_options(yield_per=_REBUILD_BATCH_SIZE)
+        )
+        async for partition in result.mappings().partitions():
+            await upsert_rollups(self._session, partition)
+            sample_count += len(partition)
+
+        await self._session.commit()
+        logger.info("Rebuilt telemetry rollups", extra={"sample_count": sample_count})
+        return sample_count
+
+    def _covering_tier(self, tier: str, start: datetime) -> str:
+        """Return the finest tier, no finer than ``tier``, still holding buckets at ``start``."""
+        now = utcnow()
+        names = list(ROLLUP_RESOLUTIONS)
+        for name in names[names.index(tier) :]:
+            retention = self._retention.get(name)
+            if retention is None or start >= now - retention:
+                return name
+        return names[-1]
+
+    @staticmethod
+    def _auto_resolution(span: timedelta) -> str:
+        for name, width in ROLLUP_RESOLUTIONS.items():
+            if span / width <= MAX_HISTORY_POINTS:
+                return name
+        return next(reversed(ROLLUP_RESOLUTIONS))
+
+
+__all__ = [
+    "MAX_HISTORY_POINTS",
+    "ROLLUP_RESOLUTIONS",
+    "GateNotFound",
+    "InvalidResolution",
+    "RollupRepository",
+    "bucket_start",
+    "format_resolution",
+    "parse_resolution",
+    "rollup_retention",
+    "select_tier",
+    "upsert_rollups",
+]
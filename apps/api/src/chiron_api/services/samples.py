@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import HeroGate, TelemetrySample
+from ..schemas.dashboard import TelemetrySampleOut, TelemetrySamplePage
+from .rollups import GateNotFound
+from .telemetry import decode_trend
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Rows fetched per round trip when streaming.
+_STREAM_BATCH_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(recorded_at: datetime, sample_id: int) -> str:
+    raw = f"{_as_utc(recorded_at).isoformat()}|{sample_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        recorded_at, sample_id = raw.split("|", 1)
+        return _as_utc(datetime.fromisoformat(recorded_at)), int(sample_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor("Malformed pagination cursor") from exc
+
+
+class SampleRepository:
+    """Reads raw telemetry samples ordered by ``(recorded_at, id)``."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_page(
+        self,
+        *,
+        gates: Sequence[str] = (),
+        start: datetime | None = None,
+        end: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> TelemetrySamplePage:
+        stmt = await self._build_query(gates, start, end)
+        if cursor is not None:
+            after_at, after_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(TelemetrySample.recorded_at, TelemetrySample.id) > (after_at, after_id)
+            )
+
+        # Fetch one extra row to learn whether another page exists.
+        rows = (await self._session.execute(stmt.limit(limit + 1))).all()
+        samples = [_sample_out(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = samples[-1]
+            next_cursor = encode_cursor(last.recorded_at, last.id)
+        return TelemetrySamplePage(samples=samples, next_cursor=next_cursor)
+
+    async def stream(
+        self,
+        *,
+        gates: Sequence[str] = (),
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> AsyncIterator[list[TelemetrySampleOut]]:
+        """Yield every matching sample in batches without materialising the result set."""
+        stmt = await self._build_query(gates, start, end)
+        result = await self._session.stream(stmt.execution_options(yield_per=_STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [_sample_out(row) for row in partition]
+
+    async def _build_query(
+        self,
+        gates: Sequence[str],
+        start: datetime | None,
+        end: datetime | None,
+    ) -> Select[Any]:
+        stmt = (
+            select(
+                TelemetrySample.id,
+                HeroGate.name,
+                TelemetrySample.score,
+                TelemetrySample.status,
+                TelemetrySample.metrics,
+                TelemetrySample.trend_packed,
+                TelemetrySample.recorded_at,
+            )
+            .join(HeroGate, HeroGate.id == TelemetrySample.gate_id)
+            .order_by(TelemetrySample.recorded_at.asc(), TelemetrySample.id.asc())
+        )
+        if gates:
+            stmt = stmt.where(TelemetrySample.gate_id.in_(await self._resolve_gate_ids(gates)))
+        if start is not None:
+            stmt = stmt.where(TelemetrySample.recorded_at >= start)
+        if end is not None:
+            stmt = stmt.where(TelemetrySample.recorded_at < end)
+        return stmt
+
+    async def _resolve_gate_ids(self, gates: Sequence[str]) -> list[int]:
+        wanted = {name.lower() for name in gates}
+        result = await self._session.execute(
+            select(HeroGate.id, func.lower(HeroGate.name)).where(
+                func.lower(HeroGate.name).in_(wanted)
+            )
+        )
+        gate_ids = dict(result.all())
+        missing = wanted - set(gate_ids.values())
+        if missing:
+            raise GateNotFound(", ".join(sorted(missing)))
+        return list(gate_ids)
+
+
+def _sample_out(row: Any) -> TelemetrySampleOut:
+    sample_id, gate, score, status, metrics, trend_packed, recorded_at = row
+    metrics = dict(metrics) if isinstance(metrics, dict) else {}
+    if trend_packed is not None:
+        metrics["trend"] = decode_trend(trend_packed, gate)
+    return TelemetrySampleOut(
+        id=sample_id,
+        gate=gate,
+        score=score,
+        status=status,
+        metrics=metrics,
+        recorded_at=_as_utc(recorded_at),
+    )
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "InvalidCursor",
+    "SampleRepository",
+    "decode_cursor",
+    "encode_cursor",
+]
@@ -2,63 +2,676 @@ from __future__ import annotations
 
 import asyncio
 import json
-from collections.abc import AsyncGenerator
+import re
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Callable, Iterable, Iterator, Sequence
+from datetime import datetime
 from logging import getLogger
-from typing import Any
+from time import time
+from typing import Any, Literal
+from uuid import uuid4
 
 from redis.asyncio import Redis
 
-from ..schemas.dashboard import DashboardSummary
+from ..schemas.dashboard import DashboardSummary, TelemetrySnapshotIn
+from .deltas import summary_patch, timeline_additions
+from .mailbox import EventKey, OverflowPolicy, SubscriberMailbox, SubscriberRegistry
+from .summary import DashboardSummaryState, dump_ingest, load_ingest
+from .telemetry import with_snapshot_metadata
+from .topics import (
+    ALL_GATES_TOPIC,
+    ALL_JOBS_TOPIC,
+    TIMELINE_TOPIC,
+    TopicMessage,
+    gate_topic,
+    is_job_topic,
+    job_topic,
+    normalize_topics,
+)
 
 logger = getLogger(__name__)
 
+StreamMode = Literal["full", "delta"]
+
+REDIS_STREAM_KEY = "telemetry:dashboard"
+# Stream entries carrying a job state change rather than a dashboard summary.
+_JOB_ENTRY_KIND = "job"
+
+_EVENT_ID_PATTERN = re.compile(r"^(\d+)(?:-(\d+))?$")
+_READ_BLOCK_MS = 5000
+_READ_COUNT = 100
+_RECONNECT_DELAY_SECONDS = 1.0
+# Mailboxes filled per broadcast step before yielding so subscriber tasks can start writing.
+_BROADCAST_BATCH_SIZE = 512
+_HEARTBEAT_FRAME = b": keepalive\n\n"
+# Topics usually have few subscribers each, so their registries need fewer shards.
+_TOPIC_SHARDS = 8
+# Queued in place of a topic subscriber's backlog; replaced by a snapshot when read.
+_TOPIC_RESYNC = TopicMessage({"type": "resync"})
+# Latest state of this many recently published jobs is kept for topic snapshots.
+_TRACKED_JOBS = 256
+
+
+def encode_sse_frame(
+    data: str, *, event_id: int | str | None = None, event: str | None = None
+) -> bytes:
+    """Encode one server-sent event; ``data`` must be single-line JSON."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}\n")
+    if event is not None:
+        lines.append(f"event: {event}\n")
+    lines.append(f"data: {data}\n\n")
+    return "".join(lines).encode()
+
+
+def parse_event_id(value: str | None) -> EventKey | None:
+    """Parse an ``<ms>-<seq>`` event id (a bare ``<ms>`` means sequence 0) for ordering."""
+    if value is None:
+        return None
+    match = _EVENT_ID_PATTERN.match(value.strip())
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2) or 0)
+
 
 class TelemetryStreamBroker:
-    """Fan-out broker for dashboard telemetry streaming."""
+    """Fan-out broker for dashboard telemetry streaming.
+
+    Each published summary is serialised once into an immutable SSE frame that every
+    subscriber queue shares, so fan-out cost does not grow with the number of clients.
+
+    Delta subscribers receive a ``keyframe`` event with the full summary on connect and then
+    ``patch`` events holding JSON Patch operations against the previous event, with a fresh
+    keyframe every ``keyframe_interval`` publishes so clients can resynchronise.
+
+    Every subscriber reads from its own :class:`SubscriberMailbox`, so a slow client only
+    affects itself according to its overflow policy. Mailboxes live in copy-on-write
+    registries, so publishing never locks or copies the subscriber set, and idle
+    subscribers get a comment frame every ``heartbeat_seconds`` to keep proxies from
+    closing the connection.
+
+    WebSocket clients instead subscribe to topics (see :meth:`subscribe_topics`): each
+    event is routed as ``gate`` messages for the gates that changed and a ``timeline``
+    message for new timeline entries, only to the subscribers of those topics. Job state
+    changes (see :meth:`publish_job`) go to ``job:<id>`` and ``job:*`` subscribers.
 
-    def __init__(self, redis_client: Redis | None = None) -> None:
+    With Redis, publishes are appended to the ``telemetry:dashboard`` stream and event ids are
+    Redis stream ids. One consumer task per process (see :meth:`start`) relays entries
+    published by other workers to local subscribers, skipping this broker's own entries.
+    Given the process's ``summary_state``, the consumer folds each entry's snapshots into it
+    and relays the resulting summary, so every worker streams the same dashboard.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        *,
+        keyframe_interval: int = 50,
+        redis_maxlen: int = 1000,
+        overflow_policy: OverflowPolicy = "conflate",
+        subscriber_buffer: int = 100,
+        heartbeat_seconds: float = 15.0,
+        summary_state: DashboardSummaryState | None = None,
+    ) -> None:
         self._redis = redis_client
-        self._subscribers: set[asyncio.Queue[dict[str, Any]]] = set()
-        self._lock = asyncio.Lock()
+        self._summary_state = summary_state
+        self._origin = uuid4().hex
+        self._redis_maxlen = redis_maxlen
+        self._consumer: asyncio.Task[None] | None = None
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._heartbeat_seconds = heartbeat_seconds
+        self._overflow_policy = overflow_policy
+        self._subscriber_buffer = subscriber_buffer
+        self._subscribers = SubscriberRegistry()
+        self._delta_subscribers = SubscriberRegistry()
+        self._topic_subscribers: dict[str, SubscriberRegistry] = {}
+        self._last_key: EventKey = (0, 0)
+        self._last_job_key: EventKey = (0, 0)
+        self._jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._last_event_id = "0"
+        self._last_summary: DashboardSummary | None = None
+        self._keyframe_interval = max(1, keyframe_interval)
+        self._last_payload: dict[str, Any] | None = None
+        self._last_payload_event_id: str | None = None
+        self._patches_since_keyframe = 0
 
-    async def publish(self, summary: DashboardSummary) -> None:
-        payload = summary.model_dump(mode="json")
-        await self._broadcast(payload)
+    @property
+    def last_event_id(self) -> str:
+        """Id of the most recently dispatched event."""
+        return self._last_event_id
+
+    def stats(self) -> dict[str, int]:
+        lags = [mailbox.lag for mailbox in self._mailboxes()]
+        return {
+            "subscribers": len(self._subscribers),
+            "delta_subscribers": len(self._delta_subscribers),
+            "topics": len(self._topic_subscribers),
+            "lagging_subscribers": sum(1 for lag in lags if lag),
+            "pending_frames": sum(lags),
+        }
 
+    async def start(self) -> None:
+        if self._redis is not None and self._consumer is None:
+            self._consumer = asyncio.create_task(self._consume(), name="telemetry-stream-consumer")
+        if self._heartbeat_seconds > 0 and self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(
+                self._send_heartbeats(), name="telemetry-stream-heartbeat"
+            )
+
+    async def stop(self) -> None:
+        for task in (self._consumer, self._heartbeat):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._consumer = None
+        self._heartbeat = None
+
+    async def publish(
+        self,
+        summary: DashboardSummary,
+        *,
+        snapshots: Sequence[TelemetrySnapshotIn] = (),
+        recorded_at: Sequence[datetime] = (),
+    ) -> None:
+        """Publish ``summary`` along with the persisted snapshots it was built from.
+
+        Other workers fold ``snapshots`` into their own summary state instead of adopting
+        ``summary``, so no worker's dashboard overwrites ingests it has not seen.
+        """
+        data = summary.model_dump_json()
+        event_id = None
         if self._redis is not None:
+            fields = {"payload": data, "origin": self._origin}
+            if snapshots:
+                fields["ingest"] = dump_ingest(snapshots, recorded_at)
             try:
-                await self._redis.xadd("telemetry:dashboard", {"payload": json.dumps(payload)})
+                event_id = await self._redis.xadd(
+                    REDIS_STREAM_KEY, fields, maxlen=self._redis_maxlen, approximate=True
+                )
             except Exception as exc:  # pragma: no cover - Redis optional in dev
                 logger.warning("Failed to publish telemetry event to redis", exc_info=exc)
 
-    async def stream(self) -> AsyncGenerator[dict[str, Any], None]:
-        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=100)
-        async with self._lock:
-            self._subscribers.add(queue)
-        logger.info(
-            "Dashboard stream subscriber connected",
-            extra={"subscribers": len(self._subscribers)},
+        if event_id is None:
+            event_id = self._next_local_event_id()
+        latest = self._summary_state.snapshot() if self._summary_state is not None else None
+        if latest is None or summary.generation is None:
+            # Not built by the summary state (read from the database instead); send as is.
+            await self._dispatch(event_id, summary, data)
+            return
+        if latest.generation != summary.generation:
+            # Relayed ingests were folded in while this event was being appended.
+            summary = with_snapshot_metadata(latest, snapshots)
+            data = summary.model_dump_json()
+        await self._dispatch(event_id, summary, data, current=True)
+
+    async def refresh(self) -> None:
+        """Send the summary state's latest snapshot to this process's subscribers.
+
+        For changes the state picked up outside the stream (see ``DashboardSummaryResync``);
+        every worker reconciles on its own, so nothing is appended to Redis.
+        """
+        latest = self._summary_state.snapshot() if self._summary_state is not None else None
+        if latest is None or latest is self._last_summary:
+            return
+        await self._dispatch(
+            self._next_local_event_id(), latest, latest.model_dump_json(), current=True
         )
+
+    async def publish_job(self, job: dict[str, Any]) -> None:
+        """Publish a job's current state (a JSON-compatible dict with a ``job_id``)."""
+        event_id = None
+        if self._redis is not None:
+            try:
+                event_id = await self._redis.xadd(
+                    REDIS_STREAM_KEY,
+                    {
+                        "payload": json.dumps(job, separators=(",", ":")),
+                        "origin": self._origin,
+                        "kind": _JOB_ENTRY_KIND,
+                    },
+                    maxlen=self._redis_maxlen,
+                    approximate=True,
+                )
+            except Exception as exc:  # pragma: no cover - Redis optional in dev
+                logger.warning("Failed to publish job event to redis", exc_info=exc)
+
+        if event_id is None:
+            event_id = self._next_local_event_id()
+        await self._dispatch_job(event_id, job)
+
+    async def stream(
+        self,
+        initial: DashboardSummary,
+        *,
+        mode: StreamMode = "full",
+        last_event_id: str | None = None,
+        overflow_policy: OverflowPolicy | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """Yield SSE frames, starting with the latest published summary (or ``initial``).
+
+        A client reconnecting with the current ``Last-Event-ID`` gets no initial frame; a
+        delta client behind by a few events gets one catch-up patch when Redis still holds
+        the summary it last saw. The stream ends if the overflow policy disconnects it.
+        """
+        subscribers = self._delta_subscribers if mode == "delta" else self._subscribers
+        mailbox = SubscriberMailbox(
+            policy=overflow_policy or self._overflow_policy,
+            capacity=self._subscriber_buffer,
+            snapshots=mode == "full",
+        )
+        # No await between registering and reading the latest event, so none can slip between.
+        subscribers.add(mailbox)
+        start = self._last_key
+        start_event_id = self._last_event_id
+        summary = self._last_summary or initial
+        logger.debug("Dashboard stream subscriber connected")
         try:
-            while True:
-                payload = await queue.get()
-                yield payload
+            if parse_event_id(last_event_id) != start:
+                yield await self._initial_frame(summary, start_event_id, mode, last_event_id)
+            while (item := await mailbox.get()) is not None:
+                key, frame = item
+                if key > start:
+                    yield frame
         finally:
-            async with self._lock:
-                self._subscribers.discard(queue)
-            logger.info(
+            subscribers.discard(mailbox)
+            logger.debug(
                 "Dashboard stream subscriber disconnected",
-                extra={"subscribers": len(self._subscribers)},
+                extra={
+                    "delivered": mailbox.delivered,
+                    "dropped": mailbox.dropped,
+                    "max_lag": mailbox.max_lag,
+                },
             )
 
-    async def _broadcast(self, payload: dict[str, Any]) -> None:
-        async with self._lock:
-            subscribers = list(self._subscribers)
-        if not subscribers:
-            return
+    def subscribe_topics(
+        self,
+        initial: DashboardSummary,
+        *,
+        overflow_policy: OverflowPolicy | None = None,
+    ) -> TopicSubscription:
+        """Open a topic subscription; ``initial`` stands in until something is published."""
+        mailbox = SubscriberMailbox(
+            policy=overflow_policy or self._overflow_policy,
+            capacity=self._subscriber_buffer,
+            snapshots=False,
+        )
+        return TopicSubscription(self, mailbox, initial)
 
-        for queue in subscribers:
+    def topic_snapshot(
+        self, topics: Iterable[str], initial: DashboardSummary | None = None
+    ) -> TopicMessage:
+        """Current state of ``topics`` (normalised names) as a ``snapshot`` message."""
+        topics = set(topics)
+        summary = self._last_summary or initial
+        gates = summary.hero_gates if summary is not None else []
+        payload: dict[str, Any] = {
+            "type": "snapshot",
+            "id": self._last_event_id,
+            "topics": sorted(topics),
+            "gates": [
+                gate.model_dump(mode="json")
+                for gate in gates
+                if ALL_GATES_TOPIC in topics or gate_topic(gate.name) in topics
+            ],
+        }
+        if TIMELINE_TOPIC in topics:
+            timeline = summary.timeline if summary is not None else []
+            payload["timeline"] = [event.model_dump(mode="json") for event in timeline]
+        if any(is_job_topic(topic) for topic in topics):
+            # ``job:*`` starts with the jobs still in flight; finished ones need their own topic.
+            payload["jobs"] = [
+                job
+                for job_id, job in self._jobs.items()
+                if job_topic(job_id) in topics
+                or (ALL_JOBS_TOPIC in topics and job.get("finished_at") is None)
+            ]
+        return TopicMessage(payload)
+
+    async def _initial_frame(
+        self,
+        summary: DashboardSummary,
+        event_id: str,
+        mode: StreamMode,
+        last_event_id: str | None,
+    ) -> bytes:
+        data = summary.model_dump_json()
+        if mode != "delta":
+            return encode_sse_frame(data, event_id=event_id)
+
+        previous = await self._fetch_payload(last_event_id)
+        if previous is None:
+            return encode_sse_frame(data, event_id=event_id, event="keyframe")
+        patch = {
+            "base": last_event_id,
+            "ops": summary_patch(previous, summary.model_dump(mode="json")),
+        }
+        return encode_sse_frame(
+            json.dumps(patch, separators=(",", ":")), event_id=event_id, event="patch"
+        )
+
+    async def _fetch_payload(self, event_id: str | None) -> dict[str, Any] | None:
+        if self._redis is None or event_id is None or parse_event_id(event_id) is None:
+            return None
+        try:
+            entries = await self._redis.xrange(REDIS_STREAM_KEY, event_id, event_id, count=1)
+        except Exception as exc:  # pragma: no cover - Redis optional in dev
+            logger.warning("Failed to read telemetry event from redis", exc_info=exc)
+            return None
+        if not entries:
+            return None
+        _, fields = entries[0]
+        return json.loads(fields["payload"])
+
+    async def _consume(self) -> None:
+        # Only relay entries appended after this process started.
+        last_id = "$"
+        while True:
             try:
-                queue.put_nowait(payload)
-            except asyncio.QueueFull:  # pragma: no cover - transient condition
-                logger.warning("Dropping telemetry payload for slow subscriber")
+                response = await self._redis.xread(
+                    {REDIS_STREAM_KEY: last_id}, block=_READ_BLOCK_MS, count=_READ_COUNT
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - Redis optional in dev
+                logger.warning("Telemetry stream consumer failed; retrying", exc_info=exc)
+                await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+                continue
+
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    if fields.get("origin") == self._origin:
+                        continue
+                    if fields.get("kind") == _JOB_ENTRY_KIND:
+                        try:
+                            job = json.loads(fields["payload"])
+                        except (KeyError, ValueError) as exc:
+                            logger.warning(
+                                "Skipping malformed job stream entry",
+                                exc_info=exc,
+                                extra={"entry_id": entry_id},
+                            )
+                            continue
+                        await self._dispatch_job(entry_id, job)
+                        continue
+                    try:
+                        data = fields["payload"]
+                        summary = DashboardSummary.model_validate_json(data)
+                        ingest = load_ingest(fields["ingest"]) if "ingest" in fields else None
+                    except Exception as exc:
+                        logger.warning(
+                            "Skipping malformed telemetry stream entry",
+                            exc_info=exc,
+                            extra={"entry_id": entry_id},
+                        )
+                        continue
+                    await self._relay(entry_id, summary, data, ingest)
+
+    async def _relay(
+        self,
+        event_id: str,
+        summary: DashboardSummary,
+        data: str,
+        ingest: tuple[list[TelemetrySnapshotIn], list[datetime]] | None,
+    ) -> None:
+        state = self._summary_state
+        if state is None or ingest is None:
+            await self._dispatch(event_id, summary, data)
+            return
+        snapshots, recorded_at = ingest
+        folded = state.fold(snapshots, recorded_at)
+        if folded is None:
+            # Not seeded yet; the seed replays the ingest, so the origin's summary stands in.
+            await self._dispatch(event_id, summary, data)
+            return
+        summary = with_snapshot_metadata(folded, snapshots)
+        await self._dispatch(event_id, summary, summary.model_dump_json(), current=True)
+
+    async def _dispatch(
+        self, event_id: str, summary: DashboardSummary, data: str, *, current: bool = False
+    ) -> None:
+        """Fan ``summary`` out to subscribers.
+
+        ``current`` marks the summary state's latest snapshot: it supersedes whatever was
+        dispatched before, so it goes out under a fresh local id when its own id is stale.
+        """
+        key = parse_event_id(event_id)
+        if key is None:
+            return
+        if key <= self._last_key:
+            if not current:
+                # Already superseded by a newer event; subscribers only need the latest state.
+                return
+            event_id = self._next_local_event_id()
+            key = parse_event_id(event_id)
+        self._last_key = key
+        self._last_event_id = event_id
+        previous, self._last_summary = self._last_summary, summary
+
+        full_frame = encode_sse_frame(data, event_id=event_id)
+        await self._broadcast(self._subscribers, key, full_frame)
+
+        if self._topic_subscribers:
+            await self._route_topics(key, event_id, previous, summary)
+
+        if not self._delta_subscribers:
+            # Without a delta subscriber there is no base to diff the next publish against.
+            self._last_payload = None
+            return
+
+        delta_frame = self._delta_frame(summary, data, event_id)
+        keyframe: bytes | None = None
+
+        def resync() -> bytes:
+            # Built at most once per event, and only if a lagging subscriber needs it.
+            nonlocal keyframe
+            if keyframe is None:
+                keyframe = encode_sse_frame(data, event_id=event_id, event="keyframe")
+            return keyframe
+
+        await self._broadcast(self._delta_subscribers, key, delta_frame, resync)
+
+    async def _dispatch_job(self, event_id: str, job: dict[str, Any]) -> None:
+        key = parse_event_id(event_id)
+        if key is None or key <= self._last_job_key:
+            return
+        self._last_job_key = key
+        job_id = str(job["job_id"])
+        self._jobs[job_id] = job
+        self._jobs.move_to_end(job_id)
+        while len(self._jobs) > _TRACKED_JOBS:
+            self._jobs.popitem(last=False)
+
+        message = TopicMessage({"type": "job", "id": event_id, "job": job})
+        # Same key for both topics, so a client subscribed to both gets the message once.
+        for topic in (job_topic(job_id), ALL_JOBS_TOPIC):
+            registry = self._topic_subscribers.get(topic)
+            if registry is not None:
+                await self._broadcast(registry, (*key, 0), message, _topic_resync)
+
+    async def _route_topics(
+        self,
+        key: EventKey,
+        event_id: str,
+        previous: DashboardSummary | None,
+        summary: DashboardSummary,
+    ) -> None:
+        previous_gates = (
+            {gate.name.lower(): gate for gate in previous.hero_gates} if previous else {}
+        )
+        all_gates = self._topic_subscribers.get(ALL_GATES_TOPIC)
+        for index, gate in enumerate(summary.hero_gates):
+            subscribers = self._topic_subscribers.get(gate_topic(gate.name))
+            if subscribers is None and all_gates is None:
+                continue
+            if previous_gates.get(gate.name.lower()) == gate:
+                continue
+            message = TopicMessage(
+                {"type": "gate", "id": event_id, "gate": gate.model_dump(mode="json")}
+            )
+            # One sub-key per message keeps an event's messages in order, and a client
+            # subscribed to both ``gate:<name>`` and ``gate:*`` receives each one once.
+            for registry in (subscribers, all_gates):
+                if registry is not None:
+                    await self._broadcast(registry, (*key, index), message, _topic_resync)
+
+        subscribers = self._topic_subscribers.get(TIMELINE_TOPIC)
+        previous_timeline = previous.timeline if previous is not None else []
+        if subscribers is None or summary.timeline == previous_timeline:
+            return
+        added = timeline_additions(previous_timeline, summary.timeline)
+        message = TopicMessage(
+            {
+                "type": "timeline",
+                "id": event_id,
+                # Newest first; clients drop entries beyond ``length`` from the tail.
+                "events": [event.model_dump(mode="json") for event in summary.timeline[:added]],
+                "length": len(summary.timeline),
+            }
+        )
+        await self._broadcast(subscribers, (*key, len(summary.hero_gates)), message, _topic_resync)
+
+    def _add_topics(self, mailbox: SubscriberMailbox, topics: Iterable[str]) -> None:
+        for topic in topics:
+            registry = self._topic_subscribers.get(topic)
+            if registry is None:
+                registry = self._topic_subscribers[topic] = SubscriberRegistry(_TOPIC_SHARDS)
+            registry.add(mailbox)
+
+    def _remove_topics(self, mailbox: SubscriberMailbox, topics: Iterable[str]) -> None:
+        for topic in topics:
+            registry = self._topic_subscribers.get(topic)
+            if registry is None:
+                continue
+            registry.discard(mailbox)
+            if not registry:
+                del self._topic_subscribers[topic]
+
+    def _next_local_event_id(self) -> str:
+        # Same shape as Redis stream ids, so ids stay ordered across restarts and fallbacks.
+        milliseconds, sequence = max(self._last_key, self._last_job_key, (int(time() * 1000), 0))
+        return f"{milliseconds}-{sequence + 1}"
+
+    def _delta_frame(self, summary: DashboardSummary, data: str, event_id: str) -> bytes:
+        payload = summary.model_dump(mode="json")
+        previous, self._last_payload = self._last_payload, payload
+        base, self._last_payload_event_id = self._last_payload_event_id, event_id
+        if previous is None or self._patches_since_keyframe >= self._keyframe_interval:
+            self._patches_since_keyframe = 0
+            return encode_sse_frame(data, event_id=event_id, event="keyframe")
+
+        self._patches_since_keyframe += 1
+        patch = {"base": base, "ops": summary_patch(previous, payload)}
+        return encode_sse_frame(
+            json.dumps(patch, separators=(",", ":")), event_id=event_id, event="patch"
+        )
+
+    async def _broadcast(
+        self,
+        subscribers: SubscriberRegistry,
+        key: EventKey,
+        frame: Any,
+        resync: Callable[[], Any] | None = None,
+    ) -> None:
+        filled = 0
+        for shard in subscribers.snapshot():
+            for mailbox in shard:
+                mailbox.put(key, frame, resync)
+            filled += len(shard)
+            if filled >= _BROADCAST_BATCH_SIZE:
+                filled = 0
+                await asyncio.sleep(0)
+
+    async def _send_heartbeats(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            for mailbox in self._mailboxes():
+                mailbox.heartbeat(_HEARTBEAT_FRAME)
+
+    def _mailboxes(self) -> Iterator[SubscriberMailbox]:
+        for registry in (self._subscribers, self._delta_subscribers):
+            for shard in registry.snapshot():
+                yield from shard
+
+
+class TopicSubscription:
+    """One WebSocket client's topics, fed by :class:`TelemetryStreamBroker`.
+
+    Every subscribe is answered with a snapshot of the requested topics, queued in the same
+    mailbox as the updates, so a client never sees an update older than its snapshot. With
+    the ``conflate`` policy a client that falls behind has its backlog replaced by a fresh
+    snapshot of all its topics.
+    """
+
+    def __init__(
+        self, broker: TelemetryStreamBroker, mailbox: SubscriberMailbox, initial: DashboardSummary
+    ) -> None:
+        self._broker = broker
+        self._mailbox = mailbox
+        self._initial = initial
+        self.topics: set[str] = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._mailbox.closed
+
+    def subscribe(self, topics: Iterable[str]) -> None:
+        """Add ``topics`` (raises :class:`InvalidTopic`) and queue their snapshot."""
+        requested = normalize_topics(topics)
+        added = [topic for topic in requested if topic not in self.topics]
+        self._broker._add_topics(self._mailbox, added)
+        self.topics.update(added)
+        # No await since registering, so the snapshot precedes every update routed here.
+        self._mailbox.push(self._broker.topic_snapshot(requested, self._initial))
+
+    def unsubscribe(self, topics: Iterable[str]) -> None:
+        removed = [topic for topic in normalize_topics(topics) if topic in self.topics]
+        self._broker._remove_topics(self._mailbox, removed)
+        self.topics.difference_update(removed)
+        self._mailbox.push(TopicMessage({"type": "unsubscribed", "topics": sorted(removed)}))
+
+    def reply(self, payload: dict[str, Any]) -> None:
+        """Queue a message for this client only, after the updates already queued."""
+        self._mailbox.push(TopicMessage(payload))
+
+    async def get(self) -> TopicMessage | None:
+        """Return the next message, or ``None`` once the subscription has been closed."""
+        item = await self._mailbox.get()
+        if item is None:
+            return None
+        _, message = item
+        if message is _TOPIC_RESYNC:
+            return self._broker.topic_snapshot(self.topics, self._initial)
+        return message
+
+    def close(self) -> None:
+        self._broker._remove_topics(self._mailbox, self.topics)
+        self.topics.clear()
+        self._mailbox.close()
+        logger.debug(
+            "Dashboard topic subscriber disconnected",
+            extra={
+                "delivered": self._mailbox.delivered,
+                "dropped": self._mailbox.dropped,
+                "max_lag": self._mailbox.max_lag,
+            },
+        )
+
+
+def _topic_resync() -> TopicMessage:
+    return _TOPIC_RESYNC
+
+
+__all__ = [
+    "REDIS_STREAM_KEY",
+    "StreamMode",
+    "TelemetryStreamBroker",
+    "TopicSubscription",
+    "encode_sse_frame",
+    "parse_event_id",
+]
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from bisect import insort
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..db.models import utcnow
+from ..schemas.dashboard import (
+    DashboardSummary,
+    HeroGatePayload,
+    HeroGateSummary,
+    TelemetrySnapshotIn,
+    TimelineEventPayload,
+    TimelineEventSummary,
+)
+from .telemetry import TelemetryRepository, dedupe_gates, status_from_score
+
+if TYPE_CHECKING:
+    from .streaming import TelemetryStreamBroker
+
+logger = getLogger(__name__)
+
+_SEEDED_AT = datetime.min.replace(tzinfo=timezone.utc)
+# Ingests relayed from other workers before the state is seeded; replayed by the seed.
+_PENDING_LIMIT = 1000
+
+
+class DashboardSummaryState:
+    """Materialised dashboard summary kept current from ingested snapshots.
+
+    The state is seeded once from the database and then updated in place with the payloads
+    the ingest path already holds, so reads never query the database. Every change bumps a
+    monotonically increasing ``generation``.
+
+    Snapshots ingested by other workers are folded in as the stream broker relays them
+    (see :meth:`fold`). Folding is order-independent: each gate keeps its most recently
+    recorded sample and the timeline keeps the newest distinct events, so every worker
+    converges on the same summary whatever order the relay delivers ingests in. What the
+    relay misses is reconciled from the database by :class:`DashboardSummaryResync`.
+    """
+
+    def __init__(self, *, timeline_limit: int = 10) -> None:
+        self._timeline_limit = timeline_limit
+        self._gates: dict[str, HeroGateSummary] = {}
+        self._gate_recorded_at: dict[str, datetime] = {}
+        self._gate_order: list[tuple[str, str]] = []
+        self._timeline: list[TimelineEventSummary] = []
+        self._score_total = 0
+        self._pass_count = 0
+        self._generation = 0
+        self._summary: DashboardSummary | None = None
+        self._pending: deque[tuple[Sequence[TelemetrySnapshotIn], Sequence[datetime]]] = deque(
+            maxlen=_PENDING_LIMIT
+        )
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @property
+    def is_seeded(self) -> bool:
+        return self._summary is not None
+
+    def snapshot(self) -> DashboardSummary | None:
+        return self._summary
+
+    async def seed_from_database(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> DashboardSummary:
+        async with session_factory() as session:
+            repo = TelemetryRepository(session)
+            gates = await repo.get_latest_gates()
+            timeline = await repo.get_timeline()
+        self._reset()
+        self._merge(gates, timeline)
+        return self._seeded()
+
+    def seed(self, summary: DashboardSummary) -> DashboardSummary:
+        """Replace the state wholesale with a summary computed elsewhere."""
+        self._reset()
+        self._merge([(gate, _SEEDED_AT) for gate in summary.hero_gates], summary.timeline)
+        return self._seeded()
+
+    def merge(
+        self,
+        gates: Sequence[tuple[HeroGateSummary, datetime]],
+        timeline: Sequence[TimelineEventSummary],
+    ) -> DashboardSummary | None:
+        """Reconcile with gates read elsewhere (each with its sample's ``recorded_at``).
+
+        A gate is replaced unless the state already holds a newer sample for it, and the
+        timeline keeps the newest distinct events of both. Returns the new summary, or
+        ``None`` when nothing changed.
+        """
+        if not self.is_seeded or not self._merge(gates, timeline):
+            return None
+        return self._publish()
+
+    def _reset(self) -> None:
+        self._gates.clear()
+        self._gate_recorded_at.clear()
+        self._gate_order.clear()
+        self._timeline = []
+        self._score_total = 0
+        self._pass_count = 0
+
+    def _seeded(self) -> DashboardSummary:
+        # Relayed ingests the seed may predate; folding them again is harmless.
+        while self._pending:
+            self._fold(*self._pending.popleft())
+        logger.info(
+            "Dashboard summary state seeded",
+            extra={"hero_gate_count": len(self._gates), "generation": self._generation + 1},
+        )
+        return self._publish()
+
+    def _merge(
+        self,
+        gates: Sequence[tuple[HeroGateSummary, datetime]],
+        timeline: Sequence[TimelineEventSummary],
+    ) -> bool:
+        changed = False
+        for gate, recorded_at in gates:
+            key = gate.name.lower()
+            existing = self._gates.get(key)
+            if existing is not None and (
+                recorded_at < self._gate_recorded_at[key]
+                or (recorded_at == self._gate_recorded_at[key] and gate == existing)
+            ):
+                continue
+            self._store_gate(key, gate, recorded_at)
+            changed = True
+        return self._merge_timeline([_as_utc(event) for event in timeline]) or changed
+
+    def apply(
+        self,
+        snapshots: Sequence[TelemetrySnapshotIn],
+        recorded_at: Sequence[datetime],
+    ) -> DashboardSummary:
+        """Fold persisted snapshots into the state and return the new summary."""
+        self._fold(snapshots, recorded_at)
+        return self._publish()
+
+    def fold(
+        self,
+        snapshots: Sequence[TelemetrySnapshotIn],
+        recorded_at: Sequence[datetime],
+    ) -> DashboardSummary | None:
+        """Apply snapshots another worker persisted; returns ``None`` until seeded."""
+        if not self.is_seeded:
+            self._pending.append((snapshots, recorded_at))
+            return None
+        return self.apply(snapshots, recorded_at)
+
+    def _fold(
+        self,
+        snapshots: Sequence[TelemetrySnapshotIn],
+        recorded_at: Sequence[datetime],
+    ) -> None:
+        events: list[TimelineEventSummary] = []
+        for snapshot, snapshot_recorded_at in zip(snapshots, recorded_at, strict=True):
+            for payload in dedupe_gates(snapshot.hero_gates):
+                self._apply_gate(payload, snapshot_recorded_at)
+            events.extend(_timeline_summary(event) for event in snapshot.timeline)
+
+        self._merge_timeline(events)
+
+    def _merge_timeline(self, events: Sequence[TimelineEventSummary]) -> bool:
+        # The same event may arrive from the relay and again from the database.
+        merged = list(self._timeline)
+        merged.extend(event for event in events if event not in merged)
+        timeline = sorted(merged, key=_occurred_at, reverse=True)[: self._timeline_limit]
+        if timeline == self._timeline:
+            return False
+        self._timeline = timeline
+        return True
+
+    def _apply_gate(self, payload: HeroGatePayload, recorded_at: datetime) -> None:
+        key = payload.name.lower()
+        existing = self._gates.get(key)
+
+        if existing is None:
+            name = payload.name
+            baseline = payload.baseline or payload.score
+        else:
+            if recorded_at < self._gate_recorded_at[key]:
+                # A concurrent ingest already stored a newer sample for this gate.
+                if payload.baseline is not None:
+                    self._store_gate(
+                        key,
+                        _with_baseline(existing, payload.baseline),
+                        self._gate_recorded_at[key],
+                    )
+                return
+            name = existing.name
+            baseline = payload.baseline if payload.baseline is not None else existing.baseline
+
+        metrics = payload.metrics
+        self._store_gate(
+            key,
+            HeroGateSummary(
+                name=name,
+                score=payload.score,
+                status=payload.status or status_from_score(payload.score),
+                baseline=baseline,
+                delta=float(payload.score - baseline),
+                trend=list(metrics.trend) if metrics else [],
+                throughput=metrics.throughput if metrics else None,
+                load=metrics.load if metrics else None,
+            ),
+            recorded_at,
+        )
+
+    def _store_gate(self, key: str, gate: HeroGateSummary, recorded_at: datetime) -> None:
+        previous = self._gates.get(key)
+        if previous is None:
+            insort(self._gate_order, (gate.name, key))
+        else:
+            self._score_total -= previous.score
+            self._pass_count -= previous.status == "pass"
+
+        self._gates[key] = gate
+        self._gate_recorded_at[key] = recorded_at
+        self._score_total += gate.score
+        self._pass_count += gate.status == "pass"
+
+    def _publish(self) -> DashboardSummary:
+        metadata: dict[str, object] = {}
+        if self._gates:
+            metadata["average_score"] = round(self._score_total / len(self._gates), 2)
+            metadata["pass_rate"] = round(self._pass_count / len(self._gates), 2)
+
+        self._generation += 1
+        self._summary = DashboardSummary(
+            generated_at=utcnow(),
+            hero_gates=[self._gates[key] for _, key in self._gate_order],
+            timeline=list(self._timeline),
+            metadata=metadata,
+            generation=self._generation,
+        )
+        return self._summary
+
+
+class DashboardSummaryResync:
+    """Keeps a worker's summary state in step with the database on a background schedule.
+
+    The stream relay folds other workers' ingests in as they happen; this catches whatever
+    it misses (Redis unavailable, a consumer reconnecting, a failed publish). Every
+    ``interval_seconds`` a cheap version query decides whether the latest gates and
+    timeline are re-read and merged, so a worker's summary is never more than about one
+    interval behind the database. Changes are dispatched to the local subscribers only.
+    """
+
+    def __init__(
+        self,
+        state: DashboardSummaryState,
+        session_factory: async_sessionmaker[AsyncSession],
+        broker: TelemetryStreamBroker | None = None,
+        *,
+        interval_seconds: float = 1.0,
+    ) -> None:
+        self._state = state
+        self._session_factory = session_factory
+        self._broker = broker
+        self._interval = max(0.05, interval_seconds)
+        self._version: tuple[object, ...] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="dashboard-summary-resync")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> DashboardSummary | None:
+        """Merge the database into the state; returns the new summary if it changed."""
+        async with self._session_factory() as session:
+            repo = TelemetryRepository(session)
+            version = await repo.get_summary_version()
+            if version == self._version:
+                return None
+            gates = await repo.get_latest_gates()
+            timeline = await repo.get_timeline()
+        self._version = version
+
+        summary = self._state.merge(gates, timeline)
+        if summary is not None:
+            logger.debug(
+                "Dashboard summary state reconciled with the database",
+                extra={"generation": summary.generation},
+            )
+            if self._broker is not None:
+                await self._broker.refresh()
+        return summary
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.run_once()
+            except (SQLAlchemyError, OSError) as exc:
+                logger.warning("Dashboard summary resync failed", exc_info=exc)
+
+
+def dump_ingest(snapshots: Sequence[TelemetrySnapshotIn], recorded_at: Sequence[datetime]) -> str:
+    """Serialise persisted snapshots for other workers to fold into their state."""
+    return json.dumps(
+        [
+            {"recorded_at": moment.isoformat(), "snapshot": snapshot.model_dump(mode="json")}
+            for snapshot, moment in zip(snapshots, recorded_at, strict=True)
+        ],
+        separators=(",", ":"),
+    )
+
+
+def load_ingest(data: str) -> tuple[list[TelemetrySnapshotIn], list[datetime]]:
+    entries = json.loads(data)
+    return (
+        [TelemetrySnapshotIn.model_validate(entry["snapshot"]) for entry in entries],
+        [datetime.fromisoformat(entry["recorded_at"]) for entry in entries],
+    )
+
+
+def _with_baseline(gate: HeroGateSummary, baseline: int) -> HeroGateSummary:
+    return gate.model_copy(update={"baseline": baseline, "delta": float(gate.score - baseline)})
+
+
+def _timeline_summary(payload: TimelineEventPayload) -> TimelineEventSummary:
+    attributes = dict(payload.attributes)
+    if payload.overlay and "overlay" not in attributes:
+        attributes["overlay"] = payload.overlay
+    return _as_utc(
+        TimelineEventSummary(
+            label=payload.label,
+            impact=payload.impact,
+            tone=payload.tone,
+            occurred_at=payload.occurred_at,
+            overlay=attributes.get("overlay"),
+            attributes=attributes,
+        )
+    )
+
+
+def _as_utc(event: TimelineEventSummary) -> TimelineEventSummary:
+    # SQLite hands back naive datetimes; everything held in memory is UTC-aware.
+    if event.occurred_at.tzinfo is None:
+        event.occurred_at = event.occurred_at.replace(tzinfo=timezone.utc)
+    return event
+
+
+def _occurred_at(event: TimelineEventSummary) -> datetime:
+    return event.occurred_at
+
+
+__all__ = ["DashboardSummaryResync", "DashboardSummaryState", "dump_ingest", "load_ingest"]
@@ -1,27 +1,78 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 from logging import getLogger
 from statistics import mean
+from typing import TYPE_CHECKING
 
-from sqlalchemy import delete, func, select
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.models import HeroGate, TelemetrySample, TimelineEvent
+from ..db.dialects import dialect_insert
+from ..db.models import GateLatest, HeroGate, TelemetrySample, TimelineEvent, utcnow
+from ..db.packing import TrendFormatError, pack_trend, unpack_trend
+from ..db.postgres import PostgresSampleStore, get_sample_store
 from ..db.session import run_schema_migrations
 from ..schemas.dashboard import (
     DashboardSummary,
+    HeroGateMetrics,
     HeroGatePayload,
     HeroGateSummary,
     TelemetrySnapshotIn,
     TimelineEventPayload,
     TimelineEventSummary,
 )
+from .gate_registry import GateEntry, GateRegistry, get_gate_registry
+from .rollups import upsert_rollups
+
+if TYPE_CHECKING:
+    from .summary import DashboardSummaryState
 
 logger = getLogger(__name__)
 
+# Rows per multi-row INSERT; keeps bound parameters under SQLite's legacy 999 limit.
+_INSERT_BATCH_SIZE = 150
+
+# Hot statements are built once: their cache keys are memoised on the statement, so each
+# call goes straight to the engine's compiled cache (and asyncpg's prepared statements).
+_GATE_SUMMARY_QUERY = (
+    select(
+        HeroGate.name,
+        HeroGate.baseline_score,
+        GateLatest.score,
+        GateLatest.status,
+        GateLatest.metrics,
+        GateLatest.trend_packed,
+        GateLatest.recorded_at,
+    )
+    .join(GateLatest, GateLatest.gate_id == HeroGate.id)
+    .order_by(HeroGate.name.asc())
+)
+_TIMELINE_QUERY = (
+    select(
+        TimelineEvent.label,
+        TimelineEvent.impact,
+        TimelineEvent.tone,
+        TimelineEvent.occurred_at,
+        TimelineEvent.attributes,
+    )
+    .order_by(TimelineEvent.occurred_at.desc())
+    .limit(10)
+)
+# Changes whenever an ingest lands; cheap enough to poll (see ``DashboardSummaryResync``).
+_SUMMARY_VERSION_QUERY = select(
+    select(func.count()).select_from(GateLatest).scalar_subquery(),
+    select(func.max(GateLatest.recorded_at)).scalar_subquery(),
+    select(func.max(TimelineEvent.id)).scalar_subquery(),
+)
+_GATES_BY_NAME_QUERY = select(HeroGate.id, HeroGate.name).where(
+    func.lower(HeroGate.name).in_(bindparam("names", expanding=True))
+)
+
 
 @dataclass(slots=True)
 class TelemetrySummary:
@@ -32,8 +83,20 @@ class TelemetrySummary:
 
 
 class TelemetryRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        summary_state: DashboardSummaryState | None = None,
+        gate_registry: GateRegistry | None = None,
+        pack_trends: bool = False,
+        sample_store: PostgresSampleStore | None = None,
+    ):
         self._session = session
+        self._summary_state = summary_state
+        self._gate_registry = gate_registry if gate_registry is not None else get_gate_registry()
+        self._sample_store = sample_store or get_sample_store()
+        self._pack_trends = pack_trends
 
     async def ensure_schema(self) -> None:
         from ..db.models import Base
@@ -41,8 +104,8 @@ class TelemetryRepository:
         await run_schema_migrations(Base.metadata)
 
     async def get_dashboard_summary(self) -> DashboardSummary:
-        gate_summaries = await self._fetch_gate_summaries()
-        timeline = await self._fetch_timeline()
+        gate_summaries = [gate for gate, _ in await self.get_latest_gates()]
+        timeline = await self.get_timeline()
 
         metadata: dict[str, object] = {}
         if gate_summaries:
@@ -60,129 +123,283 @@ class TelemetryRepository:
             metadata=metadata,
         )
 
-    async def ingest_snapshot(self, snapshot: TelemetrySnapshotIn) -> DashboardSummary:
-        await self._upsert_gates(snapshot.hero_gates)
-        await self._insert_samples(snapshot.hero_gates)
-        await self._insert_timeline(snapshot.timeline)
-        await self._session.commit()
+    async def ingest_snapshot(
+        self, snapshot: TelemetrySnapshotIn, *, recorded_at: datetime | None = None
+    ) -> DashboardSummary:
+        return await self.ingest_batch(
+            [snapshot], recorded_at=None if recorded_at is None else [recorded_at]
+        )
+
+    async def ingest_batch(
+        self,
+        snapshots: Sequence[TelemetrySnapshotIn],
+        *,
+        recorded_at: Sequence[datetime] | None = None,
+    ) -> DashboardSummary:
+        """Persist several snapshots in a single transaction and return the merged summary.
+
+        ``recorded_at`` supplies one timestamp per snapshot; timestamps must be distinct so
+        that a gate reported by several snapshots keeps one sample per snapshot.
+        """
+        if recorded_at is None:
+            now = utcnow()
+            recorded_at = [now + timedelta(microseconds=offset) for offset in range(len(snapshots))]
+        await self.write_batch(snapshots, recorded_at)
+        return await self.batch_summary(snapshots, recorded_at)
+
+    async def write_batch(
+        self, snapshots: Sequence[TelemetrySnapshotIn], recorded_at: Sequence[datetime]
+    ) -> None:
+        """Persist ``snapshots`` and commit; the part of an ingest that is safe to retry."""
+        snapshot_gates = [dedupe_gates(snapshot.hero_gates) for snapshot in snapshots]
+        await self._prepare_partitions(recorded_at)
+        try:
+            gates = await self._upsert_gates(chain.from_iterable(snapshot_gates))
+            await self._insert_samples(zip(recorded_at, snapshot_gates, strict=True), gates)
+            await self._insert_timeline(
+                [event for snapshot in snapshots for event in snapshot.timeline]
+            )
+            await self._session.commit()
+        except IntegrityError:
+            # A cached gate id may no longer match the database; resolve afresh next time.
+            self._gate_registry.invalidate()
+            # Likewise a sample may have missed a partition another process dropped.
+            self._sample_store.invalidate()
+            raise
+        # Only cache ids once they are durable.
+        self._gate_registry.register(gates.values())
         logger.info(
             "Telemetry snapshot ingested",
             extra={
-                "hero_gate_count": len(snapshot.hero_gates),
-                "timeline_count": len(snapshot.timeline),
+                "snapshot_count": len(snapshots),
+                "hero_gate_count": sum(len(gates) for gates in snapshot_gates),
+                "timeline_count": sum(len(snapshot.timeline) for snapshot in snapshots),
             },
         )
-        summary = await self.get_dashboard_summary()
-        summary.metadata.update(snapshot.metadata)
-        return summary
 
-    async def _upsert_gates(self, gates: Iterable[HeroGatePayload]) -> None:
-        if not gates:
-            return
+    async def batch_summary(
+        self, snapshots: Sequence[TelemetrySnapshotIn], recorded_at: Sequence[datetime]
+    ) -> DashboardSummary:
+        """The dashboard summary after committing ``snapshots`` with :meth:`write_batch`."""
+        if self._summary_state is not None and self._summary_state.is_seeded:
+            summary = self._summary_state.apply(snapshots, recorded_at)
+        else:
+            summary = await self.get_dashboard_summary()
+        return with_snapshot_metadata(summary, snapshots)
+
+    async def _upsert_gates(self, gates: Iterable[HeroGatePayload]) -> dict[str, GateEntry]:
+        """Resolve gates through the registry, upserting new gates and explicit baselines.
+
+        Payloads are applied in order, so a gate first seen in this batch takes its baseline
+        from the first payload and later explicit baselines override it. An explicit
+        baseline is always written, since the stored value may have been changed by another
+        process since this one last saw it.
+        """
+        payloads = list(gates)
+        if not payloads:
+            return {}
+
+        registry = self._gate_registry
+        resolved: dict[str, GateEntry] = {}
+        unknown: set[str] = set()
+        for payload in payloads:
+            key = registry.normalize(payload.name)
+            entry = registry.get(payload.name)
+            if entry is not None:
+                resolved[key] = entry
+            else:
+                unknown.add(key)
 
-        existing_result = await self._session.scalars(select(HeroGate))
-        existing_map = {gate.name.lower(): gate for gate in existing_result.all()}
+        if unknown:
+            # Another process may have created these gates since the registry was warmed.
+            for entry in await self.get_gates_by_name(unknown):
+                resolved[registry.normalize(entry.name)] = entry
 
-        for payload in gates:
-            lower_name = payload.name.lower()
-            if lower_name in existing_map:
-                gate = existing_map[lower_name]
+        pending: dict[str, dict[str, object]] = {}
+        for payload in payloads:
+            key = registry.normalize(payload.name)
+            if key in pending:
                 if payload.baseline is not None:
-                    gate.baseline_score = payload.baseline
+                    pending[key]["baseline_score"] = payload.baseline
+            elif key in resolved:
+                if payload.baseline is not None:
+                    pending[key] = {"name": resolved[key].name, "baseline_score": payload.baseline}
             else:
-                gate = HeroGate(
-                    name=payload.name,
-                    baseline_score=payload.baseline or payload.score,
+                pending[key] = {
+                    "name": payload.name,
+                    "baseline_score": payload.baseline or payload.score,
+                }
+
+        rows = list(pending.values())
+        for chunk in _chunked(rows, _INSERT_BATCH_SIZE):
+            stmt = dialect_insert(self._session, HeroGate).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[HeroGate.name],
+                set_={"baseline_score": stmt.excluded.baseline_score},
+            ).returning(HeroGate.id, HeroGate.name)
+            upserted = await self._session.execute(stmt)
+            for gate_id, name in upserted:
+                resolved[registry.normalize(name)] = GateEntry(id=gate_id, name=name)
+
+        return resolved
+
+    async def _insert_samples(
+        self,
+        batches: Iterable[tuple[datetime, list[HeroGatePayload]]],
+        gate_entries: dict[str, GateEntry],
+    ) -> None:
+        rows: list[dict[str, object]] = []
+        for recorded_at, gates in batches:
+            for payload in gates:
+                entry = gate_entries.get(self._gate_registry.normalize(payload.name))
+                if entry is None:
+                    continue
+
+                metrics, trend_packed = self._encode_metrics(payload.metrics)
+                rows.append(
+                    {
+                        "gate_id": entry.id,
+                        "score": payload.score,
+                        "status": payload.status or status_from_score(payload.score),
+                        "metrics": metrics,
+                        "trend_packed": trend_packed,
+                        "recorded_at": recorded_at,
+                    }
                 )
-                self._session.add(gate)
-
-        await self._session.flush()
 
-    async def _insert_samples(self, gates: Iterable[HeroGatePayload]) -> None:
-        if not gates:
-            return
+        await self._write_samples(rows)
 
-        existing_gates_result = await self._session.scalars(select(HeroGate))
-        gate_lookup = {
-            gate.name.lower(): gate.id for gate in existing_gates_result.all()
-        }
+        # Rows are ordered by snapshot, so the last row per gate is its newest sample.
+        latest_rows = list({row["gate_id"]: row for row in rows}.values())
+        for chunk in _chunked(latest_rows, _INSERT_BATCH_SIZE):
+            stmt = dialect_insert(self._session, GateLatest).values(chunk)
+            await self._session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[GateLatest.gate_id],
+                    set_={
+                        "score": stmt.excluded.score,
+                        "status": stmt.excluded.status,
+                        "metrics": stmt.excluded.metrics,
+                        "trend_packed": stmt.excluded.trend_packed,
+                        "recorded_at": stmt.excluded.recorded_at,
+                    },
+                    where=GateLatest.recorded_at <= stmt.excluded.recorded_at,
+                )
+            )
 
-        for payload in gates:
-            gate_id = gate_lookup.get(payload.name.lower())
-            if gate_id is None:
-                continue
+        await upsert_rollups(self._session, rows)
 
-            status = payload.status or self._status_from_score(payload.score)
-            metrics = payload.metrics.dict() if payload.metrics else {}
+    async def _prepare_partitions(self, recorded_at: Sequence[datetime]) -> None:
+        # Partitions are created on a connection of their own, so before this session's
+        # transaction holds one (see PostgresSampleStore.ensure_partitions).
+        bind = self._session.bind
+        if not recorded_at or bind is None or bind.dialect.name != "postgresql":
+            return
+        since, until = min(recorded_at), max(recorded_at)
+        if self._sample_store.covers(since, until):
+            return
+        if self._session.in_transaction():
+            # E.g. the request's credential lookup. write_batch commits the session anyway.
+            await self._session.commit()
+        await self._sample_store.ensure_partitions(bind, since, until)
+
+    async def _write_samples(self, rows: list[dict[str, object]]) -> None:
+        if rows and self._session.get_bind().dialect.name == "postgresql":
+            store = self._sample_store
+            if store.copy_ingest:
+                await store.copy_samples(self._session, rows)
+                return
+
+        for chunk in _chunked(rows, _INSERT_BATCH_SIZE):
+            await self._session.execute(insert(TelemetrySample).values(chunk))
+
+    def _encode_metrics(
+        self, metrics: HeroGateMetrics | None
+    ) -> tuple[dict[str, object], bytes | None]:
+        if metrics is None:
+            return {}, None
+
+        data = metrics.model_dump()
+        if not self._pack_trends:
+            return data, None
+        trend_packed = pack_trend(metrics.trend)
+        if trend_packed is not None:
+            # Values outside int16 fall through and stay in the JSON payload.
+            del data["trend"]
+        return data, trend_packed
+
+    async def rebuild_gate_latest(self) -> int:
+        """Recompute ``gate_latest`` from ``telemetry_samples`` to backfill or repair it."""
+        newest = (
+            select(
+                TelemetrySample.gate_id,
+                func.max(TelemetrySample.recorded_at).label("latest_at"),
+            )
+            .group_by(TelemetrySample.gate_id)
+            .subquery()
+        )
+        source = select(
+            TelemetrySample.gate_id,
+            TelemetrySample.score,
+            TelemetrySample.status,
+            TelemetrySample.metrics,
+            TelemetrySample.trend_packed,
+            TelemetrySample.recorded_at,
+        ).join(
+            newest,
+            (TelemetrySample.gate_id == newest.c.gate_id)
+            & (TelemetrySample.recorded_at == newest.c.latest_at),
+        )
 
-            sample = TelemetrySample(
-                gate_id=gate_id,
-                score=payload.score,
-                status=status,
-                metrics=metrics,
+        await self._session.execute(delete(GateLatest))
+        result = await self._session.execute(
+            insert(GateLatest).from_select(
+                ["gate_id", "score", "status", "metrics", "trend_packed", "recorded_at"],
+                source,
             )
-            self._session.add(sample)
+        )
+        await self._session.commit()
+        logger.info("Rebuilt gate_latest", extra={"gate_count": result.rowcount})
+        return result.rowcount
 
     async def _insert_timeline(self, events: Iterable[TimelineEventPayload]) -> None:
         if not events:
             return
 
+        rows: list[dict[str, object]] = []
         for payload in events:
             attributes = dict(payload.attributes)
             if payload.overlay and "overlay" not in attributes:
                 attributes["overlay"] = payload.overlay
 
-            event = TimelineEvent(
-                label=payload.label,
-                impact=payload.impact,
-                tone=payload.tone,
-                occurred_at=payload.occurred_at,
-                attributes=attributes,
+            rows.append(
+                {
+                    "label": payload.label,
+                    "impact": payload.impact,
+                    "tone": payload.tone,
+                    "occurred_at": payload.occurred_at,
+                    "attributes": attributes,
+                }
             )
-            self._session.add(event)
 
-        # Keep the most recent 50 events
-        retained = await self._session.scalars(
-            select(TimelineEvent.id)
-            .order_by(TimelineEvent.occurred_at.desc())
-            .offset(50)
-        )
-        ids_to_delete = list(retained)
-        if ids_to_delete:
-            await self._session.execute(
-                delete(TimelineEvent).where(TimelineEvent.id.in_(ids_to_delete))
-            )
+        for chunk in _chunked(rows, _INSERT_BATCH_SIZE):
+            await self._session.execute(insert(TimelineEvent).values(chunk))
 
-    async def _fetch_gate_summaries(self) -> list[HeroGateSummary]:
-        latest_sample_subquery = (
-            select(
-                TelemetrySample.gate_id,
-                func.max(TelemetrySample.recorded_at).label("latest_at"),
-            )
-            .group_by(TelemetrySample.gate_id)
-            .subquery()
-        )
+    async def get_summary_version(self) -> tuple[object, ...]:
+        """Opaque marker of the dashboard data; a different value means something changed."""
+        result = await self._session.execute(_SUMMARY_VERSION_QUERY)
+        return tuple(result.one())
 
-        stmt = (
-            select(
-                HeroGate.name,
-                HeroGate.baseline_score,
-                TelemetrySample.score,
-                TelemetrySample.status,
-                TelemetrySample.metrics,
-            )
-            .join(latest_sample_subquery, latest_sample_subquery.c.gate_id == HeroGate.id)
-            .join(
-                TelemetrySample,
-                (TelemetrySample.gate_id == HeroGate.id)
-                & (TelemetrySample.recorded_at == latest_sample_subquery.c.latest_at),
-            )
-            .order_by(HeroGate.name.asc())
-        )
+    async def get_gates_by_name(self, names: Iterable[str]) -> list[GateEntry]:
+        """Stored gates matching ``names`` case-insensitively (normalised names)."""
+        result = await self._session.execute(_GATES_BY_NAME_QUERY, {"names": list(names)})
+        return [GateEntry(id=gate_id, name=name) for gate_id, name in result]
 
-        results = await self._session.execute(stmt)
-        hero_data: list[HeroGateSummary] = []
-        for name, baseline, score, status, metrics in results:
+    async def get_latest_gates(self) -> list[tuple[HeroGateSummary, datetime]]:
+        """Every gate's latest summary with the time its sample was recorded."""
+        results = await self._session.execute(_GATE_SUMMARY_QUERY)
+        hero_data: list[tuple[HeroGateSummary, datetime]] = []
+        for name, baseline, score, status, metrics, trend_packed, recorded_at in results:
             trend = []
             throughput = None
             load = None
@@ -191,38 +408,34 @@ class TelemetryRepository:
                 trend = [int(value) for value in metrics.get("trend", [])]
                 throughput = metrics.get("throughput")
                 load = metrics.get("load")
+            if trend_packed is not None:
+                trend = decode_trend(trend_packed, name)
 
             delta = float(score - baseline)
 
+            if recorded_at.tzinfo is None:
+                recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+
             hero_data.append(
-                HeroGateSummary(
-                    name=name,
-                    score=score,
-                    status=status,
-                    baseline=baseline,
-                    delta=delta,
-                    trend=trend,
-                    throughput=throughput,
-                    load=load,
+                (
+                    HeroGateSummary(
+                        name=name,
+                        score=score,
+                        status=status,
+                        baseline=baseline,
+                        delta=delta,
+                        trend=trend,
+                        throughput=throughput,
+                        load=load,
+                    ),
+                    recorded_at,
                 )
             )
 
         return hero_data
 
-    async def _fetch_timeline(self) -> list[TimelineEventSummary]:
-        stmt = (
-            select(
-                TimelineEvent.label,
-                TimelineEvent.impact,
-                TimelineEvent.tone,
-                TimelineEvent.occurred_at,
-                TimelineEvent.attributes,
-            )
-            .order_by(TimelineEvent.occurred_at.desc())
-            .limit(10)
-        )
-
-        results = await self._session.execute(stmt)
+    async def get_timeline(self) -> list[TimelineEventSummary]:
+        results = await self._session.execute(_TIMELINE_QUERY)
         timeline: list[TimelineEventSummary] = []
         for label, impact, tone, occurred_at, attributes in results:
             overlay = None
@@ -241,10 +454,41 @@ class TelemetryRepository:
             )
         return timeline
 
-    @staticmethod
-    def _status_from_score(score: int) -> str:
-        if score >= 80:
-            return "pass"
-        if score >= 60:
-            return "warn"
-        return "fail"
+
+def dedupe_gates(gates: Iterable[HeroGatePayload]) -> list[HeroGatePayload]:
+    # Gate names are case-insensitive; the last payload for a name wins.
+    unique: dict[str, HeroGatePayload] = {}
+    for payload in gates:
+        unique[payload.name.lower()] = payload
+    return list(unique.values())
+
+
+def with_snapshot_metadata(
+    summary: DashboardSummary, snapshots: Iterable[TelemetrySnapshotIn]
+) -> DashboardSummary:
+    # Ingest responses and the events published for them echo the snapshots' metadata.
+    metadata = dict(summary.metadata)
+    for snapshot in snapshots:
+        metadata.update(snapshot.metadata)
+    return summary.model_copy(update={"metadata": metadata})
+
+
+def decode_trend(trend_packed: bytes, gate_name: str) -> list[int]:
+    try:
+        return unpack_trend(trend_packed)
+    except TrendFormatError as exc:
+        logger.warning("Ignoring unreadable packed trend", exc_info=exc, extra={"gate": gate_name})
+        return []
+
+
+def status_from_score(score: int) -> str:
+    if score >= 80:
+        return "pass"
+    if score >= 60:
+        return "warn"
+    return "fail"
+
+
+def _chunked(rows: Sequence[dict[str, object]], size: int) -> Iterator[Sequence[dict[str, object]]]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
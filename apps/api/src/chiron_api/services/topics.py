@@ -0,0 +1,148 @@
+"""Topics and wire encodings for the dashboard WebSocket."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Sequence
+from typing import Any, Literal
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+Encoding = Literal["json", "msgpack"]
+
+TIMELINE_TOPIC = "timeline"
+ALL_GATES_TOPIC = "gate:*"
+ALL_JOBS_TOPIC = "job:*"
+_GATE_PREFIX = "gate:"
+_JOB_PREFIX = "job:"
+
+# Offered in ``Sec-WebSocket-Protocol``; the first one the server supports wins.
+SUBPROTOCOLS: dict[str, Encoding] = {
+    "chiron.dashboard.json": "json",
+    "chiron.dashboard.msgpack": "msgpack",
+}
+
+
+class InvalidTopic(ValueError):
+    """Raised when a client names a topic that does not exist."""
+
+
+class InvalidCommand(ValueError):
+    """Raised when a client message cannot be decoded."""
+
+
+class EncodingUnavailable(RuntimeError):
+    """Raised when MessagePack is requested but the optional dependency is not installed."""
+
+
+def gate_topic(name: str) -> str:
+    return f"{_GATE_PREFIX}{name.lower()}"
+
+
+def job_topic(job_id: str) -> str:
+    return f"{_JOB_PREFIX}{job_id.lower()}"
+
+
+def is_job_topic(topic: str) -> bool:
+    return topic.startswith(_JOB_PREFIX)
+
+
+def normalize_topics(topics: Iterable[str]) -> list[str]:
+    """Canonical, de-duplicated topic names.
+
+    ``timeline``, ``gate:*``, ``gate:<name>``, ``job:*`` or ``job:<job_id>``.
+    """
+    normalized: dict[str, None] = {}
+    for topic in topics:
+        value = topic.strip()
+        if value.lower() == TIMELINE_TOPIC:
+            normalized[TIMELINE_TOPIC] = None
+        elif value[: len(_GATE_PREFIX)].lower() == _GATE_PREFIX and value[len(_GATE_PREFIX) :]:
+            normalized[gate_topic(value[len(_GATE_PREFIX) :].strip())] = None
+        elif value[: len(_JOB_PREFIX)].lower() == _JOB_PREFIX and value[len(_JOB_PREFIX) :]:
+            normalized[job_topic(value[len(_JOB_PREFIX) :].strip())] = None
+        else:
+            raise InvalidTopic(
+                f"Unknown topic {topic!r}; expected 'timeline', 'gate:<name>' or 'job:<id>'"
+            )
+    return list(normalized)
+
+
+def available_encodings() -> tuple[Encoding, ...]:
+    return ("json", "msgpack") if msgpack is not None else ("json",)
+
+
+def negotiate_encoding(
+    subprotocols: Sequence[str], requested: Encoding | None = None
+) -> tuple[Encoding, str | None]:
+    """Pick the wire encoding and the subprotocol to echo back (if the client offered one)."""
+    available = available_encodings()
+    for subprotocol in subprotocols:
+        encoding = SUBPROTOCOLS.get(subprotocol)
+        if encoding in available and requested in (None, encoding):
+            return encoding, subprotocol
+    if requested is not None and requested not in available:
+        raise EncodingUnavailable("Install the 'msgpack' extra to enable binary frames")
+    return requested or "json", None
+
+
+def decode_command(data: str | bytes) -> Any:
+    """Decode a client message: JSON in text frames, MessagePack in binary frames."""
+    if isinstance(data, str):
+        try:
+            return json.loads(data)
+        except ValueError as exc:
+            raise InvalidCommand("Malformed JSON message") from exc
+    if msgpack is None:
+        raise InvalidCommand("Binary frames require the 'msgpack' extra")
+    try:
+        return msgpack.unpackb(data)
+    except (ValueError, msgpack.UnpackException) as exc:
+        raise InvalidCommand("Malformed MessagePack message") from exc
+
+
+class TopicMessage:
+    """One server message shared by every subscriber it is routed to.
+
+    The payload is serialised lazily and at most once per encoding, however many
+    subscribers receive it.
+    """
+
+    __slots__ = ("_json", "_msgpack", "payload")
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self._json: str | None = None
+        self._msgpack: bytes | None = None
+
+    def encode(self, encoding: Encoding) -> str | bytes:
+        if encoding == "msgpack":
+            if self._msgpack is None:
+                self._msgpack = msgpack.packb(self.payload, use_bin_type=True)
+            return self._msgpack
+        if self._json is None:
+            self._json = json.dumps(self.payload, separators=(",", ":"))
+        return self._json
+
+
+__all__ = [
+    "ALL_GATES_TOPIC",
+    "ALL_JOBS_TOPIC",
+    "SUBPROTOCOLS",
+    "TIMELINE_TOPIC",
+    "Encoding",
+    "EncodingUnavailable",
+    "InvalidCommand",
+    "InvalidTopic",
+    "TopicMessage",
+    "available_encodings",
+    "decode_command",
+    "gate_topic",
+    "is_job_topic",
+    "job_topic",
+    "negotiate_encoding",
+    "normalize_topics",
+]
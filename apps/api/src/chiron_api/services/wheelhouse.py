@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import sysconfig
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Literal
+
+from opentelemetry import metrics
+
+from ..config import AppConfig
+from ..db.models import utcnow
+
+logger = getLogger(__name__)
+
+BuildOutcome = Literal["queued", "coalesced", "cached"]
+BuildStatus = Literal["building", "built", "verified", "failed"]
+
+# Bump when the build recipe changes, so earlier artifacts are no longer reused.
+_KEY_VERSION = 1
+_NAME = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?$")
+_CLAUSE = re.compile(r"^(?:===|~=|==|!=|<=|>=|<|>)[A-Za-z0-9.*+!_-]+$")
+_TARGET = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(.*?)\s*$")
+_PIN = re.compile(r"^(?:===?)[A-Za-z0-9.+!_-]+$")
+_HASH_CHUNK = 1024 * 1024
+_ERROR_TAIL = 2000
+_STATEMENT_TYPE = "https://in-toto.io/Statement/v1"
+_PREDICATE_TYPE = "https://chiron.io/wheelhouse/build/v1"
+
+_meter = metrics.get_meter(__name__)
+_requests = _meter.create_counter(
+    "chiron.wheelhouse.requests",
+    description="Wheelhouse build requests, by whether they started, joined or skipped a build",
+)
+_builds = _meter.create_counter(
+    "chiron.wheelhouse.builds",
+    description="Wheelhouse builds finished, by outcome",
+)
+_build_duration = _meter.create_histogram(
+    "chiron.wheelhouse.build_duration",
+    unit="ms",
+    description="Wall time of one wheelhouse build, including the wait for a pool worker",
+)
+
+
+class InvalidBuildRequest(ValueError):
+    """Raised when a build target or extra is not a plain requirement."""
+
+
+class WheelhouseBusy(RuntimeError):
+    """Raised when too many distinct builds are already in flight."""
+
+
+class WheelhouseBuildFailed(RuntimeError):
+    """Raised (in a pool worker) when ``pip wheel`` or signing fails."""
+
+
+@dataclass(frozen=True, slots=True)
+class BuildSpec:
+    name: str
+    specifier: str
+    extras: tuple[str, ...]
+    signed: bool
+
+    @property
+    def requirement(self) -> str:
+        extras = f"[{','.join(self.extras)}]" if self.extras else ""
+        return f"{self.name}{extras}{self.specifier}"
+
+    @property
+    def pinned(self) -> bool:
+        """Whether the specifier names exactly one version, so its build never goes stale."""
+        return _PIN.match(self.specifier) is not None
+
+
+def parse_build_spec(target: str, extras: list[str], signed: bool) -> BuildSpec:
+    """Canonical form of a build request, so equivalent requests share a cache key.
+
+    Only ``name`` plus optional version clauses are accepted; anything ``pip`` would read
+    as a URL, path or option is rejected.
+    """
+    match = _TARGET.match(target)
+    if match is None or not _NAME.match(match.group(1)):
+        raise InvalidBuildRequest(f"Invalid build target {target!r}; expected e.g. 'name>=1.0'")
+    name, specifier = match.groups()
+    clauses = [clause.replace(" ", "") for clause in specifier.split(",")] if specifier else []
+    if any(not _CLAUSE.match(clause) for clause in clauses):
+        raise InvalidBuildRequest(f"Invalid version specifier in {target!r}")
+    for extra in extras:
+        if not _NAME.match(extra):
+            raise InvalidBuildRequest(f"Invalid extra {extra!r}")
+    return BuildSpec(
+        name=_normalize(name),
+        specifier=",".join(sorted(clauses)),
+        extras=tuple(sorted({_normalize(extra) for extra in extras})),
+        signed=signed,
+    )
+
+
+@dataclass(slots=True)
+class WheelhouseBuild:
+    id: str
+    cache_key: str
+    requirement: str
+    signed: bool
+    status: BuildStatus
+    created_at: datetime
+    # ``{"name", "sha256", "size"}`` per file, in the order pip produced them.
+    artifacts: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    duration_ms: float | None = None
+
+    def to_manifest(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "cache_key": self.cache_key,
+            "requirement": self.requirement,
+            "signed": self.signed,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "artifacts": self.artifacts,
+            "duration_ms": self.duration_ms,
+        }
+
+    @classmethod
+    def from_manifest(cls, data: dict[str, Any]) -> WheelhouseBuild:
+        return cls(
+            id=data["id"],
+            cache_key=data["cache_key"],
+            requirement=data["requirement"],
+            signed=data["signed"],
+            status=data["status"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            artifacts=list(data["artifacts"]),
+            duration_ms=data.get("duration_ms"),
+        )
+
+
+class ArtifactStore:
+    """Content-addressed files under ``root``.
+
+    Files live at ``objects/sha256/<2 hex>/<digest>``, so identical wheels produced by
+    different builds are stored once, and each completed build has a JSON manifest under
+    ``builds/`` naming its files. Every write lands in a temporary file first and is then
+    renamed into place, so readers never see partial files.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / "sha256" / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        return self.object_path(digest).is_file()
+
+    def scratch_dir(self) -> Path:
+        # Under the root, so finished files are renamed rather than copied into place.
+        path = self.root / "tmp"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def put_file(self, path: Path) -> tuple[str, int]:
+        """Move ``path`` (on the store's filesystem) into the store; returns digest and size."""
+        digest = hashlib.sha256()
+        size = 0
+        with path.open("rb") as source:
+            while chunk := source.read(_HASH_CHUNK):
+                digest.update(chunk)
+                size += len(chunk)
+        target = self.object_path(digest.hexdigest())
+        if target.exists():
+            path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+        return digest.hexdigest(), size
+
+    def write_manifest(self, build: WheelhouseBuild) -> None:
+        builds = self.root / "builds"
+        builds.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.scratch_dir(), suffix=".json", delete=False
+        ) as handle:
+            json.dump(build.to_manifest(), handle, separators=(",", ":"))
+        os.replace(handle.name, builds / f"{build.cache_key}.json")
+
+    def load_manifests(self) -> list[WheelhouseBuild]:
+        builds = []
+        for path in (self.root / "builds").glob("*.json"):
+            try:
+                builds.append(WheelhouseBuild.from_manifest(json.loads(path.read_text())))
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning(
+                    "Skipping unreadable wheelhouse manifest",
+                    exc_info=exc,
+                    extra={"path": str(path)},
+                )
+        return builds
+
+
+class WheelhouseBuilder:
+    """Builds wheelhouses with ``pip wheel`` in a bounded process pool, memoised by request.
+
+    A request's canonical requirement, ``signed`` flag, interpreter, platform and pip
+    arguments hash into its cache key. A request whose key has a complete build in the
+    :class:`ArtifactStore` is answered from it without building; one whose key is already
+    being built joins that build; anything else starts a build, at most
+    ``wheelhouse_build_workers`` at a time. Signed builds add an in-toto statement listing
+    the wheel digests, signed with ``cosign`` when ``wheelhouse_cosign_key`` is set.
+
+    A requirement pinned to one version (``==1.2.3``) is reused for as long as its artifacts
+    are stored. Any other specifier may resolve to a newer release later, so its build is
+    only reused for ``wheelhouse_unpinned_ttl_seconds`` and then built again.
+
+    Builds are coalesced within a process; processes sharing a store may build the same key
+    concurrently, and the content-addressed store keeps one copy of the result.
+    """
+
+    def __init__(self, config: AppConfig) -> None:
+        self._store = ArtifactStore(config.wheelhouse_store_path)
+        self._workers = max(1, config.wheelhouse_build_workers)
+        self._max_pending = max(1, config.wheelhouse_max_pending_builds)
+        self._timeout = config.wheelhouse_build_timeout_seconds
+        self._pip_args = list(config.wheelhouse_pip_args)
+        self._cosign_key = config.wheelhouse_cosign_key
+        self._unpinned_ttl = timedelta(seconds=max(0.0, config.wheelhouse_unpinned_ttl_seconds))
+        self._builds: dict[str, WheelhouseBuild] = {}
+        self._ids: dict[str, str] = {}
+        self._inflight: dict[str, asyncio.Task[None]] = {}
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def start(self) -> None:
+        for build in await asyncio.to_thread(self._store.load_manifests):
+            self._remember(build)
+
+    async def stop(self) -> None:
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def cache_key(self, spec: BuildSpec) -> str:
+        material = {
+            "version": _KEY_VERSION,
+            "requirement": spec.requirement,
+            "signed": spec.signed,
+            "cosign": self._cosign_key is not None,
+            "python": sys.implementation.cache_tag,
+            "platform": sysconfig.get_platform(),
+            "pip_args": self._pip_args,
+        }
+        return hashlib.sha256(
+            json.dumps(material, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+
+    def submit(self, spec: BuildSpec) -> tuple[BuildOutcome, WheelhouseBuild]:
+        key = self.cache_key(spec)
+        build = self._builds.get(key)
+        if key in self._inflight and build is not None:
+            _requests.add(1, {"result": "coalesced"})
+            return "coalesced", build
+        if (
+            build is not None
+            and build.status in ("built", "verified")
+            and (spec.pinned or utcnow() - build.created_at < self._unpinned_ttl)
+            and self._intact(build)
+        ):
+            _requests.add(1, {"result": "cached"})
+            return "cached", build
+        if len(self._inflight) >= self._max_pending:
+            raise WheelhouseBusy("Too many wheelhouse builds in progress")
+
+        build = WheelhouseBuild(
+            id=f"wheelhouse-{key[:20]}",
+            cache_key=key,
+            requirement=spec.requirement,
+            signed=spec.signed,
+            status="building",
+            created_at=utcnow(),
+        )
+        self._remember(build)
+        task = asyncio.create_task(self._build(spec, build), name=f"{build.id}-build")
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        _requests.add(1, {"result": "queued"})
+        return "queued", build
+
+    def get(self, run_id: str) -> WheelhouseBuild | None:
+        key = self._ids.get(run_id)
+        return self._builds.get(key) if key is not None else None
+
+    def list_builds(self) -> list[WheelhouseBuild]:
+        return sorted(self._builds.values(), key=lambda build: build.created_at, reverse=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "store": str(self._store.root),
+            "workers": self._workers,
+            "in_flight": len(self._inflight),
+            "max_pending": self._max_pending,
+            "builds": len(self._builds),
+        }
+
+    def _remember(self, build: WheelhouseBuild) -> None:
+        self._builds[build.cache_key] = build
+        self._ids[build.id] = build.cache_key
+
+    def _intact(self, build: WheelhouseBuild) -> bool:
+        return all(self._store.has(artifact["sha256"]) for artifact in build.artifacts)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        return self._pool
+
+    async def _build(self, spec: BuildSpec, build: WheelhouseBuild) -> None:
+        started = perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            artifacts, verified = await loop.run_in_executor(
+                self._executor(),
+                build_artifacts,
+                str(self._store.root),
+                spec.name,
+                spec.requirement,
+                spec.signed,
+                self._pip_args,
+                self._timeout,
+                self._cosign_key,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                self._pool = None
+            build.status = "failed"
+            build.error = str(exc) or type(exc).__name__
+            _builds.add(1, {"outcome": "failed"})
+            logger.warning(
+                "Wheelhouse build failed",
+                # A failing ``pip wheel`` is reported by its output, not a worker traceback.
+                exc_info=None if isinstance(exc, WheelhouseBuildFailed) else exc,
+                extra={"run_id": build.id, "requirement": build.requirement},
+            )
+            return
+
+        build.artifacts = artifacts
+        build.status = "verified" if verified else "built"
+        build.duration_ms = round((perf_counter() - started) * 1000, 3)
+        await asyncio.to_thread(self._store.write_manifest, build)
+        _builds.add(1, {"outcome": build.status})
+        _build_duration.record(build.duration_ms)
+        logger.info(
+            "Wheelhouse build stored",
+            extra={"run_id": build.id, "artifacts": len(artifacts), "ms": build.duration_ms},
+        )
+
+
+def build_artifacts(
+    root: str,
+    name: str,
+    requirement: str,
+    signed: bool,
+    pip_args: list[str],
+    timeout: float,
+    cosign_key: str | None,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Run ``pip wheel`` for ``requirement`` and move the results into the store at ``root``.
+
+    Runs in a pool worker. Returns the stored artifacts and whether they were signed.
+    """
+    store = ArtifactStore(root)
+    with tempfile.TemporaryDirectory(dir=store.scratch_dir()) as work:
+        wheel_dir = Path(work, "wheels")
+        _run(
+            [
+                sys.executable,
+                "-m",
+                "pip",
+                "wheel",
+                "--disable-pip-version-check",
+                "--no-input",
+                "--wheel-dir",
+                str(wheel_dir),
+                *pip_args,
+                "--",
+                requirement,
+            ],
+            timeout,
+            "pip wheel",
+        )
+        wheels = sorted(wheel_dir.glob("*.whl"))
+        if not wheels:
+            raise WheelhouseBuildFailed("pip wheel produced no wheels")
+
+        artifacts = []
+        for path in wheels:
+            digest, size = store.put_file(path)
+            artifacts.append({"name": path.name, "sha256": digest, "size": size})
+        if not signed:
+            return artifacts, False
+
+        statement = Path(work, f"{name}-attestation.json")
+        statement.write_text(
+            json.dumps(
+                {
+                    "_type": _STATEMENT_TYPE,
+                    "subject": [
+                        {"name": artifact["name"], "digest": {"sha256": artifact["sha256"]}}
+                        for artifact in artifacts
+                    ],
+                    "predicateType": _PREDICATE_TYPE,
+                    "predicate": {
+                        "requirement": requirement,
+                        "python": sys.implementation.cache_tag,
+                        "platform": sysconfig.get_platform(),
+                    },
+                },
+                indent=2,
+            )
+        )
+        signature = statement.with_name(f"{statement.name}.sig")
+        if cosign_key is not None:
+            _run(
+                [
+                    "cosign",
+                    "sign-blob",
+                    "--yes",
+                    "--key",
+                    cosign_key,
+                    "--output-signature",
+                    str(signature),
+                    str(statement),
+                ],
+                timeout,
+                "cosign sign-blob",
+            )
+        for path in (statement, signature):
+            if path.exists():
+                digest, size = store.put_file(path)
+                artifacts.append({"name": path.name, "sha256": digest, "size": size})
+        return artifacts, cosign_key is not None
+
+
+def _run(command: list[str], timeout: float, label: str) -> None:
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, text=True, timeout=timeout, check=False
+        )
+    except subprocess.TimeoutExpired:
+        raise WheelhouseBuildFailed(f"{label} timed out after {timeout:g}s") from None
+    except OSError as exc:
+        raise WheelhouseBuildFailed(f"{label} could not start: {exc}") from None
+    if completed.returncode != 0:
+        output = (completed.stderr or completed.stdout).strip()
+        raise WheelhouseBuildFailed(f"{label} failed: {output[-_ERROR_TAIL:]}")
+
+
+def _normalize(name: str) -> str:
+    # PEP 503 name normalisation.
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+__all__ = [
+    "ArtifactStore",
+    "BuildOutcome",
+    "BuildSpec",
+    "BuildStatus",
+    "InvalidBuildRequest",
+    "WheelhouseBuild",
+    "WheelhouseBuildFailed",
+    "WheelhouseBuilder",
+    "WheelhouseBusy",
+    "build_artifacts",
+    "parse_build_spec",
+]
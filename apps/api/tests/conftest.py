@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from chiron_api.db.models import Base
+from chiron_api.services.gate_registry import get_gate_registry
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path: Path) -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """A fresh SQLite database with the application schema."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/chiron.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    # Gate ids cached by an earlier test's database mean nothing in this one.
+    get_gate_registry().invalidate()
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+        get_gate_registry().invalidate()
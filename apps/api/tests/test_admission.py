@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from chiron_api.config import AdmissionGroup, AppConfig
+from chiron_api.services.admission import AdmissionController, AdmissionMiddleware
+
+SAMPLES = "/api/v1/dashboard/samples"
+
+
+def _groups(**overrides: AdmissionGroup) -> dict[str, AdmissionGroup]:
+    groups = AppConfig().admission_groups
+    groups.update(overrides)
+    return groups
+
+
+def test_sample_reads_and_ingest_match_different_groups() -> None:
+    controller = AdmissionController(AppConfig())
+
+    assert controller.match(SAMPLES, "POST").name == "ingest"
+    assert controller.match(SAMPLES, "GET").name == "sample-reads"
+    assert controller.match(f"{SAMPLES}?format=ndjson", "GET").name == "sample-reads"
+    assert controller.match("/api/v1/dashboard/summary", "GET").name == "default"
+
+
+@pytest.mark.asyncio
+async def test_streaming_read_does_not_take_an_ingest_slot() -> None:
+    release = asyncio.Event()
+    reading = asyncio.Event()
+
+    async def samples(request: Request) -> PlainTextResponse:
+        if request.method == "GET":
+            # Stands in for a long NDJSON export.
+            reading.set()
+            await release.wait()
+        return PlainTextResponse("ok")
+
+    config = AppConfig(
+        admission_groups=_groups(
+            ingest=AdmissionGroup(prefixes=[SAMPLES], methods=["POST"], max_in_flight=1),
+            **{
+                "sample-reads": AdmissionGroup(prefixes=[SAMPLES], methods=["GET"], max_in_flight=1)
+            },
+        )
+    )
+    controller = AdmissionController(config)
+    app = Starlette(routes=[Route(SAMPLES, samples, methods=["GET", "POST"])])
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        read = asyncio.create_task(client.get(SAMPLES))
+        await asyncio.wait_for(reading.wait(), 5)
+
+        ingest = await client.post(SAMPLES)
+        second_read = await client.get(SAMPLES)
+
+        release.set()
+        assert (await read).status_code == 200
+
+    assert ingest.status_code == 200
+    # The read group is full, so another read is shed instead of borrowing ingest capacity.
+    assert second_read.status_code == 503
+    snapshot = controller.snapshot()["groups"]
+    assert snapshot["ingest"]["admitted"] == 1
+    assert snapshot["ingest"]["rejected"] == 0
+    assert snapshot["sample-reads"]["rejected"] == 1
+
+
+def _client(controller: AdmissionController) -> httpx.AsyncClient:
+    async def ok(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/{path:path}", ok, methods=["GET", "POST"])])
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _statuses(controller: AdmissionController) -> dict[str, int]:
+    # One path per priority: critical, normal and low.
+    paths = {"critical": "/health", "normal": "/api/v1/dashboard/summary", "low": SAMPLES}
+    async with _client(controller) as client:
+        return {priority: (await client.get(path)).status_code for priority, path in paths.items()}
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_sheds_low_then_normal_priority() -> None:
+    controller = AdmissionController(AppConfig(admission_max_loop_lag_ms=100))
+
+    assert await _statuses(controller) == {"critical": 200, "normal": 200, "low": 200}
+    controller.loop_lag = 0.15
+    assert await _statuses(controller) == {"critical": 200, "normal": 200, "low": 503}
+    controller.loop_lag = 0.25
+    assert await _statuses(controller) == {"critical": 200, "normal": 503, "low": 503}
+
+    async with _client(controller) as client:
+        response = await client.get(SAMPLES)
+    assert response.headers["Retry-After"] == "1"
+    assert "overloaded" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_is_judged_against_each_pools_limit() -> None:
+    controller = AdmissionController(
+        AppConfig(admission_max_pool_wait_ms=100, admission_sample_interval_seconds=0.01)
+    )
+    primary = create_async_engine("sqlite+aiosqlite://")
+    writer = create_async_engine("sqlite+aiosqlite://")
+    controller.instrument(primary)
+    controller.instrument(writer, "writer", max_pool_wait_ms=2000)
+    try:
+        # A long wait for SQLite's single writer is expected, not pressure.
+        controller.observe_pool_wait(1.5, "writer")
+        assert controller.pressure() == 0
+
+        controller.observe_pool_wait(0.15)
+        assert await _statuses(controller) == {"critical": 200, "normal": 200, "low": 503}
+
+        # Once a sample interval passes without waits, the pressure clears.
+        await controller.start()
+        await asyncio.sleep(0.1)
+        assert controller.pressure() == 0
+        assert await _statuses(controller) == {"critical": 200, "normal": 200, "low": 200}
+    finally:
+        await controller.stop()
+        await primary.dispose()
+        await writer.dispose()
+
+
+@pytest.mark.asyncio
+async def test_full_groups_queue_then_reject_with_retry_after() -> None:
+    controller = AdmissionController(
+        AppConfig(
+            admission_groups=_groups(
+                default=AdmissionGroup(
+                    prefixes=["/"],
+                    max_in_flight=1,
+                    max_queue=1,
+                    queue_timeout_seconds=1.0,
+                    retry_after_seconds=7,
+                )
+            )
+        )
+    )
+    group = controller.match("/work")
+    await controller.acquire(group)
+
+    queued = asyncio.create_task(controller.acquire(group))
+    await asyncio.sleep(0.01)
+    async with _client(controller) as client:
+        response = await client.get("/work")
+    assert (response.status_code, response.headers["Retry-After"]) == (503, "7")
+
+    # The queued request takes the slot as soon as it is released.
+    controller.release(group)
+    await asyncio.wait_for(queued, 1)
+    controller.release(group)
+    snapshot = controller.snapshot()["groups"]["default"]
+    assert (snapshot["admitted"], snapshot["rejected"], snapshot["in_flight"]) == (2, 1, 0)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api import create_app
+from chiron_api.config import AppConfig, get_config
+from chiron_api.db.models import ApiClient
+from chiron_api.services import auth
+from chiron_api.services.auth import AuthService
+
+API_KEY = "local-dev-token"
+CONFIG = AppConfig(auth_cache_ttl_seconds=60, auth_touch_interval_seconds=3600)
+
+
+@pytest.fixture
+def database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    path = tmp_path / "chiron.db"
+    for name, value in {
+        "CHIRON_DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+        "CHIRON_SQLITE_BUSY_TIMEOUT_MS": "200",
+        "CHIRON_REDIS_URL": "",
+        "CHIRON_TELEMETRY_ENABLED": "false",
+        "CHIRON_RETENTION_ENABLED": "false",
+        "CHIRON_DEFAULT_API_TOKEN": API_KEY,
+        "CHIRON_WHEELHOUSE_STORE_PATH": str(tmp_path / "wheelhouse"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_config.cache_clear()
+    yield path
+    get_config.cache_clear()
+
+
+def test_authenticated_reads_do_not_wait_for_the_write_lock(database: Path) -> None:
+    with TestClient(create_app()) as client:
+        # Another writer (say, a long ingest) holds SQLite's write lock throughout.
+        writer = sqlite3.connect(database, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            response = client.get("/api/v1/process/unknown", headers={"X-API-Key": API_KEY})
+        finally:
+            writer.rollback()
+            writer.close()
+
+    assert response.status_code == 404
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(auth, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest_asyncio.fixture
+async def issued(session_factory: async_sessionmaker[AsyncSession]) -> tuple[str, str]:
+    async with session_factory() as session:
+        token, client = await AuthService(CONFIG).issue_client_token(session, name="CI")
+    return token, client.id
+
+
+@pytest_asyncio.fixture
+async def service(session_factory) -> AsyncIterator[AuthService]:
+    auth_service = AuthService(CONFIG, session_factory)
+    await auth_service.start()
+    yield auth_service
+    await auth_service.stop()
+
+
+async def _deactivate_elsewhere(session_factory, client_id: str) -> None:
+    async with session_factory() as session:
+        await session.execute(
+            update(ApiClient).where(ApiClient.id == client_id).values(is_active=False)
+        )
+        await session.commit()
+
+
+async def _last_used_at(session_factory, client_id: str):
+    async with session_factory() as session:
+        return await session.scalar(select(ApiClient.last_used_at).where(ApiClient.id == client_id))
+
+
+@pytest.mark.asyncio
+async def test_cached_clients_expire_after_the_ttl(session_factory, issued, service, clock) -> None:
+    token, client_id = issued
+    assert (await service.authenticate_token(token)).id == client_id
+
+    await _deactivate_elsewhere(session_factory, client_id)
+    clock[0] += 59
+    assert (await service.authenticate_token(token)).id == client_id
+    clock[0] += 2
+    assert await service.authenticate_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_deactivation_evicts_at_once(session_factory, issued, service) -> None:
+    token, client_id = issued
+    await service.authenticate_token(token)
+
+    async with session_factory() as session:
+        assert await service.deactivate_client(session, client_id)
+
+    assert await service.authenticate_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_deactivation_reaches_other_processes_through_redis(session_factory, issued) -> None:
+    token, client_id = issued
+    server = FakeServer()
+    services = [
+        AuthService(
+            CONFIG,
+            session_factory,
+            redis_client=FakeAsyncRedis(server=server, decode_responses=True),
+        )
+        for _ in range(2)
+    ]
+    for auth_service in services:
+        await auth_service.start()
+    try:
+        await asyncio.sleep(0.05)
+        local, remote = services
+        assert (await remote.authenticate_token(token)).id == client_id
+
+        async with session_factory() as session:
+            await local.deactivate_client(session, client_id)
+        for _ in range(50):
+            if await remote.authenticate_token(token) is None:
+                break
+            await asyncio.sleep(0.01)
+        else:
+            raise AssertionError("the remote cache kept the deactivated client")
+    finally:
+        for auth_service in services:
+            await auth_service.stop()
+
+
+@pytest.mark.asyncio
+async def test_uses_are_written_behind_in_one_flush(session_factory, issued, service) -> None:
+    token, client_id = issued
+    for _ in range(3):
+        await service.authenticate_token(token)
+    assert await _last_used_at(session_factory, client_id) is None
+
+    await service.flush_touches()
+
+    assert await _last_used_at(session_factory, client_id) is not None
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+import uvicorn
+
+from chiron_api import create_app
+from chiron_api.config import get_config
+from chiron_api.routers.dashboard import get_summary_state
+
+POOL_SIZE = 1
+STREAMS = 4
+API_KEY = "local-dev-token"
+
+
+@pytest.fixture
+def pool_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    for name, value in {
+        "CHIRON_DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path}/chiron.db",
+        "CHIRON_DATABASE_POOL_SIZE": str(POOL_SIZE),
+        "CHIRON_DATABASE_MAX_OVERFLOW": "0",
+        "CHIRON_DATABASE_POOL_TIMEOUT_SECONDS": "2",
+        "CHIRON_REDIS_URL": "",
+        "CHIRON_TELEMETRY_ENABLED": "false",
+        "CHIRON_RETENTION_ENABLED": "false",
+        "CHIRON_DEFAULT_API_TOKEN": API_KEY,
+        "CHIRON_WHEELHOUSE_STORE_PATH": str(tmp_path / "wheelhouse"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+@pytest_asyncio.fixture
+async def base_url(pool_env: None) -> AsyncIterator[str]:
+    app = create_app()
+    # Without the in-memory summary, every stream reads its first frame from the database.
+    app.dependency_overrides[get_summary_state] = lambda: None
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        assert not serving.done(), "server failed to start"
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def _frames(response: httpx.Response) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        while b"\n\n" in buffer:
+            frame, buffer = buffer.split(b"\n\n", 1)
+            yield frame
+
+
+@pytest.mark.asyncio
+async def test_open_streams_do_not_starve_ingest(base_url: str) -> None:
+    async with AsyncExitStack() as stack:
+        client = await stack.enter_async_context(httpx.AsyncClient(base_url=base_url, timeout=10))
+        streams = []
+        for _ in range(STREAMS):
+            response = await stack.enter_async_context(
+                client.stream("GET", "/api/v1/dashboard/stream")
+            )
+            assert response.status_code == 200
+            frames = _frames(response)
+            assert (await asyncio.wait_for(frames.__anext__(), 5)).startswith(b"id:")
+            streams.append(frames)
+        assert STREAMS > POOL_SIZE
+
+        snapshot = {"hero_gates": [{"name": "Pool Probe", "score": 91}], "timeline": []}
+        ingested = await asyncio.wait_for(
+            client.post("/api/v1/dashboard/samples", json=snapshot, headers={"X-API-Key": API_KEY}),
+            5,
+        )
+
+        assert ingested.status_code < 300, ingested.text
+        assert "Pool Probe" in {gate["name"] for gate in ingested.json()["hero_gates"]}
+        assert b"Pool Probe" in await asyncio.wait_for(streams[0].__anext__(), 5)
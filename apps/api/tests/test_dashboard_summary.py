@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chiron_api import create_app
+from chiron_api.config import get_config
+from chiron_api.db import session as db_session
+from chiron_api.routers import dashboard
+from chiron_api.routers.dashboard import get_summary_state
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    for name, value in {
+        "CHIRON_DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path}/chiron.db",
+        "CHIRON_REDIS_URL": "",
+        "CHIRON_TELEMETRY_ENABLED": "false",
+        "CHIRON_RETENTION_ENABLED": "false",
+        "CHIRON_JOBS_ENABLED": "false",
+        "CHIRON_WHEELHOUSE_STORE_PATH": str(tmp_path / "wheelhouse"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_config.cache_clear()
+    with TestClient(create_app()) as test_client:
+        yield test_client
+    get_config.cache_clear()
+
+
+@pytest.fixture
+def read_sessions(monkeypatch: pytest.MonkeyPatch) -> list[AsyncSession]:
+    opened: list[AsyncSession] = []
+    read_session = db_session.read_session
+
+    @asynccontextmanager
+    async def counting_read_session() -> AsyncIterator[AsyncSession]:
+        async with read_session() as session:
+            opened.append(session)
+            yield session
+
+    # Both the route itself and the get_read_session dependency open sessions this way.
+    monkeypatch.setattr(dashboard, "read_session", counting_read_session)
+    monkeypatch.setattr(db_session, "read_session", counting_read_session)
+    return opened
+
+
+def test_summary_from_state_opens_no_read_session(
+    client: TestClient, read_sessions: list[AsyncSession]
+) -> None:
+    response = client.get("/api/v1/dashboard/summary")
+
+    assert response.status_code == 200
+    assert response.json()["generation"] is not None
+    assert read_sessions == []
+
+
+def test_summary_without_state_reads_the_database(
+    client: TestClient, read_sessions: list[AsyncSession]
+) -> None:
+    client.app.dependency_overrides[get_summary_state] = lambda: None
+
+    response = client.get("/api/v1/dashboard/summary")
+
+    assert response.status_code == 200
+    assert response.json()["hero_gates"]
+    assert response.json()["generation"] is None
+    assert len(read_sessions) == 1
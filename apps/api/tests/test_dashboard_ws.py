@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from chiron_api import create_app
+from chiron_api.config import get_config
+
+API_KEY = "local-dev-token"
+WS_PATH = "/api/v1/dashboard/ws"
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    for name, value in {
+        "CHIRON_DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path}/chiron.db",
+        "CHIRON_REDIS_URL": "",
+        "CHIRON_TELEMETRY_ENABLED": "false",
+        "CHIRON_RETENTION_ENABLED": "false",
+        "CHIRON_JOBS_ENABLED": "false",
+        "CHIRON_DEFAULT_API_TOKEN": API_KEY,
+        "CHIRON_WHEELHOUSE_STORE_PATH": str(tmp_path / "wheelhouse"),
+    }.items():
+        monkeypatch.setenv(name, value)
+    get_config.cache_clear()
+    with TestClient(create_app()) as test_client:
+        yield test_client
+    get_config.cache_clear()
+
+
+def _ingest(client: TestClient, gates: dict[str, int], events: tuple[str, ...] = ()) -> None:
+    snapshot = {
+        "hero_gates": [{"name": name, "score": score} for name, score in gates.items()],
+        "timeline": [
+            {"label": label, "impact": "+1", "occurred_at": datetime.now(timezone.utc).isoformat()}
+            for label in events
+        ],
+    }
+    response = client.post(
+        "/api/v1/dashboard/samples", json=snapshot, headers={"X-API-Key": API_KEY}
+    )
+    assert response.status_code == 202
+
+
+def _subscribe(websocket, *topics: str) -> dict:
+    websocket.send_json({"action": "subscribe", "topics": list(topics)})
+    return websocket.receive_json()
+
+
+def test_gate_updates_reach_only_their_topic(client: TestClient) -> None:
+    _ingest(client, {"Alpha": 70, "Beta": 70})
+    with client.websocket_connect(WS_PATH) as websocket:
+        snapshot = _subscribe(websocket, "GATE:alpha")
+        assert (snapshot["type"], snapshot["topics"]) == ("snapshot", ["gate:alpha"])
+        assert [gate["score"] for gate in snapshot["gates"]] == [70]
+
+        _ingest(client, {"Beta": 90})
+        _ingest(client, {"Alpha": 80, "Beta": 95})
+        message = websocket.receive_json()
+
+    # Beta's changes were never sent; Alpha's arrived as one gate message.
+    assert message["type"] == "gate"
+    assert (message["gate"]["name"], message["gate"]["score"]) == ("Alpha", 80)
+
+
+def test_timeline_topic_sends_only_new_events(client: TestClient) -> None:
+    _ingest(client, {"Alpha": 70}, events=("deployed",))
+    with client.websocket_connect(WS_PATH) as websocket:
+        snapshot = _subscribe(websocket, "timeline")
+        assert snapshot["timeline"][0]["label"] == "deployed"
+
+        _ingest(client, {"Alpha": 75}, events=("rolled back",))
+        message = websocket.receive_json()
+
+    assert message["type"] == "timeline"
+    assert [event["label"] for event in message["events"]] == ["rolled back"]
+    assert message["length"] == min(len(snapshot["timeline"]) + 1, 10)
+
+
+def test_job_topics_require_credentials(client: TestClient) -> None:
+    with client.websocket_connect(WS_PATH) as websocket:
+        reply = _subscribe(websocket, "job:*")
+        assert reply == {"type": "error", "detail": "Job topics require credentials"}
+        # Other topics stay available to anonymous clients.
+        assert _subscribe(websocket, "gate:*")["type"] == "snapshot"
+
+
+def test_authenticated_clients_receive_job_updates(client: TestClient) -> None:
+    broker = client.app.state.telemetry_broker
+    with client.websocket_connect(WS_PATH, headers={"X-API-Key": API_KEY}) as websocket:
+        assert _subscribe(websocket, "job:ABC123")["jobs"] == []
+
+        client.portal.call(broker.publish_job, {"job_id": "other", "status": "running"})
+        client.portal.call(broker.publish_job, {"job_id": "abc123", "status": "running"})
+        message = websocket.receive_json()
+
+    assert (message["type"], message["job"]) == ("job", {"job_id": "abc123", "status": "running"})
+
+
+def test_invalid_credentials_close_the_socket(client: TestClient) -> None:
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect(f"{WS_PATH}?token=wrong") as websocket:
+            websocket.receive_json()
+
+    assert excinfo.value.code == 1008
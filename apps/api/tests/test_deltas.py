@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from chiron_api.schemas.dashboard import DashboardSummary
+from chiron_api.services.deltas import summary_patch
+from chiron_api.services.streaming import TelemetryStreamBroker
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _apply(document: dict[str, Any], ops: list[dict[str, Any]]) -> dict[str, Any]:
+    """A client's view of RFC 6902, for the add/replace/remove operations the API emits."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        *parents, last = op["path"].lstrip("/").split("/")
+        target: Any = document
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        key: Any = int(last) if isinstance(target, list) else last
+        if op["op"] == "add" and isinstance(target, list):
+            target.insert(key, op["value"])
+        elif op["op"] in ("add", "replace"):
+            target[key] = op["value"]
+        else:
+            del target[key]
+    return document
+
+
+def _summary(scores: dict[str, int], events: int = 0, **metadata: object) -> dict[str, Any]:
+    return DashboardSummary(
+        generated_at=T0,
+        hero_gates=[
+            {
+                "name": name,
+                "score": score,
+                "status": "pass",
+                "baseline": 80,
+                "delta": 0.0,
+                "trend": [],
+            }
+            for name, score in sorted(scores.items())
+        ],
+        timeline=[
+            {
+                "label": f"event {index}",
+                "impact": "+1",
+                "tone": "positive",
+                "occurred_at": T0 + timedelta(index),
+            }
+            for index in range(events, max(0, events - 3), -1)
+        ],
+        metadata=dict(metadata),
+    ).model_dump(mode="json")
+
+
+@pytest.mark.parametrize(
+    ("previous", "current"),
+    [
+        (_summary({"b": 80}), _summary({"a": 70, "b": 80, "c": 90})),
+        (_summary({"a": 70, "b": 80}), _summary({"a": 75, "b": 80})),
+        (_summary({"a": 70, "b": 80}), _summary({"b": 80})),
+        (_summary({"a": 70}, events=2), _summary({"a": 70}, events=5)),
+        (_summary({"a": 70}, events=4), _summary({"a": 70}, events=5, pass_rate=1.0)),
+    ],
+    ids=["insert", "change", "remove", "timeline-overflow", "metadata"],
+)
+def test_patch_turns_previous_into_current(previous, current) -> None:
+    assert _apply(previous, summary_patch(previous, current)) == current
+
+
+def _frames(raw: bytes) -> tuple[str, str, Any]:
+    fields = dict(line.split(": ", 1) for line in raw.decode().strip().splitlines())
+    return fields["id"], fields.get("event", "message"), json.loads(fields["data"])
+
+
+@pytest.mark.asyncio
+async def test_delta_stream_reconstructs_every_summary() -> None:
+    broker = TelemetryStreamBroker(keyframe_interval=2, heartbeat_seconds=0)
+    published = [
+        DashboardSummary.model_validate(_summary(scores, events))
+        for scores, events in [
+            ({"a": 70}, 1),
+            ({"a": 72, "b": 90}, 2),
+            ({"a": 72, "b": 91}, 5),
+            ({"b": 91}, 5),
+            ({"b": 60, "c": 50}, 6),
+        ]
+    ]
+    stream = broker.stream(published[0], mode="delta")
+    event_id, event, document = _frames(await stream.__anext__())
+    assert event == "keyframe"
+
+    events = []
+    for summary in published[1:]:
+        await broker.publish(summary)
+        frame_id, event, data = _frames(await stream.__anext__())
+        if event == "keyframe":
+            document = data
+        else:
+            assert data["base"] == event_id
+            document = _apply(document, data["ops"])
+        events.append(event)
+        event_id = frame_id
+        assert document == summary.model_dump(mode="json")
+    await stream.aclose()
+
+    # The first publish has no base; then a keyframe follows every two patches.
+    assert events == ["keyframe", "patch", "patch", "keyframe"]
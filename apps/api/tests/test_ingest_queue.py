@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.db.models import TelemetrySample
+from chiron_api.schemas.dashboard import TelemetrySnapshotIn
+from chiron_api.services.ingest import IngestQueueClosed, IngestQueueFull, TelemetryIngestQueue
+from chiron_api.services.telemetry import TelemetryRepository
+
+
+def _snapshot(name: str, score: int) -> TelemetrySnapshotIn:
+    return TelemetrySnapshotIn(hero_gates=[{"name": name, "score": score}], timeline=[])
+
+
+def _locked() -> OperationalError:
+    return OperationalError("INSERT", {}, Exception("database is locked"))
+
+
+async def _drain(queue: TelemetryIngestQueue, ticket_id: str) -> None:
+    for _ in range(200):
+        if queue.ticket_status(ticket_id).status != "queued":
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("ticket never left the queue")
+
+
+async def _sample_count(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(TelemetrySample))
+
+
+@pytest.mark.asyncio
+async def test_transient_write_failure_is_retried(
+    session_factory: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    write_batch = TelemetryRepository.write_batch
+    failures = [_locked()]
+
+    async def flaky_write(self, snapshots, recorded_at):
+        if failures:
+            raise failures.pop()
+        await write_batch(self, snapshots, recorded_at)
+
+    monkeypatch.setattr(TelemetryRepository, "write_batch", flaky_write)
+    queue = TelemetryIngestQueue(session_factory, None, flush_interval_ms=0, retry_backoff_ms=0)
+    await queue.start()
+    ticket = queue.submit(_snapshot("Retry Gate", 80))
+    await _drain(queue, ticket.ticket_id)
+    await queue.stop()
+
+    status = queue.ticket_status(ticket.ticket_id)
+    assert status.status == "ingested"
+    assert status.attempts == 2
+    assert queue.stats()["retried_batches"] == 1
+    assert await _sample_count(session_factory) == 1
+
+
+@pytest.mark.asyncio
+async def test_failure_after_commit_keeps_tickets_ingested(
+    session_factory: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def broken_summary(self, snapshots, recorded_at):
+        raise _locked()
+
+    monkeypatch.setattr(TelemetryRepository, "batch_summary", broken_summary)
+    queue = TelemetryIngestQueue(session_factory, None, flush_interval_ms=0, retry_backoff_ms=0)
+    await queue.start()
+    tickets = [queue.submit(_snapshot(f"Gate {index}", 70 + index)) for index in range(3)]
+    await _drain(queue, tickets[-1].ticket_id)
+    await queue.stop()
+
+    statuses = [queue.ticket_status(ticket.ticket_id) for ticket in tickets]
+    assert [status.status for status in statuses] == ["ingested"] * 3
+    assert all(status.attempts == 1 for status in statuses)
+    assert queue.stats()["retried_batches"] == 0
+    # Committed once: a retry would have inserted the batch again.
+    assert await _sample_count(session_factory) == 3
+
+
+@pytest.mark.asyncio
+async def test_bad_snapshot_fails_alone(
+    session_factory: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    write_batch = TelemetryRepository.write_batch
+
+    async def strict_write(self, snapshots, recorded_at):
+        if any(gate.name == "Bad" for snapshot in snapshots for gate in snapshot.hero_gates):
+            raise IntegrityError("INSERT", {}, Exception("CHECK constraint failed"))
+        await write_batch(self, snapshots, recorded_at)
+
+    monkeypatch.setattr(TelemetryRepository, "write_batch", strict_write)
+    queue = TelemetryIngestQueue(session_factory, None, retry_backoff_ms=0)
+    # Queued before the flusher starts, so all three share one batch.
+    tickets = [queue.submit(_snapshot(name, 80)) for name in ("First", "Bad", "Last")]
+    await queue.start()
+    await queue.stop()
+
+    statuses = [queue.ticket_status(ticket.ticket_id) for ticket in tickets]
+    assert [status.status for status in statuses] == ["ingested", "failed", "ingested"]
+    assert statuses[1].error == "CHECK constraint failed"
+    assert queue.stats()["failed_snapshots"] == 1
+    assert await _sample_count(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_gives_up_after_the_retries(
+    session_factory: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def locked_write(self, snapshots, recorded_at):
+        raise _locked()
+
+    monkeypatch.setattr(TelemetryRepository, "write_batch", locked_write)
+    queue = TelemetryIngestQueue(session_factory, None, flush_retries=2, retry_backoff_ms=0)
+    ticket = queue.submit(_snapshot("Locked Gate", 80))
+    await queue.start()
+    await queue.stop()
+
+    status = queue.ticket_status(ticket.ticket_id)
+    assert (status.status, status.attempts, status.error) == ("failed", 3, "database is locked")
+    assert queue.stats()["retried_batches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_full_or_closed(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    queue = TelemetryIngestQueue(session_factory, None, max_size=1)
+    queue.submit(_snapshot("Queued Gate", 80))
+    with pytest.raises(IngestQueueFull):
+        queue.submit(_snapshot("Queued Gate", 81))
+
+    await queue.start()
+    await queue.stop()
+    with pytest.raises(IngestQueueClosed):
+        queue.submit(_snapshot("Queued Gate", 82))
+    assert await _sample_count(session_factory) == 1
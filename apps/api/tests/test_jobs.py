@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.config import AppConfig
+from chiron_api.db.models import ProcessJob, utcnow
+from chiron_api.services.jobs import JobContext, JobDispatcher, JobHandlerRegistry
+
+
+async def _wait_for_status(dispatcher: JobDispatcher, job_ids: list[str], status: str) -> list[str]:
+    for _ in range(300):
+        statuses = [(await dispatcher.get(job_id)).status for job_id in job_ids]
+        if all(value == status for value in statuses):
+            return statuses
+        await asyncio.sleep(0.01)
+    return statuses
+
+
+@pytest.mark.asyncio
+async def test_submissions_beyond_the_queue_wait_in_the_table(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    release = asyncio.Event()
+    handlers = JobHandlerRegistry()
+
+    @handlers.register("test.wait")
+    async def wait(context: JobContext) -> dict[str, str]:
+        await release.wait()
+        return {"job_id": context.job_id}
+
+    dispatcher = JobDispatcher(
+        session_factory, AppConfig(jobs_workers=1, jobs_queue_size=2), handlers=handlers
+    )
+    await dispatcher.start()
+    try:
+        async with session_factory() as session:
+            jobs = [await dispatcher.submit(session, "test.wait") for _ in range(6)]
+        stats = dispatcher.stats()
+        assert stats["queued"] <= 2
+        assert stats["backlog"] is True
+
+        release.set()
+        job_ids = [job.id for job in jobs]
+        assert await _wait_for_status(dispatcher, job_ids, "succeeded") == ["succeeded"] * 6
+        assert dispatcher.stats()["backlog"] is False
+    finally:
+        await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_outcome_write_does_not_leave_the_job_running(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    handlers = JobHandlerRegistry()
+    dispatcher: JobDispatcher
+
+    def unavailable() -> AsyncSession:
+        raise OperationalError("UPDATE", {}, Exception("disk I/O error"))
+
+    @handlers.register("test.outage")
+    async def outage(context: JobContext) -> None:
+        # The database goes away while the job runs, so recording its outcome fails.
+        dispatcher.session_factory = unavailable
+
+    dispatcher = JobDispatcher(session_factory, AppConfig(jobs_workers=1), handlers=handlers)
+    await dispatcher.start()
+    async with session_factory() as session:
+        job = await dispatcher.submit(session, "test.outage")
+    assert await _wait_for_status(dispatcher, [job.id], "running") == ["running"]
+    for _ in range(100):
+        if dispatcher.stats()["finished"]["succeeded"]:
+            break
+        await asyncio.sleep(0.01)
+
+    assert dispatcher.stats()["running"] == 0
+    dispatcher.session_factory = session_factory
+    await dispatcher.stop()
+    # Not requeued as interrupted: it finished, only its outcome was lost.
+    assert (await dispatcher.get(job.id)).status == "running"
+
+
+def _recorder(handlers: JobHandlerRegistry) -> list[str]:
+    ran: list[str] = []
+
+    @handlers.register("test.record")
+    async def record(context: JobContext) -> None:
+        ran.append(context.job_id)
+
+    return ran
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_highest_priority_first(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    handlers = JobHandlerRegistry()
+    ran = _recorder(handlers)
+    dispatcher = JobDispatcher(session_factory, AppConfig(jobs_workers=1), handlers=handlers)
+
+    # Submitted before the workers start, so they are all waiting together.
+    async with session_factory() as session:
+        jobs = {
+            label: await dispatcher.submit(session, "test.record", priority=priority)
+            for label, priority in [
+                ("low", "low"),
+                ("normal 1", "normal"),
+                ("high", "high"),
+                ("normal 2", "normal"),
+            ]
+        }
+    await dispatcher.start()
+    try:
+        await _wait_for_status(dispatcher, [job.id for job in jobs.values()], "succeeded")
+    finally:
+        await dispatcher.stop()
+
+    labels = {job.id: label for label, job in jobs.items()}
+    assert [labels[job_id] for job_id in ran] == ["high", "normal 1", "normal 2", "low"]
+
+
+@pytest.mark.asyncio
+async def test_start_requeues_running_jobs_whose_lease_expired(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    handlers = JobHandlerRegistry()
+    ran = _recorder(handlers)
+    now = utcnow()
+    async with session_factory() as session:
+        session.add_all(
+            [
+                # Its worker died two minutes ago.
+                ProcessJob(
+                    id="stale",
+                    process_type="test.record",
+                    status="running",
+                    attempts=1,
+                    queued_at=now - timedelta(minutes=3),
+                    heartbeat_at=now - timedelta(minutes=2),
+                ),
+                # Another process is still running this one.
+                ProcessJob(
+                    id="alive",
+                    process_type="test.record",
+                    status="running",
+                    attempts=1,
+                    queued_at=now - timedelta(minutes=3),
+                    heartbeat_at=now - timedelta(seconds=5),
+                ),
+                ProcessJob(id="queued", process_type="test.record", queued_at=now),
+            ]
+        )
+        await session.commit()
+
+    dispatcher = JobDispatcher(
+        session_factory, AppConfig(jobs_workers=1, jobs_lease_seconds=60), handlers=handlers
+    )
+    await dispatcher.start()
+    try:
+        assert (
+            await _wait_for_status(dispatcher, ["stale", "queued"], "succeeded")
+            == ["succeeded"] * 2
+        )
+        alive = await dispatcher.get("alive")
+        stale = await dispatcher.get("stale")
+    finally:
+        await dispatcher.stop()
+
+    assert ran == ["stale", "queued"]
+    assert (alive.status, stale.attempts) == ("running", 2)
+
+
+@pytest.mark.asyncio
+async def test_running_jobs_refresh_their_heartbeat(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    release = asyncio.Event()
+    handlers = JobHandlerRegistry()
+
+    @handlers.register("test.wait")
+    async def wait(context: JobContext) -> None:
+        await release.wait()
+
+    # The shortest lease, so the heartbeat is refreshed every third of a second.
+    dispatcher = JobDispatcher(
+        session_factory, AppConfig(jobs_workers=1, jobs_lease_seconds=1), handlers=handlers
+    )
+    await dispatcher.start()
+    try:
+        async with session_factory() as session:
+            job = await dispatcher.submit(session, "test.wait")
+        await _wait_for_status(dispatcher, [job.id], "running")
+        started = await dispatcher.get(job.id)
+        await asyncio.sleep(0.5)
+        refreshed = await dispatcher.get(job.id)
+        release.set()
+        await _wait_for_status(dispatcher, [job.id], "succeeded")
+    finally:
+        await dispatcher.stop()
+
+    assert refreshed.heartbeat_at > started.heartbeat_at
+    assert refreshed.started_at == started.started_at
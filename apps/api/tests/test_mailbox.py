@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from chiron_api.services.mailbox import SubscriberMailbox, SubscriberRegistry
+
+
+async def _drain(mailbox: SubscriberMailbox) -> list[object]:
+    frames = []
+    while mailbox.lag:
+        _, frame = await mailbox.get()
+        frames.append(frame)
+    return frames
+
+
+def _fill(mailbox: SubscriberMailbox, first: int, last: int, resync=None) -> None:
+    for index in range(first, last + 1):
+        mailbox.put((index, 0), f"frame {index}", resync)
+
+
+async def _read_all(mailbox: SubscriberMailbox) -> list[object]:
+    frames = []
+    while (item := await mailbox.get()) is not None:
+        frames.append(item[1])
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_conflate_keeps_only_the_newest_snapshot() -> None:
+    mailbox = SubscriberMailbox(policy="conflate", capacity=3)
+    _fill(mailbox, 1, 5)
+
+    assert await _drain(mailbox) == ["frame 5"]
+    assert (mailbox.dropped, mailbox.max_lag) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_conflate_replaces_a_full_delta_backlog_with_a_keyframe() -> None:
+    mailbox = SubscriberMailbox(policy="conflate", capacity=3, snapshots=False)
+    _fill(mailbox, 1, 3, resync=lambda: "keyframe")
+    assert mailbox.lag == 3
+
+    mailbox.put((4, 0), "patch 4", lambda: "keyframe 4")
+    mailbox.put((5, 0), "patch 5", lambda: "keyframe 5")
+
+    assert await _drain(mailbox) == ["keyframe 4", "patch 5"]
+    assert mailbox.dropped == 3
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_the_newest_frames() -> None:
+    mailbox = SubscriberMailbox(policy="drop-oldest", capacity=3, snapshots=False)
+    _fill(mailbox, 1, 5, resync=lambda: "keyframe")
+
+    assert await _drain(mailbox) == ["frame 3", "frame 4", "frame 5"]
+    assert mailbox.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_disconnect_closes_a_slow_subscriber() -> None:
+    mailbox = SubscriberMailbox(policy="disconnect", capacity=3)
+    reader = asyncio.ensure_future(_read_all(mailbox))
+    _fill(mailbox, 1, 1)
+    await asyncio.sleep(0.01)
+
+    # The reader stalls while four more frames arrive; the fourth finds three waiting.
+    _fill(mailbox, 2, 5)
+
+    assert mailbox.closed
+    assert await asyncio.wait_for(reader, 1) == ["frame 1"]
+    _fill(mailbox, 6, 6)
+    assert mailbox.lag == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_events_and_idle_heartbeats() -> None:
+    mailbox = SubscriberMailbox(policy="drop-oldest", capacity=10, snapshots=False)
+    mailbox.put((2, 0), "frame 2")
+    mailbox.put((1, 0), "frame 1")
+    # Something was queued during this interval, so no heartbeat is needed.
+    mailbox.heartbeat(b": ping")
+    assert await _drain(mailbox) == ["frame 2"]
+
+    mailbox.heartbeat(b": ping")
+    assert await _drain(mailbox) == [b": ping"]
+
+    # A queued heartbeat gives way to the next real frame.
+    mailbox.heartbeat(b": ping")
+    mailbox.put((3, 0), "frame 3")
+    assert await _drain(mailbox) == ["frame 3"]
+
+
+def test_registry_snapshots_are_unaffected_by_later_changes() -> None:
+    registry = SubscriberRegistry(shards=4)
+    mailboxes = [SubscriberMailbox() for _ in range(10)]
+    for mailbox in mailboxes:
+        registry.add(mailbox)
+
+    snapshot = registry.snapshot()
+    for mailbox in mailboxes[:5]:
+        registry.discard(mailbox)
+    registry.discard(mailboxes[0])
+
+    assert len(registry) == 5
+    assert sum(len(shard) for shard in snapshot) == 10
+    assert {id(mailbox) for shard in registry.snapshot() for mailbox in shard} == {
+        id(mailbox) for mailbox in mailboxes[5:]
+    }
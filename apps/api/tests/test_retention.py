@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.config import AppConfig
+from chiron_api.db.models import HeroGate, ProcessJob, TelemetrySample, TimelineEvent, utcnow
+from chiron_api.services.retention import TelemetryRetentionService
+
+
+def _config(**overrides: object) -> AppConfig:
+    settings: dict[str, object] = {
+        "retention_batch_size": 10,
+        "sample_retention_days": None,
+        "sample_max_rows": None,
+        "timeline_retention_days": None,
+        "timeline_max_rows": None,
+        "rollup_minute_retention_days": None,
+        "rollup_hour_retention_days": None,
+        "job_retention_days": None,
+    }
+    return AppConfig(**{**settings, **overrides})
+
+
+async def _add_samples(session_factory, ages: list[timedelta]) -> None:
+    now = utcnow()
+    async with session_factory() as session:
+        gate = HeroGate(name="Alpha")
+        session.add(gate)
+        await session.flush()
+        session.add_all(
+            TelemetrySample(
+                gate_id=gate.id, score=80, status="pass", metrics={}, recorded_at=now - age
+            )
+            for age in ages
+        )
+        await session.commit()
+
+
+async def _ages(session_factory, column) -> list[timedelta]:
+    now = utcnow()
+    async with session_factory() as session:
+        moments = (await session.scalars(select(column).order_by(column))).all()
+    return [now - moment.replace(tzinfo=now.tzinfo) for moment in moments]
+
+
+@pytest.mark.asyncio
+async def test_expired_samples_are_deleted_in_batches(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await _add_samples(
+        session_factory,
+        [timedelta(days=10, minutes=index) for index in range(25)]
+        + [timedelta(hours=index) for index in range(5)],
+    )
+
+    service = TelemetryRetentionService(session_factory, _config(sample_retention_days=7))
+    report = await service.run_once()
+
+    assert report.rows_removed == {"telemetry_samples": 25}
+    assert report.batches == 3
+    samples = await _ages(session_factory, TelemetrySample.recorded_at)
+    assert len(samples) == 5 and max(samples) < timedelta(days=7)
+
+
+@pytest.mark.asyncio
+async def test_tables_are_trimmed_to_their_newest_rows(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    await _add_samples(session_factory, [timedelta(minutes=index) for index in range(23)])
+    now = utcnow()
+    async with session_factory() as session:
+        session.add_all(
+            TimelineEvent(label=f"event {index}", impact="+1", occurred_at=now - timedelta(index))
+            for index in range(15)
+        )
+        await session.commit()
+
+    service = TelemetryRetentionService(
+        session_factory, _config(sample_max_rows=4, timeline_max_rows=12)
+    )
+    report = await service.run_once()
+
+    assert report.rows_removed == {"telemetry_samples": 19, "timeline_events": 3}
+    samples = await _ages(session_factory, TelemetrySample.recorded_at)
+    assert len(samples) == 4 and max(samples) < timedelta(minutes=4)
+    events = await _ages(session_factory, TimelineEvent.occurred_at)
+    assert len(events) == 12 and max(events) < timedelta(days=12)
+
+
+@pytest.mark.asyncio
+async def test_only_long_finished_jobs_are_deleted(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    now = utcnow()
+    async with session_factory() as session:
+        session.add_all(
+            [
+                ProcessJob(
+                    id="expired",
+                    process_type="noop",
+                    status="succeeded",
+                    queued_at=now - timedelta(40),
+                    finished_at=now - timedelta(40),
+                ),
+                ProcessJob(
+                    id="recent",
+                    process_type="noop",
+                    status="failed",
+                    queued_at=now - timedelta(40),
+                    finished_at=now - timedelta(1),
+                ),
+                ProcessJob(
+                    id="queued", process_type="noop", status="queued", queued_at=now - timedelta(40)
+                ),
+            ]
+        )
+        await session.commit()
+
+    service = TelemetryRetentionService(session_factory, _config(job_retention_days=30))
+    await service.run_once()
+
+    async with session_factory() as session:
+        remaining = (await session.scalars(select(ProcessJob.id).order_by(ProcessJob.id))).all()
+    assert remaining == ["queued", "recent"]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.config import AppConfig
+from chiron_api.db.models import GateRollup, HeroGate, utcnow
+from chiron_api.services.retention import TelemetryRetentionService
+from chiron_api.services.rollups import (
+    InvalidResolution,
+    RollupRepository,
+    bucket_start,
+    rollup_retention,
+    upsert_rollups,
+)
+
+CONFIG = AppConfig(rollup_minute_retention_days=7, rollup_hour_retention_days=180)
+RETENTION = rollup_retention(CONFIG)
+
+
+@pytest_asyncio.fixture
+async def gate_id(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        gate = HeroGate(name="Alpha")
+        session.add(gate)
+        await session.commit()
+        return gate.id
+
+
+async def _fold(session_factory, gate_id: int, *samples: tuple[datetime, int, str]) -> None:
+    async with session_factory() as session:
+        await upsert_rollups(
+            session,
+            [
+                {
+                    "gate_id": gate_id,
+                    "score": score,
+                    "status": status,
+                    "metrics": {"throughput": 10.0},
+                    "recorded_at": recorded_at,
+                }
+                for recorded_at, score, status in samples
+            ],
+        )
+        await session.commit()
+
+
+async def _history(session_factory, window: timedelta, resolution: str | None = None):
+    end = utcnow()
+    async with session_factory() as session:
+        return await RollupRepository(session, retention=RETENTION).get_gate_history(
+            "alpha", start=end - window, end=end, resolution=resolution
+        )
+
+
+@pytest.mark.asyncio
+async def test_samples_fold_additively_into_every_tier(session_factory, gate_id) -> None:
+    minute = bucket_start(utcnow(), timedelta(minutes=1))
+    await _fold(session_factory, gate_id, (minute, 70, "warn"))
+    await _fold(session_factory, gate_id, (minute + timedelta(seconds=1), 90, "pass"))
+
+    async with session_factory() as session:
+        rows = (await session.scalars(select(GateRollup))).all()
+
+    assert sorted(row.resolution for row in rows) == ["1d", "1h", "1m"]
+    for row in rows:
+        assert (row.sample_count, row.score_min, row.score_max) == (2, 70, 90)
+        assert (row.pass_count, row.warn_count, row.throughput_sum) == (1, 1, 20.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("window", "resolution"),
+    [(timedelta(hours=6), "1m"), (timedelta(days=7), "1h"), (timedelta(days=365), "1d")],
+)
+async def test_auto_resolution_bounds_the_point_count(
+    session_factory, gate_id, window: timedelta, resolution: str
+) -> None:
+    history = await _history(session_factory, window)
+
+    assert (history.resolution, history.tier) == (resolution, resolution)
+    assert history.requested_resolution is None
+
+
+@pytest.mark.asyncio
+async def test_explicit_resolution_is_summed_from_a_finer_tier(session_factory, gate_id) -> None:
+    now = utcnow()
+    await _fold(
+        session_factory,
+        gate_id,
+        (now - timedelta(minutes=1), 80, "pass"),
+        (now - timedelta(minutes=2), 60, "fail"),
+    )
+
+    history = await _history(session_factory, timedelta(hours=1), "30m")
+
+    assert (history.resolution, history.tier) == ("30m", "1m")
+    assert sum(point.sample_count for point in history.points) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("requested", "served", "tier"),
+    [("1m", "1h", "1h"), ("15m", "1h", "1h"), ("90m", "2h", "1h"), ("1h", "1d", "1d")],
+)
+async def test_resolution_past_its_retention_is_coarsened(
+    session_factory, gate_id, requested: str, served: str, tier: str
+) -> None:
+    window = timedelta(days=30) if tier == "1h" else timedelta(days=200)
+    now = utcnow()
+    await _fold(
+        session_factory,
+        gate_id,
+        (now - window + timedelta(days=1), 50, "fail"),
+        (now - timedelta(minutes=5), 90, "pass"),
+    )
+    await TelemetryRetentionService(session_factory, CONFIG).run_once()
+
+    history = await _history(session_factory, window, requested)
+
+    assert (history.resolution, history.tier) == (served, tier)
+    assert history.requested_resolution == requested
+    # Both ends of the window are served, not only the part the finer tier still holds.
+    assert sum(point.sample_count for point in history.points) == 2
+
+
+@pytest.mark.asyncio
+async def test_resolution_not_a_whole_minute_is_rejected(session_factory, gate_id) -> None:
+    with pytest.raises(InvalidResolution):
+        await _history(session_factory, timedelta(hours=1), "90s")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from chiron_api.schemas.dashboard import DashboardSummary, TelemetrySnapshotIn
+from chiron_api.services.deltas import summary_patch
+from chiron_api.services.streaming import TelemetryStreamBroker
+from chiron_api.services.summary import DashboardSummaryState
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _Worker:
+    """One API process: its own summary state and broker on the shared Redis stream."""
+
+    def __init__(self, server: FakeServer) -> None:
+        self.state = DashboardSummaryState()
+        self.state.seed(DashboardSummary(generated_at=T0, hero_gates=[], timeline=[]))
+        self.broker = TelemetryStreamBroker(
+            FakeAsyncRedis(server=server, decode_responses=True),
+            heartbeat_seconds=0,
+            summary_state=self.state,
+        )
+
+    async def ingest(self, name: str, score: int, minutes: int) -> DashboardSummary:
+        snapshots = [TelemetrySnapshotIn(hero_gates=[{"name": name, "score": score}], timeline=[])]
+        recorded_at = [T0 + timedelta(minutes=minutes)]
+        summary = self.state.apply(snapshots, recorded_at)
+        await self.broker.publish(summary, snapshots=snapshots, recorded_at=recorded_at)
+        return summary
+
+
+@pytest_asyncio.fixture
+async def workers() -> AsyncIterator[tuple[_Worker, _Worker]]:
+    server = FakeServer()
+    pair = (_Worker(server), _Worker(server))
+    for worker in pair:
+        await worker.broker.start()
+    # Consumers only relay entries appended after they first read the stream.
+    await asyncio.sleep(0.05)
+    try:
+        yield pair
+    finally:
+        for worker in pair:
+            await worker.broker.stop()
+
+
+def _frame(raw: bytes) -> tuple[str, str, Any]:
+    fields = dict(line.split(": ", 1) for line in raw.decode().strip().splitlines())
+    return fields["id"], fields.get("event", "message"), json.loads(fields["data"])
+
+
+async def _next(stream) -> tuple[str, str, Any]:
+    return _frame(await asyncio.wait_for(stream.__anext__(), 2))
+
+
+def _scores(summary: dict[str, Any]) -> dict[str, int]:
+    return {gate["name"]: gate["score"] for gate in summary["hero_gates"]}
+
+
+@pytest.mark.asyncio
+async def test_other_workers_fold_relayed_ingests(workers) -> None:
+    first, second = workers
+    await second.ingest("Beta", 60, 0)
+    stream = second.broker.stream(second.state.snapshot())
+    await _next(stream)
+
+    await first.ingest("Alpha", 90, 1)
+    event_id, _, data = await _next(stream)
+    await stream.aclose()
+
+    # The relayed summary merges the ingest into the second worker's own state.
+    assert _scores(data) == {"Alpha": 90, "Beta": 60}
+    assert _scores(second.state.snapshot().model_dump()) == {"Alpha": 90, "Beta": 60}
+    assert event_id == first.broker.last_event_id
+
+
+@pytest.mark.asyncio
+async def test_reconnect_with_the_current_id_skips_the_initial_frame(workers) -> None:
+    worker, _ = workers
+    await worker.ingest("Alpha", 70, 0)
+
+    stream = worker.broker.stream(
+        worker.state.snapshot(), last_event_id=worker.broker.last_event_id
+    )
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0.05)
+    assert not pending.done()
+
+    await worker.ingest("Alpha", 75, 1)
+    event_id, _, data = _frame(await asyncio.wait_for(pending, 2))
+    await stream.aclose()
+
+    assert (event_id, _scores(data)) == (worker.broker.last_event_id, {"Alpha": 75})
+
+
+@pytest.mark.asyncio
+async def test_delta_reconnect_catches_up_with_one_patch(workers) -> None:
+    worker, _ = workers
+    await worker.ingest("Alpha", 70, 0)
+    seen_id, seen = worker.broker.last_event_id, worker.state.snapshot().model_dump(mode="json")
+    await worker.ingest("Beta", 80, 1)
+    await worker.ingest("Alpha", 72, 2)
+
+    stream = worker.broker.stream(worker.state.snapshot(), mode="delta", last_event_id=seen_id)
+    event_id, event, patch = await _next(stream)
+    await stream.aclose()
+
+    current = worker.state.snapshot().model_dump(mode="json")
+    assert (event_id, event, patch["base"]) == (worker.broker.last_event_id, "patch", seen_id)
+    assert patch["ops"] == summary_patch(seen, current)
+
+
+@pytest.mark.asyncio
+async def test_delta_reconnect_past_the_stream_gets_a_keyframe(workers) -> None:
+    worker, _ = workers
+    await worker.ingest("Alpha", 70, 0)
+
+    stream = worker.broker.stream(worker.state.snapshot(), mode="delta", last_event_id="1-0")
+    _, event, data = await _next(stream)
+    await stream.aclose()
+
+    assert (event, _scores(data)) == ("keyframe", {"Alpha": 70})
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.schemas.dashboard import DashboardSummary, TelemetrySnapshotIn
+from chiron_api.services.summary import (
+    DashboardSummaryResync,
+    DashboardSummaryState,
+    dump_ingest,
+    load_ingest,
+)
+from chiron_api.services.telemetry import TelemetryRepository
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(*gates: dict[str, object], events: tuple[str, ...] = ()) -> TelemetrySnapshotIn:
+    # Events are named after the minute they occurred in.
+    return TelemetrySnapshotIn(
+        hero_gates=list(gates),
+        timeline=[
+            {"label": label, "impact": "+1", "occurred_at": T0 + timedelta(minutes=int(label))}
+            for label in events
+        ],
+    )
+
+
+def _seeded() -> DashboardSummaryState:
+    state = DashboardSummaryState()
+    state.seed(DashboardSummary(generated_at=T0, hero_gates=[], timeline=[]))
+    return state
+
+
+def _view(summary: DashboardSummary) -> tuple[object, ...]:
+    return (
+        [gate.model_dump() for gate in summary.hero_gates],
+        [
+            (event.label, event.occurred_at.replace(tzinfo=timezone.utc))
+            for event in summary.timeline
+        ],
+        summary.metadata,
+    )
+
+
+@pytest.mark.asyncio
+async def test_applied_ingests_match_the_database(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    state = DashboardSummaryState()
+    await state.seed_from_database(session_factory)
+    snapshots = [
+        _snapshot({"name": "Beta", "score": 55}, {"name": "Alpha", "score": 90}, events=("1",)),
+        _snapshot({"name": "alpha", "score": 75, "baseline": 70}, events=("2",)),
+    ]
+
+    async with session_factory() as session:
+        repo = TelemetryRepository(session, summary_state=state)
+        applied = await repo.ingest_batch(snapshots[:1])
+        applied = await repo.ingest_batch(snapshots[1:])
+        stored = await repo.get_dashboard_summary()
+
+    assert _view(state.snapshot()) == _view(stored)
+    assert [gate.name for gate in applied.hero_gates] == ["Alpha", "Beta"]
+    assert applied.metadata["average_score"] == 65.0
+    assert applied.generation == 3
+
+
+def test_fold_converges_whatever_the_delivery_order() -> None:
+    ingests = [
+        ([_snapshot({"name": "Gate", "score": 60, "baseline": 70}, events=("1",))], [T0]),
+        ([_snapshot({"name": "Gate", "score": 95}, events=("2",))], [T0 + timedelta(1)]),
+    ]
+    forward, backward = _seeded(), _seeded()
+    for snapshots, recorded_at in ingests:
+        forward.fold(snapshots, recorded_at)
+    for snapshots, recorded_at in reversed(ingests):
+        backward.fold(snapshots, recorded_at)
+
+    assert _view(forward.snapshot()) == _view(backward.snapshot())
+    assert forward.snapshot().hero_gates[0].score == 95
+
+
+def test_older_sample_only_updates_an_explicit_baseline() -> None:
+    state = _seeded()
+    state.apply([_snapshot({"name": "Gate", "score": 90, "baseline": 80})], [T0 + timedelta(1)])
+
+    summary = state.apply([_snapshot({"name": "Gate", "score": 40, "baseline": 50})], [T0])
+
+    (gate,) = summary.hero_gates
+    assert (gate.score, gate.baseline, gate.delta) == (90, 50, 40.0)
+
+
+def test_ingests_relayed_before_the_seed_are_replayed() -> None:
+    state = DashboardSummaryState()
+    snapshots, recorded_at = load_ingest(
+        dump_ingest([_snapshot({"name": "Early", "score": 70}, events=("5",))], [T0])
+    )
+
+    assert state.fold(snapshots, recorded_at) is None
+    summary = state.seed(DashboardSummary(generated_at=T0, hero_gates=[], timeline=[]))
+
+    assert [gate.name for gate in summary.hero_gates] == ["Early"]
+    assert [event.label for event in summary.timeline] == ["5"]
+
+
+@pytest.mark.asyncio
+async def test_resync_merges_what_the_relay_missed(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    state = DashboardSummaryState()
+    await state.seed_from_database(session_factory)
+    resync = DashboardSummaryResync(state, session_factory)
+    # The database holds nothing the seed did not.
+    assert await resync.run_once() is None
+
+    # Another worker's ingest, never relayed to this state.
+    async with session_factory() as session:
+        await TelemetryRepository(session).ingest_batch([_snapshot({"name": "Gate", "score": 88})])
+
+    summary = await resync.run_once()
+    assert [gate.score for gate in summary.hero_gates] == [88]
+    assert await resync.run_once() is None
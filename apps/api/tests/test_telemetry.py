@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from chiron_api.db.models import GateLatest, GateRollup, HeroGate, TelemetrySample
+from chiron_api.schemas.dashboard import TelemetrySnapshotIn
+from chiron_api.services.gate_registry import GateRegistry
+from chiron_api.services.telemetry import TelemetryRepository
+
+
+def _snapshot(*gates: dict[str, object]) -> TelemetrySnapshotIn:
+    return TelemetrySnapshotIn(hero_gates=list(gates), timeline=[])
+
+
+async def _ingest(session_factory, registry: GateRegistry, *snapshots: TelemetrySnapshotIn):
+    async with session_factory() as session:
+        return await TelemetryRepository(session, gate_registry=registry).ingest_batch(snapshots)
+
+
+async def _count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.fixture
+def statements(session_factory: async_sessionmaker[AsyncSession]) -> Iterator[list[str]]:
+    engine = session_factory.kw["bind"].sync_engine
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_large_batch_is_written_in_chunks(session_factory) -> None:
+    registry = GateRegistry()
+    gates = [{"name": f"Gate {index}", "score": 50 + index % 50} for index in range(400)]
+
+    summary = await _ingest(session_factory, registry, _snapshot(*gates), _snapshot(*gates[:10]))
+
+    assert len(summary.hero_gates) == 400
+    assert await _count(session_factory, HeroGate) == 400
+    assert await _count(session_factory, TelemetrySample) == 410
+    assert await _count(session_factory, GateLatest) == 400
+    assert await _count(session_factory, GateRollup) == 3 * 400
+    assert len(registry) == 400
+
+
+@pytest.mark.asyncio
+async def test_known_gates_resolve_without_reading_hero_gates(session_factory, statements) -> None:
+    registry = GateRegistry()
+    await _ingest(session_factory, registry, _snapshot({"name": "Alpha", "score": 90}))
+    statements.clear()
+
+    summary = await _ingest(session_factory, registry, _snapshot({"name": "ALPHA", "score": 70}))
+
+    assert [gate.name for gate in summary.hero_gates] == ["Alpha"]
+    assert not any("lower(hero_gates.name)" in statement for statement in statements)
+    assert await _count(session_factory, HeroGate) == 1
+    assert await _count(session_factory, TelemetrySample) == 2
+
+
+@pytest.mark.asyncio
+async def test_gate_created_elsewhere_keeps_its_baseline(session_factory) -> None:
+    async with session_factory() as session:
+        session.add(HeroGate(name="Beta", baseline_score=50))
+        await session.commit()
+
+    # This process's registry has never seen Beta.
+    summary = await _ingest(
+        session_factory, GateRegistry(), _snapshot({"name": "beta", "score": 90})
+    )
+
+    (gate,) = summary.hero_gates
+    assert (gate.name, gate.baseline, gate.delta) == ("Beta", 50, 40.0)
+    assert await _count(session_factory, HeroGate) == 1
+
+
+@pytest.mark.asyncio
+async def test_explicit_baseline_is_written_for_known_gates(session_factory) -> None:
+    registry = GateRegistry()
+    await _ingest(session_factory, registry, _snapshot({"name": "Gamma", "score": 80}))
+
+    summary = await _ingest(
+        session_factory,
+        registry,
+        _snapshot({"name": "Gamma", "score": 85, "baseline": 60}),
+        _snapshot({"name": "gamma", "score": 86, "baseline": 70}),
+    )
+
+    (gate,) = summary.hero_gates
+    assert (gate.score, gate.baseline) == (86, 70)
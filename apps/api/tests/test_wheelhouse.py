@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from chiron_api.config import AppConfig
+from chiron_api.services import wheelhouse
+from chiron_api.services.wheelhouse import (
+    ArtifactStore,
+    WheelhouseBuilder,
+    WheelhouseBusy,
+    parse_build_spec,
+)
+
+
+@pytest.fixture
+def built(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
+    """Requirements "built" by a stand-in for ``pip wheel``, in order."""
+    requirements: list[str] = []
+
+    def fake_build_artifacts(
+        root: str, name: str, requirement: str, *_: Any
+    ) -> tuple[list[dict[str, Any]], bool]:
+        requirements.append(requirement)
+        store = ArtifactStore(root)
+        wheel = store.scratch_dir() / f"{name}-{len(requirements)}.whl"
+        wheel.write_bytes(requirement.encode())
+        digest, size = store.put_file(wheel)
+        return [{"name": wheel.name, "sha256": digest, "size": size}], False
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(wheelhouse, "build_artifacts", fake_build_artifacts)
+    monkeypatch.setattr(WheelhouseBuilder, "_executor", lambda self: pool)
+    yield requirements
+    pool.shutdown()
+
+
+@pytest_asyncio.fixture
+async def builder(tmp_path: Path, built: list[str]) -> AsyncIterator[WheelhouseBuilder]:
+    instance = WheelhouseBuilder(
+        AppConfig(wheelhouse_store_path=str(tmp_path), wheelhouse_unpinned_ttl_seconds=60)
+    )
+    await instance.start()
+    try:
+        yield instance
+    finally:
+        await instance.stop()
+
+
+async def _finish(builder: WheelhouseBuilder, target: str) -> str:
+    outcome, build = builder.submit(parse_build_spec(target, [], signed=False))
+    for _ in range(200):
+        if build.status != "building":
+            break
+        await asyncio.sleep(0.01)
+    assert build.status == "built", build.error
+    return outcome
+
+
+def _age(builder: WheelhouseBuilder, target: str, by: timedelta) -> None:
+    spec = parse_build_spec(target, [], signed=False)
+    builder.get(f"wheelhouse-{builder.cache_key(spec)[:20]}").created_at -= by
+
+
+@pytest.mark.parametrize(
+    ("target", "pinned"),
+    [
+        ("demo==1.0", True),
+        ("demo===1.0", True),
+        ("demo", False),
+        ("demo>=1.0", False),
+        ("demo==1.*", False),
+        ("demo==1.0,<2", False),
+    ],
+)
+def test_only_exact_pins_count_as_pinned(target: str, pinned: bool) -> None:
+    assert parse_build_spec(target, [], signed=False).pinned is pinned
+
+
+@pytest.mark.asyncio
+async def test_unpinned_build_is_rebuilt_after_its_ttl(
+    builder: WheelhouseBuilder, built: list[str]
+) -> None:
+    assert await _finish(builder, "demo>=1.0") == "queued"
+    assert await _finish(builder, "demo>=1.0") == "cached"
+
+    _age(builder, "demo>=1.0", timedelta(seconds=61))
+
+    assert await _finish(builder, "demo>=1.0") == "queued"
+    assert built == ["demo>=1.0", "demo>=1.0"]
+
+
+@pytest.mark.asyncio
+async def test_pinned_build_is_reused_indefinitely(
+    builder: WheelhouseBuilder, built: list[str]
+) -> None:
+    assert await _finish(builder, "demo==1.0") == "queued"
+
+    _age(builder, "demo==1.0", timedelta(days=365))
+
+    assert await _finish(builder, "demo==1.0") == "cached"
+    assert built == ["demo==1.0"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_build(
+    builder: WheelhouseBuilder, built: list[str]
+) -> None:
+    spec = parse_build_spec("demo==1.0", [], signed=False)
+    first, build = builder.submit(spec)
+    second, joined = builder.submit(spec)
+
+    assert (first, second) == ("queued", "coalesced")
+    assert joined is build
+    assert await _finish(builder, "demo==1.0") == "coalesced"
+    assert await _finish(builder, "demo==1.0") == "cached"
+    assert built == ["demo==1.0"]
+
+
+@pytest.mark.asyncio
+async def test_builds_are_reused_after_a_restart(
+    tmp_path: Path, builder: WheelhouseBuilder, built: list[str]
+) -> None:
+    await _finish(builder, "demo==1.0")
+
+    restarted = WheelhouseBuilder(AppConfig(wheelhouse_store_path=str(tmp_path)))
+    await restarted.start()
+    try:
+        assert await _finish(restarted, "demo==1.0") == "cached"
+    finally:
+        await restarted.stop()
+    assert built == ["demo==1.0"]
+
+
+@pytest.mark.asyncio
+async def test_build_with_missing_artifacts_is_rebuilt(
+    tmp_path: Path, builder: WheelhouseBuilder, built: list[str]
+) -> None:
+    await _finish(builder, "demo==1.0")
+    spec = parse_build_spec("demo==1.0", [], signed=False)
+    build = builder.get(f"wheelhouse-{builder.cache_key(spec)[:20]}")
+    ArtifactStore(tmp_path).object_path(build.artifacts[0]["sha256"]).unlink()
+
+    assert await _finish(builder, "demo==1.0") == "queued"
+    assert built == ["demo==1.0", "demo==1.0"]
+
+
+@pytest.mark.asyncio
+async def test_distinct_builds_beyond_the_limit_are_refused(tmp_path: Path, built) -> None:
+    limited = WheelhouseBuilder(
+        AppConfig(wheelhouse_store_path=str(tmp_path), wheelhouse_max_pending_builds=1)
+    )
+    await limited.start()
+    try:
+        limited.submit(parse_build_spec("demo==1.0", [], signed=False))
+        with pytest.raises(WheelhouseBusy):
+            limited.submit(parse_build_spec("other==1.0", [], signed=False))
+        # Joining the build already in progress needs no new slot.
+        assert limited.submit(parse_build_spec("demo==1.0", [], signed=False))[0] == "coalesced"
+    finally:
+        await limited.stop()